@@ -0,0 +1,33 @@
+"""
+Add late scheduled flow run index
+
+Revision ID: 1cc612fafe89
+Revises: b9086bd4b962
+Create Date: 2020-07-06 10:15:12.418272
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+# revision identifiers, used by Alembic.
+revision = "1cc612fafe89"
+down_revision = "b9086bd4b962"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # a partial index covering only Scheduled runs keeps the late-work scan cheap
+    # no matter how many finished runs are in the table
+    op.create_index(
+        "ix_flow_run__scheduled_state_start_time",
+        "flow_run",
+        ["state_start_time"],
+        postgresql_where=sa.text("state = 'Scheduled'"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_flow_run__scheduled_state_start_time", table_name="flow_run")
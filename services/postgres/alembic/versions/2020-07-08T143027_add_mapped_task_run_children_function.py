@@ -0,0 +1,74 @@
+"""
+Add function to create mapped task run children
+
+Revision ID: 20a4ef56139f
+Revises: 1cc612fafe89
+Create Date: 2020-07-08 14:30:27.190553
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+# revision identifiers, used by Alembic.
+revision = "20a4ef56139f"
+down_revision = "1cc612fafe89"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # this function is VOLATILE, so it can't be tracked by Hasura and is called
+    # directly by the API
+    op.execute(
+        """
+        CREATE FUNCTION utility.get_or_create_mapped_task_run_children(
+            flow_run_id UUID, task_id UUID, max_map_index integer
+        )
+        RETURNS TABLE (id UUID)
+        LANGUAGE plpgsql
+        VOLATILE
+        AS $$
+        BEGIN
+            -- create any missing children
+            INSERT INTO task_run (tenant_id, flow_run_id, task_id, map_index, cache_key)
+            SELECT task.tenant_id, flow_run_id, task.id, map_index, task.cache_key
+            FROM task
+            CROSS JOIN generate_series(0, max_map_index) AS map_index
+            WHERE task.id = task_id
+            ON CONFLICT ON CONSTRAINT task_run_unique_identifier_key DO NOTHING;
+
+            -- create Pending states for any task runs without a state
+            INSERT INTO task_run_state (tenant_id, task_run_id, state, message, serialized_state)
+            SELECT
+                task_run.tenant_id,
+                task_run.id,
+                'Pending',
+                'Task run created',
+                '{"type": "Pending", "message": "Task run created"}'
+            FROM task_run
+            WHERE
+                task_run.flow_run_id = get_or_create_mapped_task_run_children.flow_run_id
+                AND task_run.task_id = get_or_create_mapped_task_run_children.task_id
+                AND task_run.state_id IS NULL;
+
+            -- return the children, ordered by map index
+            RETURN QUERY
+            SELECT task_run.id
+            FROM task_run
+            WHERE
+                task_run.flow_run_id = get_or_create_mapped_task_run_children.flow_run_id
+                AND task_run.task_id = get_or_create_mapped_task_run_children.task_id
+                AND task_run.map_index BETWEEN 0 AND max_map_index
+            ORDER BY task_run.map_index;
+        END;
+        $$;
+        """
+    )
+
+
+def downgrade():
+    op.execute(
+        "DROP FUNCTION utility.get_or_create_mapped_task_run_children(UUID, UUID, integer);"
+    )
@@ -0,0 +1,110 @@
+"""
+Add lazy task runs
+
+Revision ID: 6b0a9f3e2c71
+Revises: 20a4ef56139f
+Create Date: 2020-07-09 09:12:44.602918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+# revision identifiers, used by Alembic.
+revision = "6b0a9f3e2c71"
+down_revision = "20a4ef56139f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE FUNCTION utility.create_task_runs(flow_run_id UUID)
+        RETURNS integer
+        LANGUAGE plpgsql
+        VOLATILE
+        AS $$
+        DECLARE
+            n_created integer;
+        BEGIN
+            -- create task runs for each of the tasks in the flow run's flow that
+            -- don't have one yet
+            INSERT INTO task_run (tenant_id, flow_run_id, task_id, cache_key, map_index)
+            SELECT flow_run.tenant_id, flow_run.id, task.id, task.cache_key, -1
+            FROM flow_run
+            INNER JOIN task ON task.flow_id = flow_run.flow_id
+            WHERE flow_run.id = create_task_runs.flow_run_id
+            ON CONFLICT ON CONSTRAINT task_run_unique_identifier_key DO NOTHING;
+
+            GET DIAGNOSTICS n_created = ROW_COUNT;
+
+            -- create corresponding states for each of the new task runs
+            IF n_created > 0 THEN
+                INSERT INTO task_run_state(tenant_id, task_run_id, state, message, serialized_state)
+                SELECT task_run.tenant_id, task_run.id, 'Pending', 'Task run created', '{"type": "Pending", "message": "Task run created"}'
+                FROM task_run
+                WHERE
+                    task_run.flow_run_id = create_task_runs.flow_run_id
+                    AND task_run.state_id IS NULL;
+            END IF;
+
+            RETURN n_created;
+        END;
+        $$;
+
+        -- task runs are created with the flow run unless lazy task runs are enabled
+        -- for its flow group or, if the flow group doesn't say, for its tenant
+        CREATE OR REPLACE FUNCTION public.insert_task_runs_after_flow_run_insert() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+            BEGIN
+                IF NOT COALESCE(
+                    (
+                        SELECT (flow_group.settings->>'lazy_task_runs_enabled')::boolean
+                        FROM flow
+                        INNER JOIN flow_group ON flow_group.id = flow.flow_group_id
+                        WHERE flow.id = NEW.flow_id
+                    ),
+                    (
+                        SELECT (tenant.settings->>'lazy_task_runs_enabled')::boolean
+                        FROM tenant
+                        WHERE tenant.id = NEW.tenant_id
+                    ),
+                    false
+                ) THEN
+                    PERFORM utility.create_task_runs(NEW.id);
+                END IF;
+            RETURN NEW;
+            END;
+            $$;
+        """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION public.insert_task_runs_after_flow_run_insert() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+            BEGIN
+                -- create task runs for each of the tasks in the new flow run's
+                -- flow
+                INSERT INTO task_run (tenant_id, flow_run_id, task_id, cache_key, map_index)
+                SELECT NEW.tenant_id, NEW.id, task.id, task.cache_key, -1
+                FROM task
+                WHERE task.flow_id = NEW.flow_id;
+                -- create corresponding states for each of the new task runs
+                INSERT INTO task_run_state(tenant_id, task_run_id, state, message, serialized_state)
+                SELECT NEW.tenant_id, task_run.id, 'Pending', 'Task run created', '{"type": "Pending", "message": "Task run created"}'
+                FROM task_run
+                WHERE task_run.flow_run_id = NEW.id;
+            RETURN NEW;
+            END;
+            $$;
+
+        DROP FUNCTION utility.create_task_runs(UUID);
+        """
+    )
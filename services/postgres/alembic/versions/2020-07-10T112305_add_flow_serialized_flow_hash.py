@@ -0,0 +1,32 @@
+"""
+Add flow serialized flow hash
+
+Revision ID: 704c583a3f5b
+Revises: 6b0a9f3e2c71
+Create Date: 2020-07-10 11:23:05.847113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+# revision identifiers, used by Alembic.
+revision = "704c583a3f5b"
+down_revision = "6b0a9f3e2c71"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("flow", sa.Column("serialized_flow_hash", sa.String()))
+    op.create_index(
+        "ix_flow__version_group_id_serialized_flow_hash",
+        "flow",
+        ["version_group_id", "serialized_flow_hash"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_flow__version_group_id_serialized_flow_hash", table_name="flow")
+    op.drop_column("flow", "serialized_flow_hash")
@@ -0,0 +1,36 @@
+"""
+Add flow schedule next due time
+
+Revision ID: 44d24c132ccd
+Revises: 704c583a3f5b
+Create Date: 2020-07-13 16:04:52.331870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+# revision identifiers, used by Alembic.
+revision = "44d24c132ccd"
+down_revision = "704c583a3f5b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "flow", sa.Column("schedule_next_due_time", sa.TIMESTAMP(timezone=True))
+    )
+    # the scheduler only looks at active, unarchived schedules
+    op.create_index(
+        "ix_flow__schedule_next_due_time",
+        "flow",
+        ["schedule_next_due_time"],
+        postgresql_where=sa.text("is_schedule_active AND NOT archived"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_flow__schedule_next_due_time", table_name="flow")
+    op.drop_column("flow", "schedule_next_due_time")
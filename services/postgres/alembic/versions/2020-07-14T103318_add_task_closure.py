@@ -0,0 +1,244 @@
+"""
+Add task closure
+
+Revision ID: 3996bdd0e028
+Revises: 44d24c132ccd
+Create Date: 2020-07-14 10:33:18.529016
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+# revision identifiers, used by Alembic.
+revision = "3996bdd0e028"
+down_revision = "44d24c132ccd"
+branch_labels = None
+depends_on = None
+
+# the original traversal functions, restored on downgrade
+TRAVERSAL_CTE = """
+        CREATE OR REPLACE FUNCTION utility.{direction}_tasks(start_task_ids UUID[], depth_limit integer default 50)
+        RETURNS SETOF utility.traversal AS
+
+        $$
+        with recursive traverse(tenant_id, task_id, depth) AS (
+            SELECT
+                -- a tenant id
+                task.tenant_id,
+
+                -- a task id
+                task.id,
+
+                -- the depth
+                0
+
+            FROM task
+
+            -- the starting point
+            WHERE task.id = ANY(start_task_ids)
+
+            UNION
+
+            SELECT
+                -- a tenant id
+                edge.tenant_id,
+
+                -- a new task
+                edge.{next_task}_task_id,
+
+                -- increment the depth
+                traverse.depth + 1
+
+            FROM traverse
+            INNER JOIN edge
+            ON
+                edge.{previous_task}_task_id = traverse.task_id
+            WHERE
+
+                -- limit traversal to the lesser of 50 tasks or the depth_limit
+                traverse.depth < 50
+                AND traverse.depth < depth_limit
+            )
+        SELECT
+            tenant_id,
+            task_id,
+            MAX(traverse.depth) as depth
+        FROM traverse
+
+        -- group by task_id to remove duplicate observations
+        GROUP BY task_id, tenant_id
+
+        -- sort by the last time a task was visited
+        ORDER BY MAX(traverse.depth), task_id, tenant_id
+
+        $$ LANGUAGE sql STABLE;
+"""
+
+# traversal functions that read from the closure table when it has been computed for
+# every start task, and fall back to the recursive traversal otherwise
+TRAVERSAL_CLOSURE = """
+        CREATE OR REPLACE FUNCTION utility.{direction}_tasks(start_task_ids UUID[], depth_limit integer default 50)
+        RETURNS SETOF utility.traversal AS
+
+        $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1
+                FROM unnest(start_task_ids) AS start_task(id)
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM utility.task_closure
+                    WHERE
+                        task_closure.ancestor_task_id = start_task.id
+                        AND task_closure.descendant_task_id = start_task.id
+                        AND task_closure.depth = 0
+                )
+            ) THEN
+                RETURN QUERY
+                SELECT
+                    task_closure.tenant_id,
+                    task_closure.{next_task}_task_id,
+                    MAX(task_closure.depth)
+                FROM utility.task_closure
+                WHERE
+                    task_closure.{previous_task}_task_id = ANY(start_task_ids)
+                    -- match the recursive traversal's limits
+                    AND task_closure.depth <= GREATEST(LEAST(depth_limit, 50), 0)
+                GROUP BY task_closure.{next_task}_task_id, task_closure.tenant_id
+                ORDER BY
+                    MAX(task_closure.depth),
+                    task_closure.{next_task}_task_id,
+                    task_closure.tenant_id;
+            ELSE
+                RETURN QUERY
+                with recursive traverse(tenant_id, task_id, depth) AS (
+                    SELECT task.tenant_id, task.id, 0
+                    FROM task
+                    WHERE task.id = ANY(start_task_ids)
+
+                    UNION
+
+                    SELECT edge.tenant_id, edge.{next_edge_task}_task_id, traverse.depth + 1
+                    FROM traverse
+                    INNER JOIN edge
+                    ON edge.{previous_edge_task}_task_id = traverse.task_id
+                    WHERE
+                        traverse.depth < 50
+                        AND traverse.depth < depth_limit
+                    )
+                SELECT
+                    traverse.tenant_id,
+                    traverse.task_id,
+                    MAX(traverse.depth)
+                FROM traverse
+                GROUP BY traverse.task_id, traverse.tenant_id
+                ORDER BY MAX(traverse.depth), traverse.task_id, traverse.tenant_id;
+            END IF;
+        END;
+        $$ LANGUAGE plpgsql STABLE;
+"""
+
+
+def upgrade():
+    op.create_table(
+        "task_closure",
+        sa.Column("tenant_id", UUID),
+        sa.Column(
+            "ancestor_task_id",
+            UUID,
+            sa.ForeignKey("task.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "descendant_task_id",
+            UUID,
+            sa.ForeignKey("task.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        # one row for every distinct path length between the two tasks, so that
+        # depth-limited traversals match the recursive traversal exactly
+        sa.Column("depth", sa.Integer, nullable=False),
+        sa.PrimaryKeyConstraint("ancestor_task_id", "descendant_task_id", "depth"),
+        schema="utility",
+    )
+    op.create_index(
+        "ix_task_closure__descendant_task_id_depth",
+        "task_closure",
+        ["descendant_task_id", "depth"],
+        schema="utility",
+    )
+
+    op.execute(
+        """
+        CREATE FUNCTION utility.insert_task_closure(flow_id UUID)
+        RETURNS integer
+        LANGUAGE plpgsql
+        VOLATILE
+        AS $$
+        DECLARE
+            n_inserted integer;
+        BEGIN
+            INSERT INTO utility.task_closure (tenant_id, ancestor_task_id, descendant_task_id, depth)
+            WITH RECURSIVE traverse(tenant_id, ancestor_task_id, descendant_task_id, depth) AS (
+                SELECT task.tenant_id, task.id, task.id, 0
+                FROM task
+                WHERE task.flow_id = insert_task_closure.flow_id
+
+                UNION
+
+                SELECT
+                    traverse.tenant_id,
+                    traverse.ancestor_task_id,
+                    edge.downstream_task_id,
+                    traverse.depth + 1
+                FROM traverse
+                INNER JOIN edge
+                ON edge.upstream_task_id = traverse.descendant_task_id
+                -- traversals never go deeper than 50
+                WHERE traverse.depth < 50
+            )
+            SELECT tenant_id, ancestor_task_id, descendant_task_id, depth
+            FROM traverse
+            ON CONFLICT DO NOTHING;
+
+            GET DIAGNOSTICS n_inserted = ROW_COUNT;
+            RETURN n_inserted;
+        END;
+        $$;
+        """
+    )
+
+    op.execute(
+        TRAVERSAL_CLOSURE.format(
+            direction="downstream",
+            next_task="descendant",
+            previous_task="ancestor",
+            next_edge_task="downstream",
+            previous_edge_task="upstream",
+        )
+    )
+    op.execute(
+        TRAVERSAL_CLOSURE.format(
+            direction="upstream",
+            next_task="ancestor",
+            previous_task="descendant",
+            next_edge_task="upstream",
+            previous_edge_task="downstream",
+        )
+    )
+
+
+def downgrade():
+    op.execute(
+        TRAVERSAL_CTE.format(
+            direction="downstream", next_task="downstream", previous_task="upstream"
+        )
+    )
+    op.execute(
+        TRAVERSAL_CTE.format(
+            direction="upstream", next_task="upstream", previous_task="downstream"
+        )
+    )
+    op.execute("DROP FUNCTION utility.insert_task_closure(UUID);")
+    op.drop_table("task_closure", schema="utility")
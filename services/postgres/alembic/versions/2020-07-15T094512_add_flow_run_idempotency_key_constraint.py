@@ -0,0 +1,48 @@
+"""
+Add flow run idempotency key constraint
+
+Revision ID: 9ae3a4d1c2b7
+Revises: 3996bdd0e028
+Create Date: 2020-07-15 09:45:12.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+# revision identifiers, used by Alembic.
+revision = "9ae3a4d1c2b7"
+down_revision = "3996bdd0e028"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # keys were previously only checked, not enforced, so release any duplicated key
+    # from all but the most recent run that holds it
+    op.execute(
+        """
+        UPDATE flow_run
+        SET idempotency_key = NULL
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY flow_id, idempotency_key ORDER BY created DESC
+            ) AS n
+            FROM flow_run
+            WHERE idempotency_key IS NOT NULL
+        ) AS ranked
+        WHERE flow_run.id = ranked.id AND ranked.n > 1
+        """
+    )
+
+    # NULL keys are distinct, so runs without a key are unaffected
+    op.create_unique_constraint(
+        "flow_run_flow_id_idempotency_key_key",
+        "flow_run",
+        ["flow_id", "idempotency_key"],
+    )
+
+
+def downgrade():
+    op.drop_constraint("flow_run_flow_id_idempotency_key_key", "flow_run")
@@ -0,0 +1,83 @@
+"""
+Add flow run task runs function
+
+Revision ID: 5f2c8e1d7a40
+Revises: 9ae3a4d1c2b7
+Create Date: 2020-07-16 10:18:34.127503
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+# revision identifiers, used by Alembic.
+revision = "5f2c8e1d7a40"
+down_revision = "9ae3a4d1c2b7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE FUNCTION utility.flow_run_task_runs(flow_run_id UUID)
+        RETURNS SETOF task_run
+        LANGUAGE sql
+        STABLE
+        AS $$
+            -- the flow run's existing task runs
+            SELECT task_run.*
+            FROM task_run
+            WHERE task_run.flow_run_id = flow_run_task_runs.flow_run_id
+
+            UNION ALL
+
+            -- a Pending placeholder for each task that doesn't have a task run yet,
+            -- which is the case for every task of a lazy flow run that hasn't started
+            -- running. Placeholders have no id, since they don't exist.
+            SELECT
+                NULL::uuid,              -- id
+                flow_run.tenant_id,
+                flow_run.created,
+                flow_run.id,             -- flow_run_id
+                task.id,                 -- task_id
+                -1,                      -- map_index
+                0,                       -- version
+                NULL::timestamptz,       -- heartbeat
+                NULL::timestamptz,       -- start_time
+                NULL::timestamptz,       -- end_time
+                NULL::interval,          -- duration
+                0,                       -- run_count
+                'Pending',               -- state
+                flow_run.created,        -- state_timestamp
+                'Task run created',      -- state_message
+                NULL::jsonb,             -- state_result
+                NULL::timestamptz,       -- state_start_time
+                '{"type": "Pending", "message": "Task run created"}'::jsonb,
+                task.cache_key,
+                flow_run.created,        -- updated
+                NULL::uuid               -- state_id
+            FROM flow_run
+            INNER JOIN task ON task.flow_id = flow_run.flow_id
+            WHERE
+                flow_run.id = flow_run_task_runs.flow_run_id
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM task_run
+                    WHERE
+                        task_run.flow_run_id = flow_run.id
+                        AND task_run.task_id = task.id
+                        AND task_run.map_index = -1
+                );
+        $$;
+        """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        DROP FUNCTION utility.flow_run_task_runs(UUID);
+        """
+    )
@@ -0,0 +1,114 @@
+"""
+Add insert idempotent flow run function
+
+Revision ID: a3e7d19c54f2
+Revises: 5f2c8e1d7a40
+Create Date: 2020-07-16 14:35:08.906214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+# revision identifiers, used by Alembic.
+revision = "a3e7d19c54f2"
+down_revision = "5f2c8e1d7a40"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE FUNCTION utility.insert_idempotent_flow_run(
+            run jsonb, states jsonb, key_ttl interval
+        )
+        RETURNS uuid
+        LANGUAGE plpgsql
+        VOLATILE
+        AS $$
+        DECLARE
+            new_run flow_run := jsonb_populate_record(NULL::flow_run, run);
+            inserted_id uuid;
+        BEGIN
+            -- keys are only respected for key_ttl, so release the key from an expired
+            -- run before inserting
+            UPDATE flow_run
+            SET idempotency_key = NULL
+            WHERE
+                flow_run.flow_id = new_run.flow_id
+                AND flow_run.idempotency_key = new_run.idempotency_key
+                AND flow_run.created <= now() - key_ttl;
+
+            INSERT INTO flow_run (
+                id,
+                tenant_id,
+                flow_id,
+                parameters,
+                context,
+                scheduled_start_time,
+                name,
+                idempotency_key
+            )
+            VALUES (
+                new_run.id,
+                new_run.tenant_id,
+                new_run.flow_id,
+                new_run.parameters,
+                new_run.context,
+                new_run.scheduled_start_time,
+                new_run.name,
+                new_run.idempotency_key
+            )
+            ON CONFLICT ON CONSTRAINT flow_run_flow_id_idempotency_key_key DO NOTHING
+            RETURNING flow_run.id INTO inserted_id;
+
+            -- a run with the same key exists: return it. A concurrent insert of that
+            -- run commits its states in the same transaction, so they are visible too.
+            IF inserted_id IS NULL THEN
+                RETURN (
+                    SELECT flow_run.id
+                    FROM flow_run
+                    WHERE
+                        flow_run.flow_id = new_run.flow_id
+                        AND flow_run.idempotency_key = new_run.idempotency_key
+                );
+            END IF;
+
+            INSERT INTO flow_run_state (
+                tenant_id,
+                flow_run_id,
+                version,
+                state,
+                "timestamp",
+                message,
+                result,
+                start_time,
+                serialized_state
+            )
+            SELECT
+                s.tenant_id,
+                inserted_id,
+                s.version,
+                s.state,
+                s."timestamp",
+                s.message,
+                s.result,
+                s.start_time,
+                s.serialized_state
+            FROM jsonb_populate_recordset(NULL::flow_run_state, states) AS s;
+
+            RETURN inserted_id;
+        END;
+        $$;
+        """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        DROP FUNCTION utility.insert_idempotent_flow_run(jsonb, jsonb, interval);
+        """
+    )
@@ -0,0 +1,91 @@
+"""
+Add get or create task run function
+
+Revision ID: c81f4e2b9d63
+Revises: a3e7d19c54f2
+Create Date: 2020-07-17 09:14:42.318702
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+# revision identifiers, used by Alembic.
+revision = "c81f4e2b9d63"
+down_revision = "a3e7d19c54f2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE FUNCTION utility.get_or_create_task_run(
+            tenant_id UUID,
+            flow_run_id UUID,
+            task_id UUID,
+            map_index INTEGER,
+            cache_key VARCHAR
+        )
+        RETURNS uuid
+        LANGUAGE plpgsql
+        VOLATILE
+        AS $$
+        DECLARE
+            inserted_id uuid;
+        BEGIN
+            INSERT INTO task_run (tenant_id, flow_run_id, task_id, map_index, cache_key)
+            VALUES (
+                get_or_create_task_run.tenant_id,
+                get_or_create_task_run.flow_run_id,
+                get_or_create_task_run.task_id,
+                get_or_create_task_run.map_index,
+                get_or_create_task_run.cache_key
+            )
+            ON CONFLICT ON CONSTRAINT task_run_unique_identifier_key DO NOTHING
+            RETURNING task_run.id INTO inserted_id;
+
+            -- the task run exists: return it. A concurrent insert of that run commits
+            -- its Pending state in the same transaction, so it is visible too.
+            IF inserted_id IS NULL THEN
+                RETURN (
+                    SELECT task_run.id
+                    FROM task_run
+                    WHERE
+                        task_run.flow_run_id = get_or_create_task_run.flow_run_id
+                        AND task_run.task_id = get_or_create_task_run.task_id
+                        AND task_run.map_index = get_or_create_task_run.map_index
+                );
+            END IF;
+
+            INSERT INTO task_run_state (
+                tenant_id,
+                task_run_id,
+                state,
+                message,
+                serialized_state
+            )
+            VALUES (
+                get_or_create_task_run.tenant_id,
+                inserted_id,
+                'Pending',
+                'Task run created',
+                '{"type": "Pending", "message": "Task run created"}'
+            );
+
+            RETURN inserted_id;
+        END;
+        $$;
+        """
+    )
+
+
+def downgrade():
+    op.execute(
+        """
+        DROP FUNCTION utility.get_or_create_task_run(
+            UUID, UUID, UUID, INTEGER, VARCHAR
+        );
+        """
+    )
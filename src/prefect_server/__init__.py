@@ -1,3 +1,4 @@
+import importlib as _importlib
 import sys as _sys
 
 if _sys.version_info < (3, 7):
@@ -5,9 +6,17 @@ if _sys.version_info < (3, 7):
 
 from prefect_server.configuration import config
 
-import prefect_server.utilities
-import prefect_server.database
-import prefect_server.api
+# subpackages are imported on first access, so that entrypoints (like the CLI) only
+# import what they use. Anything that calls `prefect.api` must import
+# `prefect_server.api` first, which registers the API.
+_LAZY_SUBPACKAGES = {"api", "cli", "database", "graphql", "services", "utilities"}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_SUBPACKAGES:
+        return _importlib.import_module(f"prefect_server.{name}")
+    raise AttributeError(f"module 'prefect_server' has no attribute {name!r}")
+
 
 # -------------------------------------------
 # versioneer - automatic versioning
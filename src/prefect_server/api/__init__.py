@@ -1,3 +1,4 @@
+import prefect_server.api.metadata
 import prefect_server.api.tenants
 import prefect_server.api.projects
 import prefect_server.api.flow_groups
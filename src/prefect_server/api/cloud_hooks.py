@@ -1,7 +1,6 @@
 import asyncio
-import json
 import uuid
-from typing import List
+from typing import Any, Callable, List
 
 import httpx
 from box import Box
@@ -187,12 +186,21 @@ async def call_hooks(event: events.FlowRunStateChange):
         except Exception as exc:
             logger.error(exc)
 
+    # payloads are built at most once per event and shared by every matching hook
+    payloads = EventPayloads(event)
+
     tasks = []
     for hook in await _get_matching_hooks(event=event):
         if hook.type == "WEBHOOK":
-            tasks.append(_call_webhook(url=hook.config["url"], event=event))
+            tasks.append(
+                _call_webhook(url=hook.config["url"], event=event, payloads=payloads)
+            )
         if hook.type == "SLACK_WEBHOOK":
-            tasks.append(_call_slack_webhook(url=hook.config["url"], event=event))
+            tasks.append(
+                _call_slack_webhook(
+                    url=hook.config["url"], event=event, payloads=payloads
+                )
+            )
         if hook.type == "TWILIO":
             tasks.append(
                 _call_twilio(
@@ -201,6 +209,7 @@ async def call_hooks(event: events.FlowRunStateChange):
                     messaging_service_sid=hook.config["messaging_service_sid"],
                     to=hook.config["to"],
                     event=event,
+                    payloads=payloads,
                 )
             )
         if hook.type == "PAGERDUTY":
@@ -210,6 +219,7 @@ async def call_hooks(event: events.FlowRunStateChange):
                     routing_key=hook.config["routing_key"],
                     severity=hook.config["severity"],
                     event=event,
+                    payloads=payloads,
                 )
             )
         if hook.type == "PREFECT_MESSAGE":
@@ -253,47 +263,135 @@ async def _get_matching_hooks(event: events.FlowRunStateChange) -> List[Box]:
     return hooks
 
 
-async def _call_webhook(url: str, event: events.FlowRunStateChange):
-    await cloud_hook_httpx_client.post(
-        url,
-        json=dict(event=json.loads(event.json())),
-        headers={"X-PREFECT-EVENT-ID": event.id},
-        timeout=2,
-    )
+class EventPayloads:
+    """
+    Lazily builds and caches the request bodies that cloud hooks send for a single event.
 
+    Every hook that matches an event receives the same body (only headers, URLs and
+    credentials differ between hooks), so serializing the event once and sharing the
+    result avoids repeating the pydantic serialization for every hook.
 
-async def _call_slack_webhook(url: str, event: events.FlowRunStateChange):
-    message_link = (
-        f"{server_config.api.url}/{event.tenant.slug}/flow-run/{event.flow_run.id}"
-    )
-    slack_message = {
-        "blocks": [
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"Run `{event.flow_run.name}` of flow `{event.flow.name}` entered a new state:",
+    Args:
+        - event (events.FlowRunStateChange): the event to build payloads for
+    """
+
+    def __init__(self, event: events.FlowRunStateChange):
+        self.event = event
+        self._cache = {}  # type: dict
+
+    def _get(self, key: str, build: Callable[[], Any]) -> Any:
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    @property
+    def link(self) -> str:
+        return self._get(
+            "link",
+            lambda: f"{server_config.api.url}/{self.event.tenant.slug}/flow-run/{self.event.flow_run.id}",
+        )
+
+    @property
+    def webhook_body(self) -> bytes:
+        """
+        The JSON-encoded webhook body, `{"event": <event>}`
+        """
+        return self._get(
+            "webhook_body", lambda: f'{{"event": {self.event.json()}}}'.encode()
+        )
+
+    @property
+    def slack_message(self) -> dict:
+        return self._get("slack_message", self._build_slack_message)
+
+    @property
+    def twilio_body(self) -> str:
+        return self._get("twilio_body", self._build_twilio_body)
+
+    @property
+    def pagerduty_payload(self) -> dict:
+        """
+        The PagerDuty event payload, excluding the hook-specific `severity`
+        """
+        return self._get("pagerduty_payload", self._build_pagerduty_payload)
+
+    def _build_slack_message(self) -> dict:
+        event = self.event
+        return {
+            "blocks": [
+                {
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": f"Run `{event.flow_run.name}` of flow `{event.flow.name}` entered a new state:",
+                    },
                 },
-            },
-            {
-                "type": "section",
-                "text": {"type": "mrkdwn", "text": f"*State:* `{event.state.state}`"},
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*Message:* {event.state.serialized_state['message']}",
+                {
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": f"*State:* `{event.state.state}`",
+                    },
                 },
+                {
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": f"*Message:* {event.state.serialized_state['message']}",
+                    },
+                },
+                {
+                    "type": "section",
+                    "text": {"type": "mrkdwn", "text": f"*Link:* {self.link}"},
+                },
+            ]
+        }
+
+    def _build_twilio_body(self) -> str:
+        event = self.event
+        message_text = f"Run {event.flow_run.name} of flow {event.flow.name} entered a new state: {event.state.state}. \n Link: "
+        return f"{message_text}{self.link}"
+
+    def _build_pagerduty_payload(self) -> dict:
+        event = self.event
+        tenant_slug = event.tenant.slug
+        state = event.state.state
+        flow_run = event.flow_run.name
+        flow_name = event.flow.name
+
+        return {
+            "summary": f"Run {flow_run} entered a new state: {state}",
+            "source": f"cloud.prefect.io/{tenant_slug}",
+            "component": flow_name,
+            "group": flow_run,
+            "class": f"State->{state}",
+            "custom_details": {
+                "flow": flow_name,
+                "flow_run": flow_run,
+                "state": state,
+                "state_message": event.state.serialized_state["message"] or "",
+                "tenant_slug": tenant_slug,
             },
-            {
-                "type": "section",
-                "text": {"type": "mrkdwn", "text": f"*Link:* {message_link}"},
-            },
-        ]
-    }
+        }
+
+
+async def _call_webhook(
+    url: str, event: events.FlowRunStateChange, payloads: EventPayloads = None
+):
+    payloads = payloads or EventPayloads(event)
+    await cloud_hook_httpx_client.post(
+        url,
+        data=payloads.webhook_body,
+        headers={"X-PREFECT-EVENT-ID": event.id, "Content-Type": "application/json"},
+        timeout=2,
+    )
 
-    result = await cloud_hook_httpx_client.post(url, json=slack_message, timeout=1)
+
+async def _call_slack_webhook(
+    url: str, event: events.FlowRunStateChange, payloads: EventPayloads = None
+):
+    payloads = payloads or EventPayloads(event)
+    await cloud_hook_httpx_client.post(url, json=payloads.slack_message, timeout=1)
 
 
 async def _call_twilio(
@@ -302,21 +400,18 @@ async def _call_twilio(
     messaging_service_sid: str,
     to: List[str],
     event: events.FlowRunStateChange,
+    payloads: EventPayloads = None,
 ):
-
-    message_text = f"Run {event.flow_run.name} of flow {event.flow.name} entered a new state: {event.state.state}. \n Link: "
-    message_link = (
-        f"{server_config.api.url}/{event.tenant.slug}/flow-run/{event.flow_run.id}"
-    )
+    payloads = payloads or EventPayloads(event)
 
     # send messages for each number in the to list
     for phone_number in to:
-        result = await cloud_hook_httpx_client.post(
+        await cloud_hook_httpx_client.post(
             f"https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Messages.json",
             data={
                 "To": phone_number,
                 "From": messaging_service_sid,
-                "Body": f"{message_text}{message_link}",
+                "Body": payloads.twilio_body,
             },
             auth=(account_sid, auth_token),
             timeout=2,
@@ -324,35 +419,20 @@ async def _call_twilio(
 
 
 async def _call_pagerduty(
-    api_token: str, routing_key: str, severity: str, event: events.FlowRunStateChange
+    api_token: str,
+    routing_key: str,
+    severity: str,
+    event: events.FlowRunStateChange,
+    payloads: EventPayloads = None,
 ):
-
-    tenant_slug = event.tenant.slug
-    state = event.state.state
-    state_message = event.state.serialized_state["message"] or ""
+    payloads = payloads or EventPayloads(event)
     flow_run = event.flow_run.name
-    flow_name = event.flow.name
-    link = f"{server_config.api.url}/{tenant_slug}/flow-run/{event.flow_run.id}"
 
     msg = {
         "routing_key": routing_key,
         "event_action": "trigger",
-        "payload": {
-            "summary": f"Run {flow_run} entered a new state: {state}",
-            "severity": severity,
-            "source": f"cloud.prefect.io/{tenant_slug}",
-            "component": flow_name,
-            "group": flow_run,
-            "class": f"State->{state}",
-            "custom_details": {
-                "flow": flow_name,
-                "flow_run": flow_run,
-                "state": state,
-                "state_message": state_message,
-                "tenant_slug": tenant_slug,
-            },
-        },
-        "links": [{"href": link, "text": f"Flow Run {flow_run}"}],
+        "payload": dict(payloads.pagerduty_payload, severity=severity),
+        "links": [{"href": payloads.link, "text": f"Flow Run {flow_run}"}],
     }
 
     await cloud_hook_httpx_client.post(
@@ -29,6 +29,7 @@ async def set_flow_group_default_parameters(
     result = await models.FlowGroup.where(id=flow_group_id).update(
         set=dict(default_parameters=parameters)
     )
+    await api.metadata.invalidate(flow_group_ids=[flow_group_id])
     return bool(result.affected_rows)
 
 
@@ -65,6 +66,10 @@ async def set_flow_group_schedule(flow_group_id: str, clocks: List[dict]) -> boo
             "auto_scheduled": {"_eq": True},
         }
     ).delete()
+    # the scheduler should visit the flow group's flows on its next pass
+    await models.Flow.where({"flow_group_id": {"_eq": flow_group_id}}).update(
+        set={"schedule_next_due_time": None}
+    )
     return bool(result.affected_rows)
 
 
@@ -95,6 +100,10 @@ async def delete_flow_group_schedule(flow_group_id: str) -> bool:
             "auto_scheduled": {"_eq": True},
         }
     ).delete()
+    # the scheduler should visit the flow group's flows on its next pass
+    await models.Flow.where({"flow_group_id": {"_eq": flow_group_id}}).update(
+        set={"schedule_next_due_time": None}
+    )
 
     return bool(result.affected_rows)
 
@@ -1,4 +1,6 @@
 import datetime
+import hashlib
+import json
 import uuid
 from typing import Any, Dict, List
 
@@ -6,17 +8,23 @@ import pendulum
 from packaging import version as module_version
 from pydantic import BaseModel, Field, validator
 
+import prefect
+from prefect.schedules import Schedule
 from prefect.serialization.schedule import ScheduleSchema
-from prefect.utilities.graphql import with_args
+from prefect.utilities.graphql import EnumValue, with_args
 from prefect import api
 from prefect_server import config
-from prefect_server.database import models
+from prefect_server.database import models, postgres
 from prefect_server.utilities import logging
+from prefect_server.utilities.cache import LRUCache
 from prefect.utilities.plugins import register_api
 
 logger = logging.get_logger("api.flows")
 schedule_schema = ScheduleSchema()
 
+# schedule content hash -> deserialized Schedule
+schedule_cache = LRUCache(maxsize=config.caches.schedules)
+
 # -----------------------------------------------------
 # Schema for deserializing flows
 # -----------------------------------------------------
@@ -130,7 +138,8 @@ async def _update_flow_setting(flow_id: str, key: str, value: any) -> models.Flo
 
     # retrieve current settings so that we only update provided keys
     flow = await models.Flow.where(id=flow_id).first(
-        selection_set={"version_group_id": True, "flow_group": {"id", "settings"}}
+        selection_set={"version_group_id": True, "flow_group": {"id", "settings"}},
+        consistent=True,
     )
 
     # if we don't have permission to view the flow, we shouldn't be able to update it
@@ -147,10 +156,33 @@ async def _update_flow_setting(flow_id: str, key: str, value: any) -> models.Flo
 
     if not result.affected_rows:
         raise ValueError("Settings update failed")
+    await api.metadata.invalidate(flow_group_ids=[flow.flow_group.id])
 
     return models.FlowGroup(**result.returning[0])
 
 
+def _hash_json(value: Any) -> str:
+    """
+    A hash of a JSON-compatible value (like a serialized flow or schedule) that doesn't
+    depend on the order of its keys
+    """
+    normalized = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def _load_schedule(serialized_schedule: dict) -> Schedule:
+    """
+    Deserializes a schedule. Schedules are cached by content, so the many flows that
+    share a schedule (and every scheduler pass over them) only deserialize it once.
+    """
+    key = _hash_json(serialized_schedule)
+    schedule = schedule_cache.get(key)
+    if schedule is None:
+        schedule = schedule_schema.load(serialized_schedule)
+        schedule_cache.set(key, schedule)
+    return schedule
+
+
 @register_api("flows.create_flow")
 async def create_flow(
     serialized_flow: dict,
@@ -158,6 +190,7 @@ async def create_flow(
     version_group_id: str = None,
     set_schedule_active: bool = True,
     description: str = None,
+    deduplicate: bool = None,
 ) -> str:
     """
     Add a flow to the database.
@@ -168,6 +201,9 @@ async def create_flow(
         - version_group_id (str): A version group to add the Flow to
         - set_schedule_active (bool): Whether to set the flow's schedule to active
         - description (str): a description of the flow being created
+        - deduplicate (bool): if True and the latest version in the version group is
+            identical to this flow, no new version is created and the latest version's
+            id is returned. Defaults to `flows.deduplicate_registrations`.
 
     Returns:
         str: The id of the new flow
@@ -190,11 +226,48 @@ async def create_flow(
         )
 
     # load project
-    project = await models.Project.where(id=project_id).first({"tenant_id"})
+    project = await models.Project.where(id=project_id).first(
+        {"tenant_id"}, consistent=True
+    )
     if not project:
         raise ValueError("Invalid project.")
     tenant_id = project.tenant_id  # type: ignore
 
+    serialized_flow_hash = _hash_json(serialized_flow)
+    if deduplicate is None:
+        deduplicate = config.flows.deduplicate_registrations
+    if deduplicate and version_group_id:
+        latest_version = await models.Flow.where(
+            {
+                "version_group_id": {"_eq": version_group_id},
+                "tenant_id": {"_eq": tenant_id},
+            }
+        ).first(
+            {
+                "id",
+                "project_id",
+                "archived",
+                "is_schedule_active",
+                "description",
+                "serialized_flow_hash",
+            },
+            order_by={"version": EnumValue("desc")},
+            consistent=True,
+        )
+        if (
+            latest_version is not None
+            and not latest_version.archived
+            and latest_version.serialized_flow_hash == serialized_flow_hash
+            and latest_version.project_id == project_id
+            and latest_version.is_schedule_active == set_schedule_active
+            and latest_version.description == description
+        ):
+            logger.debug(
+                f"Flow {latest_version.id} is identical to the registered flow; "
+                "skipping registration."
+            )
+            return latest_version.id
+
     # check required parameters - can't load a flow that has required params and a shcedule
     # NOTE: if we allow schedules to be set via UI in the future, we might skip or
     # refactor this check
@@ -206,16 +279,18 @@ async def create_flow(
         ):
             raise ValueError("Can not schedule a flow that has required parameters.")
 
-    # set up task detail info
+    # set up task detail info; every lookup is by slug so this is linear in the size
+    # of the graph
     task_lookup = {t.slug: t for t in flow.tasks}
     tasks_with_upstreams = {e.downstream_task for e in flow.edges}
     tasks_with_downstreams = {e.upstream_task for e in flow.edges}
+    mapped_tasks = {e.downstream_task for e in flow.edges if e.mapped}
     reference_tasks = set(flow.reference_tasks) or {
         t.slug for t in flow.tasks if t.slug not in tasks_with_downstreams
     }
 
     for t in flow.tasks:
-        t.mapped = any(e.mapped for e in flow.edges if e.downstream_task == t.slug)
+        t.mapped = t.slug in mapped_tasks
         t.is_reference_task = t.slug in reference_tasks
         t.is_root_task = t.slug not in tasks_with_upstreams
         t.is_terminal_task = t.slug not in tasks_with_downstreams
@@ -234,7 +309,7 @@ async def create_flow(
                 {"name": {"_eq": version_group_id}},
             ]
         }
-    ).first()
+    ).first(consistent=True)
     if flow_group is None:
         flow_group_id = await models.FlowGroup(
             tenant_id=tenant_id,
@@ -248,14 +323,48 @@ async def create_flow(
     else:
         flow_group_id = flow_group.id
 
-    version = (await models.Flow.where(version_where).max({"version"}))["version"] or 0
+    version = (
+        await models.Flow.where(version_where).max({"version"}, consistent=True)
+    )["version"] or 0
 
     # precompute task ids to make edges easy to add to database
-    flow_id = await models.Flow(
+    tasks = [
+        models.Task(
+            id=t.id,
+            tenant_id=tenant_id,
+            name=t.name,
+            slug=t.slug,
+            type=t.type,
+            max_retries=t.max_retries,
+            tags=t.tags,
+            retry_delay=t.retry_delay,
+            trigger=t.trigger,
+            mapped=t.mapped,
+            auto_generated=t.auto_generated,
+            cache_key=t.cache_key,
+            is_reference_task=t.is_reference_task,
+            is_root_task=t.is_root_task,
+            is_terminal_task=t.is_terminal_task,
+        )
+        for t in flow.tasks
+    ]
+    edges = [
+        models.Edge(
+            tenant_id=tenant_id,
+            upstream_task_id=task_lookup[e.upstream_task].id,
+            downstream_task_id=task_lookup[e.downstream_task].id,
+            key=e.key,
+            mapped=e.mapped,
+        )
+        for e in flow.edges
+    ]
+    new_flow = models.Flow(
+        id=str(uuid.uuid4()),
         tenant_id=tenant_id,
         project_id=project_id,
         name=flow.name,
         serialized_flow=serialized_flow,
+        serialized_flow_hash=serialized_flow_hash,
         environment=flow.environment,
         core_version=flow.environment.get("__version__"),
         storage=flow.storage,
@@ -267,37 +376,20 @@ async def create_flow(
         description=description,
         schedule=serialized_flow.get("schedule"),
         is_schedule_active=set_schedule_active,
-        tasks=[
-            models.Task(
-                id=t.id,
-                tenant_id=tenant_id,
-                name=t.name,
-                slug=t.slug,
-                type=t.type,
-                max_retries=t.max_retries,
-                tags=t.tags,
-                retry_delay=t.retry_delay,
-                trigger=t.trigger,
-                mapped=t.mapped,
-                auto_generated=t.auto_generated,
-                cache_key=t.cache_key,
-                is_reference_task=t.is_reference_task,
-                is_root_task=t.is_root_task,
-                is_terminal_task=t.is_terminal_task,
-            )
-            for t in flow.tasks
-        ],
-        edges=[
-            models.Edge(
-                tenant_id=tenant_id,
-                upstream_task_id=task_lookup[e.upstream_task].id,
-                downstream_task_id=task_lookup[e.downstream_task].id,
-                key=e.key,
-                mapped=e.mapped,
-            )
-            for e in flow.edges
-        ],
-    ).insert()
+    )
+
+    chunk_size = config.flows.registration_chunk_size
+    if len(tasks) + len(edges) <= chunk_size:
+        new_flow.tasks = tasks
+        new_flow.edges = edges
+        flow_id = await new_flow.insert()
+    else:
+        flow_id = await _insert_flow_in_chunks(
+            flow=new_flow, tasks=tasks, edges=edges, chunk_size=chunk_size
+        )
+
+    if config.flows.precompute_task_closure:
+        await compute_task_closure(flow_id=flow_id)
 
     # schedule runs
     if set_schedule_active:
@@ -306,6 +398,90 @@ async def create_flow(
     return flow_id
 
 
+async def _insert_flow_in_chunks(
+    flow: models.Flow,
+    tasks: List[models.Task],
+    edges: List[models.Edge],
+    chunk_size: int,
+) -> str:
+    """
+    Inserts a flow whose tasks and edges are too numerous for a single nested insert.
+
+    Hasura runs each request in its own transaction, so the flow is first inserted as
+    archived (archived flows can't be run or scheduled) and its tasks and edges are
+    inserted in chunks of `chunk_size`. The last chunk is inserted in the same
+    transaction that unarchives the flow. If any step fails, the flow is deleted along
+    with any of its tasks and edges that were already inserted.
+
+    Returns:
+        - str: the id of the flow
+    """
+    flow_id = flow.id
+    flow.archived = True
+    await flow.insert()
+
+    for obj in tasks + edges:
+        obj.flow_id = flow_id
+    chunks = [
+        chunk
+        for objects in [tasks, edges]
+        for chunk in (
+            objects[i : i + chunk_size] for i in range(0, len(objects), chunk_size)
+        )
+    ]
+
+    try:
+        for chunk in chunks[:-1]:
+            await type(chunk[0]).insert_many(chunk, selection_set={"affected_rows"})
+
+        mutations = [
+            await models.Flow.where(id=flow_id).update(
+                set={"archived": False}, alias="unarchive_flow", run_mutation=False
+            )
+        ]
+        if chunks:
+            last_chunk = chunks[-1]
+            mutations.insert(
+                0,
+                await type(last_chunk[0]).insert_many(
+                    last_chunk,
+                    selection_set={"affected_rows"},
+                    alias="insert_last_chunk",
+                    run_mutation=False,
+                ),
+            )
+        await prefect.plugins.hasura.client.execute_mutations_in_transaction(
+            mutations=mutations
+        )
+    except Exception:
+        await models.Flow.where(id=flow_id).delete()
+        raise
+
+    return flow_id
+
+
+@register_api("flows.compute_task_closure")
+async def compute_task_closure(flow_id: str) -> int:
+    """
+    Stores the transitive closure of a flow's task graph, which the
+    `utility.upstream_tasks` and `utility.downstream_tasks` traversals read from
+    instead of walking edges. Flows are immutable, so this only needs to happen once;
+    `create_flow` calls it if `flows.precompute_task_closure` is set, and it can be
+    called for older flows at any time.
+
+    Args:
+        - flow_id (str): the flow id
+
+    Returns:
+        - int: the number of closure rows inserted
+    """
+    if flow_id is None:
+        raise ValueError("Invalid flow id.")
+    return await postgres.fetch_value(
+        "SELECT utility.insert_task_closure(%s)", (flow_id,)
+    )
+
+
 @register_api("flows.delete_flow")
 async def delete_flow(flow_id: str) -> bool:
     """
@@ -325,6 +501,7 @@ async def delete_flow(flow_id: str) -> bool:
 
     # delete the flow
     result = await models.Flow.where(id=flow_id).delete()
+    await api.metadata.invalidate(flow_ids=[flow_id])
     return bool(result.affected_rows)
 
 
@@ -354,6 +531,7 @@ async def archive_flow(flow_id: str) -> bool:
     )
     if not result.affected_rows:
         return False
+    await api.metadata.invalidate(flow_ids=[flow_id])
 
     # delete scheduled flow runs
     await models.FlowRun.where(
@@ -363,6 +541,52 @@ async def archive_flow(flow_id: str) -> bool:
     return True
 
 
+@register_api("flows.archive_flows")
+async def archive_flows(version_group_id: str, except_flow_id: str = None) -> List[str]:
+    """
+    Archives every unarchived flow in a version group, optionally except one (usually
+    the newest version), and deletes their scheduled runs. Everything happens in a
+    single transaction, regardless of the number of versions.
+
+    Args:
+        - version_group_id (str): the version group id
+        - except_flow_id (str, optional): a flow that should not be archived
+
+    Returns:
+        - List[str]: the ids of the archived flows
+
+    Raises:
+        - ValueError: if a version group ID is not provided
+    """
+    if not version_group_id:
+        raise ValueError("Must provide version group ID.")
+
+    where = {
+        "version_group_id": {"_eq": version_group_id},
+        "archived": {"_eq": False},
+    }
+    if except_flow_id:
+        where["id"] = {"_neq": except_flow_id}
+
+    # scheduled runs are deleted first, while their flows still match `where`
+    delete_runs = await models.FlowRun.where(
+        {"flow": where, "state": {"_eq": "Scheduled"}}
+    ).delete(alias="delete_scheduled_flow_runs", run_mutation=False)
+    archive = await models.Flow.where(where).update(
+        set={"archived": True},
+        selection_set={"returning": {"id"}},
+        alias="archive_flows",
+        run_mutation=False,
+    )
+    result = await prefect.plugins.hasura.client.execute_mutations_in_transaction(
+        mutations=[delete_runs, archive]
+    )
+
+    flow_ids = [flow.id for flow in result.data.archive_flows.returning]
+    await api.metadata.invalidate(flow_ids=flow_ids)
+    return flow_ids
+
+
 @register_api("flows.unarchive_flow")
 async def unarchive_flow(flow_id: str) -> bool:
     """
@@ -384,6 +608,7 @@ async def unarchive_flow(flow_id: str) -> bool:
         set={"archived": False},
         selection_set={"affected_rows": True, "returning": {"is_schedule_active"}},
     )
+    await api.metadata.invalidate(flow_ids=[flow_id])
 
     # if the schedule is active, jog it to trigger scheduling
     if result.affected_rows and result.returning[0].is_schedule_active:
@@ -507,6 +732,47 @@ async def disable_lazarus_for_flow(flow_id: str) -> bool:
     return True
 
 
+@register_api("flows.enable_lazy_task_runs_for_flow")
+async def enable_lazy_task_runs_for_flow(flow_id: str) -> bool:
+    """
+    Enables lazy task runs for a flow: task runs are no longer created along with each
+    flow run, but once the flow run starts running.
+
+    Args:
+        - flow_id (str): the flow id
+
+    Returns:
+        - bool: if the update succeeded
+
+    Raises:
+        - ValueError: if flow ID is not provided or invalid
+    """
+    await api.flows._update_flow_setting(
+        flow_id=flow_id, key="lazy_task_runs_enabled", value=True
+    )
+    return True
+
+
+@register_api("flows.disable_lazy_task_runs_for_flow")
+async def disable_lazy_task_runs_for_flow(flow_id: str) -> bool:
+    """
+    Disables lazy task runs for a flow, regardless of its tenant's settings
+
+    Args:
+        - flow_id (str): the flow id
+
+    Returns:
+        - bool: if the update succeeded
+
+    Raises:
+        - ValueError: if flow ID is not provided or invalid
+    """
+    await api.flows._update_flow_setting(
+        flow_id=flow_id, key="lazy_task_runs_enabled", value=False
+    )
+    return True
+
+
 @register_api("flows.enable_version_locking_for_flow")
 async def enable_version_locking_for_flow(flow_id: str) -> bool:
     """
@@ -649,6 +915,7 @@ async def schedule_flow_runs(flow_id: str, max_runs: int = None) -> List[str]:
             ): {"aggregate": {"max": "scheduled_start_time"}},
         },
         apply_schema=False,
+        consistent=True,
     )
 
     if not flow:
@@ -662,7 +929,7 @@ async def schedule_flow_runs(flow_id: str, max_runs: int = None) -> List[str]:
         else:
             flow_schedule = flow.schedule
         try:
-            flow_schedule = schedule_schema.load(flow_schedule)
+            flow_schedule = _load_schedule(flow_schedule)
         except Exception as exc:
             logger.error(exc)
             logger.critical(
@@ -677,8 +944,10 @@ async def schedule_flow_runs(flow_id: str, max_runs: int = None) -> List[str]:
     else:
         last_scheduled_run = pendulum.now("UTC")
 
+    events = flow_schedule.next(n=max_runs, return_events=True)
+
     # schedule every event with an idempotent flow run
-    for event in flow_schedule.next(n=max_runs, return_events=True):
+    for event in events:
 
         # if this run was already scheduled, continue
         if last_scheduled_run and event.start_time <= last_scheduled_run:
@@ -697,8 +966,26 @@ async def schedule_flow_runs(flow_id: str, max_runs: int = None) -> List[str]:
 
         run_ids.append(run_id)
 
-    await models.FlowRun.where({"id": {"_in": run_ids}}).update(
-        set={"auto_scheduled": True}
+    # the horizon of scheduled runs only needs extending once the first of the
+    # upcoming events has passed. Flows whose schedules have no upcoming events
+    # have no due time, and are checked on every scheduler pass.
+    mutations = [
+        await models.Flow.where(id=flow_id).update(
+            set={"schedule_next_due_time": events[0].start_time if events else None},
+            alias="set_schedule_next_due_time",
+            run_mutation=False,
+        )
+    ]
+    if run_ids:
+        mutations.append(
+            await models.FlowRun.where({"id": {"_in": run_ids}}).update(
+                set={"auto_scheduled": True},
+                alias="set_auto_scheduled",
+                run_mutation=False,
+            )
+        )
+    await prefect.plugins.hasura.client.execute_mutations_in_transaction(
+        mutations=mutations
     )
 
     return run_ids
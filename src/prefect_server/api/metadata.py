@@ -0,0 +1,272 @@
+"""
+A process-local cache of `Flow` and `Task` metadata used on runtime paths.
+
+Flows and tasks are immutable once `create_flow` inserts them, with the exception of a
+flow's archive status and its flow group's settings and default parameters. Any API
+that changes those must call `invalidate`. Cached objects are shared, so callers must
+not mutate them.
+
+If `caches.invalidation_channel` is set, invalidations are also published with Postgres
+`NOTIFY` so that other replicas listening on the channel drop their entries as well.
+Entries also expire after `caches.metadata_ttl_seconds`, so a process that misses a
+notification only serves stale metadata for a bounded time.
+"""
+
+import asyncio
+import json
+from typing import Iterable, Optional
+
+from psycopg2 import sql
+
+from prefect_server import config
+from prefect_server.database import models, postgres
+from prefect_server.utilities.asynchronous import run_in_threadpool
+from prefect_server.utilities.cache import LRUCache
+from prefect_server.utilities.logging import get_logger
+from prefect.utilities.plugins import register_api
+
+logger = get_logger("api.metadata")
+
+# task_id -> Task(id, flow_id, tenant_id, cache_key)
+task_cache = LRUCache(
+    maxsize=config.caches.task_metadata,
+    ttl=config.caches.metadata_ttl_seconds or None,
+)
+# flow_id -> Flow(id, archived, tenant_id, parameters, flow_group_id, flow_group)
+flow_cache = LRUCache(
+    maxsize=config.caches.flow_metadata,
+    ttl=config.caches.metadata_ttl_seconds or None,
+)
+
+_listener = None
+
+# the delay before the invalidation listener's first reconnection attempt, which doubles
+# after each failed attempt up to the maximum
+RECONNECT_BACKOFF_SECONDS = 1
+RECONNECT_MAX_BACKOFF_SECONDS = 60
+
+
+@register_api("metadata.get_task")
+async def get_task(task_id: str) -> Optional[models.Task]:
+    """
+    Loads a task's `id`, `flow_id`, `tenant_id` and `cache_key`.
+
+    Args:
+        - task_id (str): the task id
+
+    Returns:
+        - Optional[models.Task]: the task, or None if it doesn't exist
+    """
+    task = task_cache.get(task_id)
+    if task is None:
+        task = await models.Task.where(id=task_id).first(
+            {"id", "flow_id", "tenant_id", "cache_key"}, consistent=True
+        )
+        if task is not None:
+            task_cache.set(task_id, task)
+    return task
+
+
+@register_api("metadata.get_flow")
+async def get_flow(flow_id: str) -> Optional[models.Flow]:
+    """
+    Loads a flow's `id`, `archived`, `tenant_id`, `parameters`, `flow_group_id`, and
+    its flow group's `default_parameters`.
+
+    Args:
+        - flow_id (str): the flow id
+
+    Returns:
+        - Optional[models.Flow]: the flow, or None if it doesn't exist
+    """
+    flow = flow_cache.get(flow_id)
+    if flow is None:
+        flow = await models.Flow.where(id=flow_id).first(
+            {
+                "id": True,
+                "archived": True,
+                "tenant_id": True,
+                "parameters": True,
+                "flow_group_id": True,
+                "flow_group": {"default_parameters": True},
+            },
+            consistent=True,
+        )
+        if flow is not None:
+            flow_cache.set(flow_id, flow)
+    return flow
+
+
+@register_api("metadata.invalidate")
+async def invalidate(
+    flow_ids: Iterable[str] = None, flow_group_ids: Iterable[str] = None
+) -> None:
+    """
+    Drops cached metadata for the provided flows and flow groups, including the tasks of
+    any dropped flow, and notifies other replicas if an invalidation channel is
+    configured.
+
+    Args:
+        - flow_ids (Iterable[str], optional): flows to invalidate
+        - flow_group_ids (Iterable[str], optional): flow groups whose flows should be
+            invalidated
+    """
+    flow_ids = [str(i) for i in flow_ids or []]
+    flow_group_ids = [str(i) for i in flow_group_ids or []]
+    if not flow_ids and not flow_group_ids:
+        return
+
+    _invalidate_local(flow_ids=flow_ids, flow_group_ids=flow_group_ids)
+
+    channel = config.caches.invalidation_channel
+    if channel:
+        payload = json.dumps(dict(flow_ids=flow_ids, flow_group_ids=flow_group_ids))
+        try:
+            await postgres.fetch("SELECT pg_notify(%s, %s)", (channel, payload))
+        except Exception:
+            logger.error("Error publishing cache invalidation", exc_info=True)
+
+
+def _invalidate_local(flow_ids: Iterable[str], flow_group_ids: Iterable[str]) -> None:
+    flow_ids = set(flow_ids)
+    flow_group_ids = set(flow_group_ids)
+    flow_cache.pop_where(
+        lambda flow_id, flow: flow_id in flow_ids
+        or flow.flow_group_id in flow_group_ids
+    )
+    task_cache.pop_where(lambda task_id, task: task.flow_id in flow_ids)
+
+
+@register_api("metadata.get_cache_stats")
+def get_cache_stats() -> dict:
+    """
+    Returns the size, hits, misses and hit rate of each metadata cache
+    """
+    return {
+        name: dict(
+            size=len(cache),
+            maxsize=cache.maxsize,
+            hits=cache.hits,
+            misses=cache.misses,
+            hit_rate=cache.hit_rate,
+        )
+        for name, cache in [("task", task_cache), ("flow", flow_cache)]
+    }
+
+
+class _InvalidationListener:
+    """
+    Listens for invalidations published by other replicas on a dedicated connection.
+
+    The listener connects in the background, so that an unreachable database doesn't
+    prevent the process from starting, and reconnects with exponential backoff whenever
+    it can't connect or its connection is lost. Notifications can be missed while it is
+    disconnected, so both caches are cleared when the connection is lost and again once
+    it is reestablished.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.connection = None
+        self.fileno = None
+        self.loop = None
+        self.task = None
+        self.connected = asyncio.Event()
+        self._disconnected = asyncio.Event()
+
+    async def start(self) -> None:
+        self.loop = asyncio.get_event_loop()
+        self.task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        attempt = 0
+        while True:
+            try:
+                await self._connect()
+            except Exception as exc:
+                self._close()
+                delay = min(
+                    RECONNECT_BACKOFF_SECONDS * 2 ** attempt,
+                    RECONNECT_MAX_BACKOFF_SECONDS,
+                )
+                attempt += 1
+                logger.warning(
+                    f"Cache invalidation listener could not connect, retrying in "
+                    f"{delay} seconds: {exc!r}"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            attempt = 0
+            logger.info(
+                f"Listening for cache invalidations on channel {self.channel!r}"
+            )
+            await self._disconnected.wait()
+
+    async def _connect(self) -> None:
+        self._disconnected.clear()
+        self.connection = await run_in_threadpool(postgres.connect)
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+        self.fileno = self.connection.fileno()
+        self.loop.add_reader(self.fileno, self._on_notify)
+        # invalidations published while disconnected were missed
+        task_cache.clear()
+        flow_cache.clear()
+        self.connected.set()
+
+    def _on_notify(self) -> None:
+        try:
+            self.connection.poll()
+        except Exception as exc:
+            logger.warning(f"Cache invalidation listener disconnected: {exc!r}")
+            self._close()
+            # without notifications, cached entries could be stale until they expire
+            task_cache.clear()
+            flow_cache.clear()
+            self._disconnected.set()
+            return
+        while self.connection.notifies:
+            notify = self.connection.notifies.pop(0)
+            try:
+                _invalidate_local(**json.loads(notify.payload))
+            except Exception:
+                logger.error("Invalid cache invalidation payload", exc_info=True)
+
+    def _close(self) -> None:
+        self.connected.clear()
+        # a broken connection may already be closed, but its reader is still registered
+        if self.fileno is not None:
+            self.loop.remove_reader(self.fileno)
+            self.fileno = None
+        if self.connection is not None and not self.connection.closed:
+            self.connection.close()
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self._close()
+
+
+async def start_invalidation_listener() -> None:
+    """
+    Start listening for invalidations from other replicas, if
+    `caches.invalidation_channel` is set. The listener connects in the background and
+    doesn't fail if the database can't be reached.
+    """
+    global _listener
+    channel = config.caches.invalidation_channel
+    if channel and _listener is None:
+        _listener = _InvalidationListener(channel=channel)
+        await _listener.start()
+
+
+async def stop_invalidation_listener() -> None:
+    global _listener
+    if _listener is not None:
+        await _listener.stop()
+        _listener = None
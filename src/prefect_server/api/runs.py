@@ -1,4 +1,6 @@
+import asyncio
 import datetime
+import uuid
 from typing import Any, Iterable, List
 
 import pendulum
@@ -8,8 +10,9 @@ from prefect.engine.state import Pending, Queued, Scheduled
 from prefect.utilities.graphql import EnumValue
 from prefect import api
 from prefect_server import config
-from prefect_server.database import models
-from prefect_server.utilities import exceptions, names
+from prefect_server.database import models, postgres
+from prefect_server.utilities import events, exceptions, names
+from prefect_server.utilities.cache import LRUCache
 from prefect.utilities.plugins import register_api
 
 SCHEDULED_STATES = [
@@ -18,6 +21,12 @@ SCHEDULED_STATES = [
     if isinstance(s, type) and issubclass(s, (Scheduled, Queued))
 ]
 
+# idempotency keys are only respected for this long after a run is created
+IDEMPOTENCY_KEY_TTL = datetime.timedelta(days=1)
+
+# (flow_run_id, task_id, map_index) -> task_run_id
+task_run_id_cache = LRUCache(maxsize=config.caches.task_run_ids)
+
 
 @register_api("runs.create_flow_run")
 async def create_flow_run(
@@ -45,38 +54,30 @@ async def create_flow_run(
             Idempotency keys are only respected for 24 hours after a flow is created.
     """
 
-    if idempotency_key is not None:
-
-        where = {
-            "idempotency_key": {"_eq": idempotency_key},
-            "created": {"_gt": str(pendulum.now().subtract(days=1))},
-        }
-        if flow_id is not None:
-            where.update({"flow_id": {"_eq": flow_id}})
-        if version_group_id is not None:
-            where.update({"flow": {"version_group_id": {"_eq": version_group_id}}})
-        run = await models.FlowRun.where(where).first(
-            {"id"}, order_by={"created": EnumValue("desc")}
-        )
+    # runs are unique by flow id and idempotency key, which `_create_flow_run` enforces
+    # atomically. Version groups resolve to their latest version, so earlier versions
+    # are checked here.
+    if idempotency_key is not None and version_group_id is not None:
+        run = await models.FlowRun.where(
+            {
+                "idempotency_key": {"_eq": idempotency_key},
+                "created": {"_gt": str(pendulum.now() - IDEMPOTENCY_KEY_TTL)},
+                "flow": {"version_group_id": {"_eq": version_group_id}},
+            }
+        ).first({"id"}, order_by={"created": EnumValue("desc")}, consistent=True)
         if run is not None:
             return run.id
 
-    flow_run_id = await _create_flow_run(
+    return await _create_flow_run(
         flow_id=flow_id,
         parameters=parameters,
         context=context,
         scheduled_start_time=scheduled_start_time,
         flow_run_name=flow_run_name,
         version_group_id=version_group_id,
+        idempotency_key=idempotency_key,
     )
 
-    if idempotency_key is not None:
-        await models.FlowRun.where(id=flow_run_id).update(
-            {"idempotency_key": idempotency_key}
-        )
-
-    return flow_run_id
-
 
 @register_api("runs._create_flow_run")
 async def _create_flow_run(
@@ -86,6 +87,7 @@ async def _create_flow_run(
     scheduled_start_time: datetime.datetime = None,
     flow_run_name: str = None,
     version_group_id: str = None,
+    idempotency_key: str = None,
 ) -> Any:
     """
     Creates a new flow run for an existing flow.
@@ -99,6 +101,9 @@ async def _create_flow_run(
         - flow_run_name (str, optional): An optional string representing this flow run
         - version_group_id (str, optional): An optional version group ID; if provided, will run the most
             recent unarchived version of the group
+        - idempotency_key (str, optional): An optional idempotency key; if a run of the
+            flow was created with the same key in the last 24 hours, its id is returned
+            instead of creating a new run
     """
 
     if flow_id is None and version_group_id is None:
@@ -107,24 +112,22 @@ async def _create_flow_run(
     scheduled_start_time = scheduled_start_time or pendulum.now()
 
     if flow_id:
-        where_clause = {"id": {"_eq": flow_id}}
+        flow = await api.metadata.get_flow(flow_id)  # type: Any
     elif version_group_id:
-        where_clause = {
-            "version_group_id": {"_eq": version_group_id},
-            "archived": {"_eq": False},
-        }
-
-    flow = await models.Flow.where(where=where_clause).first(
-        {
-            "id": True,
-            "archived": True,
-            "tenant_id": True,
-            "parameters": True,
-            "flow_group_id": True,
-            "flow_group": {"default_parameters": True},
-        },
-        order_by={"version": EnumValue("desc")},
-    )  # type: Any
+        flow = await models.Flow.where(
+            {"version_group_id": {"_eq": version_group_id}, "archived": {"_eq": False},}
+        ).first(
+            {
+                "id": True,
+                "archived": True,
+                "tenant_id": True,
+                "parameters": True,
+                "flow_group_id": True,
+                "flow_group": {"default_parameters": True},
+            },
+            order_by={"version": EnumValue("desc")},
+            consistent=True,
+        )
 
     if not flow:
         msg = (
@@ -137,7 +140,7 @@ async def _create_flow_run(
         raise ValueError(f"Flow {flow.id} is archived.")
 
     # check parameters
-    run_parameters = flow.flow_group.default_parameters
+    run_parameters = dict(flow.flow_group.default_parameters or {})
     run_parameters.update((parameters or {}))
     required_parameters = [p["name"] for p in flow.parameters if p["required"]]
     missing = set(required_parameters).difference(run_parameters)
@@ -145,6 +148,25 @@ async def _create_flow_run(
         raise ValueError(f"Required parameters were not supplied: {missing}")
     state = Scheduled(message="Flow run scheduled.", start_time=scheduled_start_time)
 
+    # runs are created Pending and immediately Scheduled; both states are inserted
+    # with the run instead of applying the Scheduled state with `set_flow_run_state`
+    now = pendulum.now("UTC")
+    flow_run_states = [
+        models.FlowRunState(
+            tenant_id=flow.tenant_id,
+            version=0,
+            **models.FlowRunState.fields_from_state(
+                Pending(message="Flow run created"), timestamp=now
+            ),
+        ),
+        models.FlowRunState(
+            tenant_id=flow.tenant_id,
+            version=1,
+            **models.FlowRunState.fields_from_state(
+                state, timestamp=now.add(microseconds=1)
+            ),
+        ),
+    ]
     run = models.FlowRun(
         tenant_id=flow.tenant_id,
         flow_id=flow_id or flow.id,
@@ -152,21 +174,78 @@ async def _create_flow_run(
         context=context or {},
         scheduled_start_time=scheduled_start_time,
         name=flow_run_name or names.generate_slug(2),
-        states=[
-            models.FlowRunState(
-                tenant_id=flow.tenant_id,
-                **models.FlowRunState.fields_from_state(
-                    Pending(message="Flow run created")
-                ),
-            )
-        ],
     )
 
-    flow_run_id = await run.insert()
+    if idempotency_key is None:
+        run.states = flow_run_states
+        flow_run_id = await run.insert()
+    else:
+        run.id = str(uuid.uuid4())
+        run.idempotency_key = idempotency_key
+        flow_run_id = await _insert_idempotent_flow_run(run, states=flow_run_states)
+        # an existing run was returned
+        if flow_run_id != run.id:
+            return flow_run_id
+
+    if config.runs.call_hooks_on_creation:
+        await _call_creation_hooks(
+            flow_run_id=flow_run_id, flow_run_state=flow_run_states[-1]
+        )
+
+    return flow_run_id
 
-    # apply the flow run's initial state via `set_flow_run_state`
-    await api.states.set_flow_run_state(flow_run_id=flow_run_id, state=state)
 
+async def _call_creation_hooks(
+    flow_run_id: str, flow_run_state: models.FlowRunState
+) -> None:
+    """
+    Calls cloud hooks for the Scheduled state that a flow run was created in.
+    """
+    flow_run = await models.FlowRun.where(id=flow_run_id).first(
+        {
+            "id": True,
+            "state": True,
+            "name": True,
+            "version": True,
+            "flow": {"id", "name", "flow_group_id", "version_group_id"},
+            "tenant": {"id", "slug"},
+        },
+        consistent=True,
+    )
+    flow_run_state.flow_run_id = flow_run_id
+    event = events.FlowRunStateChange(
+        flow_run=flow_run,
+        state=flow_run_state,
+        flow=flow_run.flow,
+        tenant=flow_run.tenant,
+    )
+    asyncio.create_task(api.cloud_hooks.call_hooks(event))
+
+
+async def _insert_idempotent_flow_run(
+    run: models.FlowRun, states: List[models.FlowRunState]
+) -> str:
+    """
+    Inserts a flow run with its states unless a run of the same flow with the same
+    idempotency key exists, in a single transaction, so a returned run always has its
+    states. The run must have an id, which is returned if it was inserted; otherwise,
+    the existing run's id is returned.
+
+    Keys older than `IDEMPOTENCY_KEY_TTL` are released from their run so that they can
+    be reused.
+    """
+    flow_run_id = await postgres.fetch_value(
+        "SELECT utility.insert_idempotent_flow_run(%s::jsonb, %s::jsonb, %s)::text",
+        (
+            run.json(),
+            "[" + ", ".join(state.json() for state in states) + "]",
+            IDEMPOTENCY_KEY_TTL,
+        ),
+    )
+    if flow_run_id is None:
+        raise ValueError(
+            f"Could not create a run with idempotency key {run.idempotency_key}"
+        )
     return flow_run_id
 
 
@@ -183,41 +262,30 @@ async def get_or_create_task_run(
     if map_index is None:
         map_index = -1
 
-    # try to load an existing task run
-    task_run = await models.TaskRun.where(
-        {
-            "flow_run_id": {"_eq": flow_run_id},
-            "task_id": {"_eq": task_id},
-            "map_index": {"_eq": map_index},
-        }
-    ).first({"id"})
-
-    if task_run:
-        return task_run.id
+    # task run ids never change once created, so repeated calls are served from the cache
+    key = (flow_run_id, task_id, map_index)
+    task_run_id = task_run_id_cache.get(key)
+    if task_run_id is not None:
+        return task_run_id
 
     try:
-        # load the tenant ID and cache_key
-        task = await models.Task.where(id=task_id).first({"cache_key", "tenant_id"})
-        # create the task run
-        return await models.TaskRun(
-            tenant_id=task.tenant_id,
-            flow_run_id=flow_run_id,
-            task_id=task_id,
-            map_index=map_index,
-            cache_key=task.cache_key,
-            states=[
-                models.TaskRunState(
-                    tenant_id=task.tenant_id,
-                    **models.TaskRunState.fields_from_state(
-                        Pending(message="Task run created")
-                    ),
-                )
-            ],
-        ).insert()
+        task = await api.metadata.get_task(task_id)
 
+        # inserts the task run and its Pending state unless it already exists, in
+        # which case the existing run's id is returned and nothing is written
+        task_run_id = await postgres.fetch_value(
+            "SELECT utility.get_or_create_task_run(%s, %s, %s, %s, %s)::text",
+            (task.tenant_id, flow_run_id, task_id, map_index, task.cache_key),
+        )
     except Exception:
         raise ValueError("Invalid ID")
 
+    if task_run_id is None:
+        raise ValueError("Invalid ID")
+
+    task_run_id_cache.set(key, task_run_id)
+    return task_run_id
+
 
 @register_api("runs.get_or_create_mapped_task_run_children")
 async def get_or_create_mapped_task_run_children(
@@ -230,57 +298,43 @@ async def get_or_create_mapped_task_run_children(
         - flow_run_id (str): the flow run associated with the parent task run
         - task_id (str): the task ID to create and/or retrieve
         - max_map_index (int,): the number of mapped children e.g., a value of 2 yields 3 mapped children
+
+    Returns:
+        - List[str]: the ids of the mapped children, ordered by map index
     """
-    # grab task info
-    task = await models.Task.where(id=task_id).first({"cache_key", "tenant_id"})
-    # generate task runs to upsert
-    task_runs = [
-        models.TaskRun(
-            tenant_id=task.tenant_id,
-            flow_run_id=flow_run_id,
-            task_id=task_id,
-            map_index=i,
-            cache_key=task.cache_key,
-        )
-        for i in range(max_map_index + 1)
-    ]
-    # upsert the mapped children
-    task_runs = (
-        await models.TaskRun().insert_many(
-            objects=task_runs,
-            on_conflict=dict(
-                constraint="task_run_unique_identifier_key",
-                update_columns=["cache_key"],
-            ),
-            selection_set={"returning": {"id", "map_index"}},
-        )
-    )["returning"]
-    task_runs.sort(key=lambda task_run: task_run.map_index)
-    # get task runs without states
-    stateless_runs = await models.TaskRun.where(
-        {
-            "_and": [
-                {"flow_run_id": {"_eq": flow_run_id}},
-                {"task_id": {"_eq": task_id}},
-                {"state_id": {"_is_null": True}},
-            ]
-        }
-    ).get({"id", "map_index", "version"})
-    # create and insert states for stateless task runs
-    task_run_states = [
-        models.TaskRunState(
-            tenant_id=task.tenant_id,
-            task_run_id=task_run.id,
-            **models.TaskRunState.fields_from_state(
-                Pending(message="Task run created")
-            ),
-        )
-        for task_run in stateless_runs
-    ]
-    await models.TaskRunState().insert_many(task_run_states)
+    # children and their Pending states are generated inside Postgres, so the
+    # cost of this call doesn't depend on the width of the map beyond the
+    # returned ids
+    task_run_ids = await postgres.fetch_value(
+        """
+        SELECT array_agg(children.id::text ORDER BY children.n)
+        FROM utility.get_or_create_mapped_task_run_children(%s, %s, %s)
+            WITH ORDINALITY AS children(id, n)
+        """,
+        (flow_run_id, task_id, max_map_index),
+    )
+    return task_run_ids or []
+
+
+@register_api("runs.create_task_runs")
+async def create_task_runs(flow_run_id: str) -> int:
+    """
+    Creates a task run, in a Pending state, for every task of the flow run's flow that
+    doesn't have one yet.
+
+    Task runs are normally created along with their flow run. For flows with lazy task
+    runs enabled, they are created by this function when the flow run starts running
+    (or individually by `get_or_create_task_run`).
+
+    Args:
+        - flow_run_id (str): the flow run id
 
-    # return the task run ids
-    return [task_run.id for task_run in task_runs]
+    Returns:
+        - int: the number of task runs created
+    """
+    return await postgres.fetch_value(
+        "SELECT utility.create_task_runs(%s)", (flow_run_id,)
+    )
 
 
 @register_api("runs.update_flow_run_heartbeat")
@@ -338,6 +392,8 @@ async def delete_flow_run(flow_run_id: str) -> bool:
         raise ValueError("Invalid flow run ID.")
 
     result = await models.FlowRun.where(id=flow_run_id).delete()
+    # the flow run's task runs were deleted with it
+    task_run_id_cache.pop_where(lambda key, value: key[0] == flow_run_id)
     return bool(result.affected_rows)  # type: ignore
 
 
@@ -3,6 +3,7 @@
 
 import asyncio
 import uuid
+from typing import List
 
 import pendulum
 from box import Box
@@ -70,14 +71,27 @@ async def set_flow_run_state(
             "state": True,
             "name": True,
             "version": True,
-            "flow": {"id", "name", "flow_group_id", "version_group_id"},
-            "tenant": {"id", "slug"},
-        }
+            "flow": {
+                "id": True,
+                "name": True,
+                "flow_group_id": True,
+                "version_group_id": True,
+                "flow_group": {"settings"},
+            },
+            "tenant": {"id", "slug", "settings"},
+        },
+        consistent=True,
     )
 
     if not flow_run:
         raise ValueError(f"State update failed for flow run ID {flow_run_id}")
 
+    # the settings are only loaded to check for lazy task runs, and are kept out of
+    # the flow and tenant that cloud hooks receive
+    lazy_task_runs = _lazy_task_runs_enabled(flow_run)
+    flow_run.flow = models.Flow(**flow_run.flow.dict(exclude={"flow_group"}))
+    flow_run.tenant = models.Tenant(**flow_run.tenant.dict(exclude={"settings"}))
+
     # --------------------------------------------------------
     # apply downstream updates
     # --------------------------------------------------------
@@ -87,7 +101,7 @@ async def set_flow_run_state(
     if isinstance(state, Cancelled):
         task_runs = await models.TaskRun.where(
             {"flow_run_id": {"_eq": flow_run_id}}
-        ).get({"id", "serialized_state"})
+        ).get({"id", "serialized_state"}, consistent=True)
         to_cancel = [
             t
             for t in task_runs
@@ -126,8 +140,11 @@ async def set_flow_run_state(
 
     # FOR RUNNING STATES:
     #   - update the flow run heartbeat
+    #   - for lazy task runs, create any task runs that don't exist yet
     if state.is_running():
         await api.runs.update_flow_run_heartbeat(flow_run_id=flow_run_id)
+        if lazy_task_runs:
+            await api.runs.create_task_runs(flow_run_id=flow_run_id)
 
     # --------------------------------------------------------
     # call cloud hooks
@@ -145,6 +162,106 @@ async def set_flow_run_state(
     return flow_run_state
 
 
+def _lazy_task_runs_enabled(flow_run: models.FlowRun) -> bool:
+    """
+    Whether lazy task runs are enabled for a flow run, as set on its flow group or, if
+    the flow group doesn't say, on its tenant. Mirrors the check in the
+    `insert_task_runs_after_flow_run_insert` trigger.
+    """
+    flow_group = flow_run.flow.flow_group
+    for settings in (flow_group and flow_group.settings, flow_run.tenant.settings):
+        enabled = (settings or {}).get("lazy_task_runs_enabled")
+        if enabled is not None:
+            return bool(enabled)
+    return False
+
+
+@register_api("states.bulk_set_flow_run_states")
+async def bulk_set_flow_run_states(
+    flow_run_ids: List[str], state: State, mutations: List[dict] = None
+) -> List[models.FlowRunState]:
+    """
+    Sets the same state on many flow runs with a single insert, for maintenance
+    services that transition runs in batches. Version locking is not enforced and,
+    unlike `set_flow_run_state`, no downstream updates are applied, so `Cancelled`
+    and running states are not supported.
+
+    Args:
+        - flow_run_ids (List[str]): the flow run ids to update; ids that don't exist
+            are ignored
+        - state (State): the new state
+        - mutations (List[dict], optional): additional mutations (created with
+            `run_mutation=False`) to run in the same transaction as the state insert
+
+    Returns:
+        - List[models.FlowRunState]: the inserted states
+    """
+    if isinstance(state, Cancelled) or state.is_running():
+        raise ValueError(
+            f"{type(state).__name__} states must be set with `set_flow_run_state`."
+        )
+    if not flow_run_ids:
+        return []
+
+    flow_runs = await models.FlowRun.where({"id": {"_in": flow_run_ids}}).get(
+        {
+            "id": True,
+            "name": True,
+            "version": True,
+            "tenant_id": True,
+            "flow": {"id", "name", "flow_group_id", "version_group_id"},
+            "tenant": {"id", "slug"},
+        },
+        limit=len(flow_run_ids),
+        consistent=True,
+    )
+    if not flow_runs:
+        return []
+
+    now = pendulum.now("UTC")
+    serialized_state = state.serialize()
+    flow_run_states = [
+        models.FlowRunState(
+            id=str(uuid.uuid4()),
+            tenant_id=flow_run.tenant_id,
+            flow_run_id=flow_run.id,
+            version=(flow_run.version or 0) + 1,
+            state=type(state).__name__,
+            timestamp=now,
+            message=state.message,
+            result=state.result,
+            start_time=getattr(state, "start_time", None),
+            serialized_state=serialized_state,
+        )
+        for flow_run in flow_runs
+    ]
+
+    insert_states = await models.FlowRunState.insert_many(
+        flow_run_states,
+        selection_set="affected_rows",
+        alias="insert_flow_run_states",
+        run_mutation=False,
+    )
+    await prefect.plugins.hasura.client.execute_mutations_in_transaction(
+        mutations=[insert_states] + (mutations or [])
+    )
+
+    # --------------------------------------------------------
+    # call cloud hooks
+    # --------------------------------------------------------
+
+    for flow_run, flow_run_state in zip(flow_runs, flow_run_states):
+        event = events.FlowRunStateChange(
+            flow_run=flow_run,
+            state=flow_run_state,
+            flow=flow_run.flow,
+            tenant=flow_run.tenant,
+        )
+        asyncio.create_task(api.cloud_hooks.call_hooks(event))
+
+    return flow_run_states
+
+
 @register_api("states.set_task_run_state")
 async def set_task_run_state(
     task_run_id: str, state: State, version: int = None, flow_run_version: int = None
@@ -205,7 +322,8 @@ async def set_task_run_state(
             "state": True,
             "serialized_state": True,
             "flow_run": {"id": True, "state": True},
-        }
+        },
+        consistent=True,
     )
 
     if not task_run:
@@ -274,7 +392,7 @@ async def cancel_flow_run(flow_run_id: str) -> models.FlowRun:
         raise ValueError("Invalid flow run ID.")
 
     flow_run = await models.FlowRun.where(id=flow_run_id).first(
-        {"id", "state", "serialized_state"}
+        {"id", "state", "serialized_state"}, consistent=True
     )
     if not flow_run:
         raise ValueError(f"Invalid flow run ID: {flow_run_id}.")
@@ -48,7 +48,9 @@ async def update_settings(tenant_id: str, settings: dict) -> bool:
         - ValueError: if the tenant ID is invalid
     """
     # apply tenant_admin role if possible
-    tenant = await models.Tenant.where(id=tenant_id).first({"settings"})
+    tenant = await models.Tenant.where(id=tenant_id).first(
+        {"settings"}, consistent=True
+    )
     if not tenant:
         raise ValueError("Invalid tenant id.")
 
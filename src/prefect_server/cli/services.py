@@ -30,14 +30,28 @@ def run_proc_forever(proc):
 
 
 @services.command()
-def graphql():
+@click.option(
+    "--workers",
+    "-w",
+    type=int,
+    default=None,
+    help="The number of worker processes; 0 runs one per CPU. "
+    "Defaults to `services.graphql.workers`.",
+)
+def graphql(workers):
     """
     Start the Python GraphQL server
     """
+    from prefect_server.services.graphql import workers as graphql_workers
+
+    workers = graphql_workers.get_worker_count(workers)
+    if workers == 1:
+        cmd = ["python", services_dir / "graphql" / "server.py"]
+    else:
+        cmd = graphql_workers.get_gunicorn_command(workers=workers)
     run_proc_forever(
         subprocess.Popen(
-            ["python", services_dir / "graphql" / "server.py"],
-            env=dict(os.environ, PREFECT_SERVER_VERSION="development"),
+            cmd, env=dict(os.environ, PREFECT_SERVER_VERSION="development"),
         )
     )
 
@@ -1,3 +1,4 @@
 import prefect_server.database.hasura
 import prefect_server.database.orm
+import prefect_server.database.postgres
 from prefect_server.database._models import models
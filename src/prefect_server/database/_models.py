@@ -53,12 +53,14 @@ class Flow(HasuraModel):
     archived: bool = None
     schedule: Dict[str, Any] = None
     is_schedule_active: bool = None
+    schedule_next_due_time: datetime.datetime = None
     version: int = None
     version_group_id: str = None
     core_version: str = None
     name: str = None
     description: str = None
     serialized_flow: Dict[str, Any] = None
+    serialized_flow_hash: str = None
     environment: Dict[str, Any] = None
     storage: Dict[str, Any] = None
     parameters: List[Dict[str, Any]] = None
@@ -0,0 +1,141 @@
+"""
+Batching of concurrent Hasura mutations.
+
+Bursty traffic, like many task runs setting their states at once, sends a lot of small
+mutations to Hasura, each in its own request. The `MutationBatcher` collects the
+mutations submitted within a short window and executes them as a single request with
+`HasuraClient.execute_mutations_in_transaction`, then hands each caller the result for
+its own alias.
+
+A batch is a single transaction, so if any of its mutations fails, none are applied. In
+that case each mutation is retried on its own, so that only the callers whose mutations
+actually fail receive an error.
+"""
+import asyncio
+import itertools
+from typing import Any, List, Tuple
+
+from box import Box
+
+from prefect_server.utilities.logging import get_logger
+
+logger = get_logger("Hasura")
+
+# the error raised by HasuraClient once it gives up on reaching Postgres
+CONNECTION_ERROR = "Unable to connect to postgres."
+
+
+class MutationBatcher:
+    """
+    Coalesces concurrently submitted mutations into single requests.
+
+    Args:
+        - client (HasuraClient): the client used to execute batches
+        - window_seconds (float): how long to wait for more mutations after the first
+            mutation of a batch is submitted
+        - max_size (int): the maximum number of mutations in a batch; a batch is
+            executed immediately once it is full
+    """
+
+    def __init__(self, client: Any, window_seconds: float, max_size: int):
+        if max_size < 1:
+            raise ValueError("`max_size` must be greater than 0.")
+        self.client = client
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._alias_counter = itertools.count()
+        self._pending = []  # type: List[Tuple[dict, str, asyncio.Future]]
+        self._timer = None  # type: asyncio.TimerHandle
+        self._loop = None  # type: asyncio.AbstractEventLoop
+        self._tasks = set()  # type: set
+
+    def get_alias(self, alias: str) -> str:
+        """
+        Returns a unique version of `alias`, since mutations in a batch share one request.
+        Variable names are derived from the alias, so they are unique as well.
+        """
+        return f"{alias}_{next(self._alias_counter)}"
+
+    async def submit(self, graphql: dict, alias: str) -> Box:
+        """
+        Executes a mutation as part of the next batch.
+
+        Args:
+            - graphql (dict): a mutation definition, as returned by the client's
+                `insert` or `update` with `run_mutation=False`
+            - alias (str): the mutation's alias, which must be unique
+
+        Returns:
+            - Box: the mutation's result
+        """
+        loop = asyncio.get_event_loop()
+        # pending mutations and timers are bound to the loop they were submitted in
+        if loop is not self._loop:
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+
+        future = loop.create_future()
+        self._pending.append((graphql, alias, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._execute(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, batch: List[Tuple[dict, str, asyncio.Future]]) -> None:
+        if len(batch) == 1:
+            await self._execute_one(*batch[0])
+            return
+
+        try:
+            result = await self.client.execute_mutations_in_transaction(
+                mutations=[graphql for graphql, _, _ in batch]
+            )
+        except Exception as exc:
+            # retrying mutations one by one won't help if Postgres is unreachable
+            if str(exc) == CONNECTION_ERROR:
+                for _, _, future in batch:
+                    _set_exception(future, exc)
+                return
+            logger.debug(
+                f"Batch of {len(batch)} mutations failed ({exc!r}); "
+                "executing them individually."
+            )
+            await asyncio.gather(*[self._execute_one(*item) for item in batch])
+        else:
+            for _, alias, future in batch:
+                _set_result(future, result.data[alias])
+
+    async def _execute_one(
+        self, graphql: dict, alias: str, future: asyncio.Future
+    ) -> None:
+        try:
+            result = await self.client.execute_mutations_in_transaction(
+                mutations=[graphql]
+            )
+        except Exception as exc:
+            _set_exception(future, exc)
+        else:
+            _set_result(future, result.data[alias])
+
+
+def _set_result(future: asyncio.Future, result: Any) -> None:
+    # the caller may have been cancelled while its mutation was executing
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_exception(future: asyncio.Future, exc: Exception) -> None:
+    if not future.done():
+        future.set_exception(exc)
@@ -1,11 +1,17 @@
 import asyncio
-from typing import Any, Dict, Iterable, List, Union
+import contextvars
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional, Union
 
+import httpx
 from box import Box
 
-from prefect.utilities.graphql import EnumValue, with_args
+from prefect.utilities.graphql import EnumValue, parse_graphql, with_args
 from prefect_server import config
+from prefect_server.database.batching import CONNECTION_ERROR, MutationBatcher
 from prefect_server.utilities import exceptions
+from prefect_server.utilities.circuit_breaker import CircuitBreaker
 from prefect_server.utilities.graphql import GraphQLClient
 from prefect_server.utilities.logging import get_logger
 from prefect.utilities.plugins import register_plugin
@@ -13,6 +19,16 @@ from prefect.utilities.plugins import register_plugin
 GQLObjectTypes = Union[None, str, Dict, Iterable]
 logger = get_logger("Hasura")
 
+# errors raised by httpx when Hasura can't be reached, for example while it restarts
+# during a failover; they are retried like connection errors reported by Hasura
+TRANSPORT_ERRORS = (httpx.NetworkError, httpx.TimeoutException, httpx.ProtocolError)
+
+# the monotonic time of the last mutation executed in the current context, used to send
+# reads that follow a write to the primary until the replica has caught up
+_last_write_time = contextvars.ContextVar(
+    "hasura_last_write_time", default=None
+)  # type: contextvars.ContextVar
+
 
 class Variable:
     def __init__(self, name: str, type: str, value: Any):
@@ -46,8 +62,78 @@ class Variable:
 
 
 class HasuraClient(GraphQLClient):
-    def __init__(self, url: str = None, headers=None) -> None:
+    """
+    A GraphQL client for Hasura.
+
+    If a read URL is configured (for example a second Hasura instance pointed at a Postgres
+    replica), queries executed with `consistent=False` are sent there instead of the
+    primary URL. Reads still go to the primary if:
+
+    - a mutation was executed in the same context within `hasura.read_your_writes_seconds`,
+        since the replica may not have received it yet
+    - the read URL failed within the last `hasura.read_retry_seconds`; the failed read is
+        retried against the primary
+
+    Requests to the primary share a circuit breaker, and at most
+    `hasura.max_concurrent_requests` requests are in progress at once.
+
+    Args:
+        - url (str, optional): the primary GraphQL URL; defaults to `hasura.graphql_url`
+        - headers (dict, optional): headers to include with every request
+        - read_url (str, optional): the GraphQL URL for reads that don't need to be
+            consistent; defaults to `hasura.read_graphql_url`. If empty, every request
+            goes to the primary.
+        - batch_mutations (bool, optional): if True, concurrent `insert` and `update`
+            mutations are batched into single requests; defaults to
+            `hasura.mutation_batching.enabled`
+    """
+
+    def __init__(
+        self,
+        url: str = None,
+        headers=None,
+        read_url: str = None,
+        batch_mutations: bool = None,
+    ) -> None:
         super().__init__(url=url or config.hasura.graphql_url, headers=headers)
+        if read_url is None:
+            read_url = config.hasura.read_graphql_url
+        self.read_url = read_url or None
+        self._read_url_retry_time = 0.0
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=config.hasura.circuit_breaker.failure_threshold,
+            open_seconds=config.hasura.circuit_breaker.open_seconds,
+            max_open_seconds=config.hasura.circuit_breaker.max_open_seconds,
+        )
+        self._semaphore = None  # type: Optional[asyncio.Semaphore]
+        self._semaphore_loop = None
+
+        if batch_mutations is None:
+            batch_mutations = config.hasura.mutation_batching.enabled
+        self.mutation_batcher = None  # type: Optional[MutationBatcher]
+        if batch_mutations:
+            self.mutation_batcher = MutationBatcher(
+                client=self,
+                window_seconds=config.hasura.mutation_batching.window_seconds,
+                max_size=config.hasura.mutation_batching.max_size,
+            )
+
+    def _get_read_url(self) -> str:
+        """
+        Returns the URL that a read executed with `consistent=False` should be sent to
+        """
+        if self.read_url is None:
+            return self.url
+        now = time.monotonic()
+        if now < self._read_url_retry_time:
+            return self.url
+        last_write_time = _last_write_time.get()
+        if (
+            last_write_time is not None
+            and now - last_write_time < config.hasura.read_your_writes_seconds
+        ):
+            return self.url
+        return self.read_url
 
     async def execute(
         self,
@@ -56,6 +142,7 @@ class HasuraClient(GraphQLClient):
         headers: dict = None,
         raise_on_error: bool = True,
         as_box: bool = True,
+        consistent: bool = True,
     ) -> dict:
         """
         Args:
@@ -67,6 +154,8 @@ class HasuraClient(GraphQLClient):
                 result contains an `errors` field.
             - as_box (bool): if True, a `box.Box` object is returned, which behaves like a dict
                 but allows "dot" access in addition to key access.
+            - consistent (bool): if False, and the query isn't a mutation, it may be sent
+                to the read URL, which can lag behind the primary
 
         Returns:
             - dict: a dictionary of GraphQL info. If `as_box` is True, it will be a Box (dict subclass)
@@ -75,46 +164,146 @@ class HasuraClient(GraphQLClient):
             - GraphQLSyntaxError: if the provided query is not a valid GraphQL query
             - ValueError: if `raise_on_error=True` and there are any errors during execution.
         """
+        if not isinstance(query, str):
+            query = parse_graphql(query)
+
+        url = self.url
+        if query.lstrip().startswith("mutation"):
+            _last_write_time.set(time.monotonic())
+        elif not consistent:
+            url = self._get_read_url()
+
+        if url != self.url:
+            try:
+                return await self._post(
+                    query=query,
+                    variables=variables,
+                    headers=headers,
+                    raise_on_error=raise_on_error,
+                    as_box=as_box,
+                    url=url,
+                )
+            # GraphQL errors are raised as ValueErrors and would fail on the primary too
+            except ValueError as exc:
+                if "connection error" not in str(exc):
+                    raise
+                self._mark_read_url_failed(exc)
+            except Exception as exc:
+                self._mark_read_url_failed(exc)
+
+        return await self._execute_with_retries(
+            query=query,
+            variables=variables,
+            headers=headers,
+            raise_on_error=raise_on_error,
+            as_box=as_box,
+        )
 
-        try:
-            result = await super().execute(
-                query=query,
-                variables=variables,
-                headers=headers,
-                raise_on_error=raise_on_error,
-                as_box=as_box,
-            )
-        except ValueError as exc:
-            if "Uniqueness violation" in str(exc):
-                raise ValueError("Uniqueness violation.")
-            elif "Foreign key violation" in str(exc):
-                raise ValueError("Foreign key violation.")
-            elif "Check constraint violation" in str(exc):
-                raise exceptions.Unauthorized("Unauthorized: permission error.")
-            elif "connection error" in str(exc):
-                retry_count = 0
-                while retry_count < config.hasura.execute_retry_seconds:
-                    await asyncio.sleep(1)
-                    try:
-                        # try again to execute
-                        result = await super().execute(
-                            query=query,
-                            variables=variables,
-                            headers=headers,
-                            raise_on_error=raise_on_error,
-                            as_box=as_box,
-                        )
-                        # if no error raised, don't want to retry again
-                        return result
-                    except Exception:
-                        logger.exception(
-                            f"Unable to execute Hasura query, retrying in 1 second. Query: {query}"
-                        )
-                        retry_count += 1
-                raise ValueError("Unable to connect to postgres.")
-            raise
+    async def _execute_with_retries(self, **kwargs: Any) -> dict:
+        """
+        Executes a request against the primary URL, retrying connection errors (reported
+        by Hasura, or raised by httpx when Hasura can't be reached) with jittered
+        exponential backoff for up to `hasura.execute_retry_seconds`.
+
+        Connection errors and 5xx responses are reported to the client's circuit breaker.
+        While it is open, new requests fail immediately and requests that are already
+        retrying wait for it to let a trial request through, so that Hasura isn't flooded
+        as soon as it recovers.
+        """
+        deadline = time.monotonic() + config.hasura.execute_retry_seconds
+        attempt = 0
+        while True:
+            if self.circuit_breaker.allow_request():
+                try:
+                    result = await self._post(**kwargs)
+                except asyncio.CancelledError:
+                    self.circuit_breaker.release()
+                    raise
+                except ValueError as exc:
+                    if "connection error" not in str(exc):
+                        # Hasura and Postgres are up, the request itself failed
+                        self.circuit_breaker.record_success()
+                        if "Uniqueness violation" in str(exc):
+                            raise ValueError("Uniqueness violation.")
+                        elif "Foreign key violation" in str(exc):
+                            raise ValueError("Foreign key violation.")
+                        elif "Check constraint violation" in str(exc):
+                            raise exceptions.Unauthorized(
+                                "Unauthorized: permission error."
+                            )
+                        raise
+                    self.circuit_breaker.record_failure()
+                    logger.warning(
+                        f"Hasura connection error on attempt {attempt + 1}: {exc}"
+                    )
+                except TRANSPORT_ERRORS as exc:
+                    self.circuit_breaker.record_failure()
+                    logger.warning(
+                        f"Hasura connection error on attempt {attempt + 1}: {exc!r}"
+                    )
+                except httpx.HTTPError:
+                    # raised for 5xx responses
+                    self.circuit_breaker.record_failure()
+                    raise
+                except Exception:
+                    # other errors say nothing about Hasura's health
+                    self.circuit_breaker.release()
+                    raise
+                else:
+                    self.circuit_breaker.record_success()
+                    return result
+                attempt += 1
+                delay = self._get_retry_delay(attempt)
+
+            # fail fast rather than adding to the requests waiting for Hasura to recover
+            elif attempt == 0:
+                raise ValueError(CONNECTION_ERROR)
+            else:
+                delay = max(
+                    self.circuit_breaker.retry_after(), self._get_retry_delay(attempt)
+                )
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ValueError(CONNECTION_ERROR)
+            await asyncio.sleep(min(delay, remaining))
+
+    @staticmethod
+    def _get_retry_delay(attempt: int) -> float:
+        delay = min(
+            config.hasura.retry_backoff_seconds * 2 ** (attempt - 1),
+            config.hasura.retry_max_backoff_seconds,
+        )
+        return delay / 2 + random.uniform(0, delay / 2)
 
-        return result
+    async def _post(self, **kwargs: Any) -> dict:
+        """
+        Executes a single request, waiting for a slot if
+        `hasura.max_concurrent_requests` requests are already in progress.
+        """
+        semaphore = self._get_semaphore()
+        if semaphore is None:
+            return await super().execute(**kwargs)
+        async with semaphore:
+            return await super().execute(**kwargs)
+
+    def _get_semaphore(self) -> Optional[asyncio.Semaphore]:
+        limit = config.hasura.max_concurrent_requests
+        if not limit:
+            return None
+        # semaphores are bound to the event loop they are first used in
+        loop = asyncio.get_event_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(limit)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _mark_read_url_failed(self, exc: Exception) -> None:
+        self._read_url_retry_time = time.monotonic() + config.hasura.read_retry_seconds
+        logger.warning(
+            f"Hasura read URL failed ({exc!r}); sending reads to the primary for "
+            f"{config.hasura.read_retry_seconds} seconds."
+        )
 
     async def execute_mutations_in_transaction(
         self,
@@ -167,8 +356,31 @@ class HasuraClient(GraphQLClient):
 
         return result
 
+    def _get_mutation_alias(self, alias: str, run_mutation: bool) -> str:
+        if run_mutation and self.mutation_batcher is not None:
+            return self.mutation_batcher.get_alias(alias)
+        return alias
+
+    async def _run_mutation(self, graphql: dict, alias: str) -> Box:
+        """
+        Runs a mutation built by `insert` or `update`, batching it with concurrent
+        mutations if batching is enabled.
+        """
+        if self.mutation_batcher is None:
+            result = await self.execute_mutations_in_transaction(mutations=[graphql])
+            return result.data[alias]
+
+        result = await self.mutation_batcher.submit(graphql, alias=alias)
+        # the batch ran in another task, so record the write for this context
+        _last_write_time.set(time.monotonic())
+        return result
+
     async def get(
-        self, graphql_type: str, id: str, selection_set: GQLObjectTypes
+        self,
+        graphql_type: str,
+        id: str,
+        selection_set: GQLObjectTypes,
+        consistent: bool = False,
     ) -> Box:
         """
         Query a specific object type by ID
@@ -177,17 +389,22 @@ class HasuraClient(GraphQLClient):
             - graphql_type(str): the GraphQL type to query
             - id (str): the object ID
             - selection_set (str): a GraphQL results query, not including surrounding braces
+            - consistent (bool): if True, the query is always sent to the primary
         """
         query_type = f"{graphql_type}_by_pk"
         query = {"query": {with_args(query_type, {"id": id}): selection_set}}
-        result = await self.execute(query)
+        result = await self.execute(query, consistent=consistent)
         return result.data[query_type]
 
-    async def exists(self, graphql_type: str, id: str) -> bool:
+    async def exists(
+        self, graphql_type: str, id: str, consistent: bool = False
+    ) -> bool:
         """
         Tests if a type with the provided ID exists in the database
         """
-        result = await self.get(graphql_type=graphql_type, id=id, selection_set="id")
+        result = await self.get(
+            graphql_type=graphql_type, id=id, selection_set="id", consistent=consistent
+        )
         return result is not None
 
     async def insert(
@@ -212,7 +429,7 @@ class HasuraClient(GraphQLClient):
                 f"`objects` should be a collection; received {type(objects).__name__}"
             )
 
-        alias = alias or "insert"
+        alias = self._get_mutation_alias(alias or "insert", run_mutation)
 
         # -----------------------------------------------------------
         # create variables
@@ -253,8 +470,7 @@ class HasuraClient(GraphQLClient):
         )
 
         if run_mutation:
-            result = await self.execute_mutations_in_transaction(mutations=[graphql])
-            return result.data[alias]
+            return await self._run_mutation(graphql, alias=alias)
         else:
             return graphql
 
@@ -346,7 +562,7 @@ class HasuraClient(GraphQLClient):
         if id is not None:
             where["id"] = {"_eq": id}
 
-        alias = alias or "update"
+        alias = self._get_mutation_alias(alias or "update", run_mutation)
 
         # -------------------------------------------------------------
         # create variables
@@ -388,8 +604,7 @@ class HasuraClient(GraphQLClient):
         )
 
         if run_mutation:
-            result = await self.execute_mutations_in_transaction(mutations=[graphql])
-            return result.data[alias]
+            return await self._run_mutation(graphql, alias=alias)
         else:
             return graphql
 
@@ -307,12 +307,14 @@ class HasuraModel(ORMModel):
         return result
 
     @classmethod
-    async def exists(cls, id: str) -> bool:
+    async def exists(cls, id: str, consistent: bool = False) -> bool:
         """
         Returns True if an object with the specified ID exists in the database; False otherwise.
 
         Args:
             - id (str): an object with this ID will be tested
+            - consistent (bool): if True, the query is sent to the primary even if a read
+                URL is configured; use it to read data that was just written
 
         Returns:
             - bool: True if the object exists; False otherwise
@@ -320,7 +322,7 @@ class HasuraModel(ORMModel):
         if isinstance(id, uuid.UUID):
             id = str(id)
         return await prefect.plugins.hasura.client.exists(
-            graphql_type=cls.__hasura_type__, id=id
+            graphql_type=cls.__hasura_type__, id=id, consistent=consistent
         )
 
     @classmethod
@@ -446,6 +448,7 @@ class ModelQuery:
         order_by=None,
         distinct_on=None,
         apply_schema: bool = True,
+        consistent: bool = False,
     ) -> List[HasuraModel]:
         """
         Gets `limit` objects corresponding to the query's where clause.
@@ -458,6 +461,8 @@ class ModelQuery:
             - order_by (GQLObjectTypes): a Hasura `order_by` clause
             - distinct_on (GQLObjectTypes): a Hasura `distinct_on` clause
             - apply_schema (bool): if True, the result is an ORM model
+            - consistent (bool): if True, the query is sent to the primary even if a read
+                URL is configured; use it to read data that was just written
 
         Returns:
             - dict: the fields in the `selection_set`
@@ -487,6 +492,7 @@ class ModelQuery:
             # if we are applying the schema, don't retrieve a box object
             # if we are NOT applying the schema, DO retrieve a box object
             as_box=not apply_schema,
+            consistent=consistent,
         )
         data = result["data"][self.model.__hasura_type__]
         if apply_schema:
@@ -499,6 +505,7 @@ class ModelQuery:
         selection_set: GQLObjectTypes = None,
         order_by: GQLObjectTypes = None,
         apply_schema: bool = True,
+        consistent: bool = False,
     ) -> HasuraModel:
         """
         Gets the first object corresponding to the query's where clause.
@@ -508,6 +515,8 @@ class ModelQuery:
                 a list of ids will be returned.
             - order_by (GQLObjectTypes): a Hasura `order_by` clause
             - apply_schema (bool): if True, applies a Schema to deserialize results
+            - consistent (bool): if True, the query is sent to the primary even if a read
+                URL is configured; use it to read data that was just written
 
         Returns:
             - dict: the fields in the `selection_set`
@@ -519,11 +528,14 @@ class ModelQuery:
             limit=1,
             order_by=order_by,
             apply_schema=apply_schema,
+            consistent=consistent,
         )
         if result:
             return result[0]
 
-    async def count(self, distinct_on: List[str] = None,) -> int:
+    async def count(
+        self, distinct_on: List[str] = None, consistent: bool = False,
+    ) -> int:
         """
         Counts the number of objects corresponding to the query's where clause.
 
@@ -533,6 +545,8 @@ class ModelQuery:
 
         Args:
             - distinct_on (List[str]): a Hasura `distinct_on` clause
+            - consistent (bool): if True, the query is sent to the primary even if a read
+                URL is configured; use it to read data that was just written
 
         Returns:
             - int: the count of matching items
@@ -549,14 +563,19 @@ class ModelQuery:
                 ): {"aggregate": "count"}
             }
         }
-        result = await prefect.plugins.hasura.client.execute(query, as_box=False)
+        result = await prefect.plugins.hasura.client.execute(
+            query, as_box=False, consistent=consistent
+        )
         return result["data"]["count_query"]["aggregate"]["count"]
 
-    async def max(self, columns) -> dict:
+    async def max(self, columns, consistent: bool = False) -> dict:
         """
         Returns the maximum value of the requested columns
 
         Args:
+            - columns (Iterable[str]): the columns to aggregate
+            - consistent (bool): if True, the query is sent to the primary even if a read
+                URL is configured; use it to read data that was just written
 
         Returns:
             - dict: the requested columns and corresponding minmums
@@ -569,14 +588,19 @@ class ModelQuery:
                 ): {"aggregate": {"max": set(columns)}}
             }
         }
-        result = await prefect.plugins.hasura.client.execute(query, as_box=False)
+        result = await prefect.plugins.hasura.client.execute(
+            query, as_box=False, consistent=consistent
+        )
         return result["data"]["max_query"]["aggregate"]["max"]
 
-    async def min(self, columns) -> dict:
+    async def min(self, columns, consistent: bool = False) -> dict:
         """
         Returns the minimum value of the requested columns
 
         Args:
+            - columns (Iterable[str]): the columns to aggregate
+            - consistent (bool): if True, the query is sent to the primary even if a read
+                URL is configured; use it to read data that was just written
 
         Returns:
             - dict: the requested columns and corresponding minmums
@@ -589,5 +613,7 @@ class ModelQuery:
                 ): {"aggregate": {"min": set(columns)}}
             }
         }
-        result = await prefect.plugins.hasura.client.execute(query, as_box=False)
+        result = await prefect.plugins.hasura.client.execute(
+            query, as_box=False, consistent=consistent
+        )
         return result["data"]["min_query"]["aggregate"]["min"]
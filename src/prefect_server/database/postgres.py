@@ -0,0 +1,98 @@
+"""
+Direct Postgres access for the few operations that Hasura can't express, such as
+session-level advisory locks or set-returning VOLATILE functions.
+
+Almost all database access should go through Hasura; prefer `models` and the
+`hasura.client` wherever possible.
+"""
+import contextlib
+import threading
+from typing import Any, Iterator, List, Sequence
+
+import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+
+from prefect_server import config
+from prefect_server.utilities.asynchronous import run_in_threadpool
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def connect() -> "psycopg2.extensions.connection":
+    """
+    Open a new, dedicated autocommit connection. This is required for anything that
+    depends on session state (like advisory locks), because pooled connections are
+    shared.
+
+    Returns:
+        - psycopg2.extensions.connection: a new connection; the caller is responsible
+            for closing it
+    """
+    connection = psycopg2.connect(config.database.connection_url)
+    connection.autocommit = True
+    return connection
+
+
+def get_pool() -> psycopg2.pool.ThreadedConnectionPool:
+    """
+    Returns the process-wide connection pool, creating it on first use.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            _pool = psycopg2.pool.ThreadedConnectionPool(
+                minconn=config.database.pool_min_size,
+                maxconn=config.database.pool_max_size,
+                dsn=config.database.connection_url,
+            )
+    return _pool
+
+
+@contextlib.contextmanager
+def pooled_connection() -> Iterator["psycopg2.extensions.connection"]:
+    """
+    Check a connection out of the pool for the duration of the context. The
+    surrounding transaction is committed on success and rolled back on error.
+    """
+    pool = get_pool()
+    connection = pool.getconn()
+    try:
+        with connection:
+            yield connection
+    finally:
+        pool.putconn(connection)
+
+
+def _fetch(query: str, params: Sequence = None) -> List[dict]:
+    with pooled_connection() as connection:
+        with connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            cursor.execute(query, params)
+            if cursor.description is None:
+                return []
+            return [dict(row) for row in cursor.fetchall()]
+
+
+async def fetch(query: str, params: Sequence = None) -> List[dict]:
+    """
+    Run a query in a single transaction on a pooled connection and return its rows.
+
+    Args:
+        - query (str): the SQL query, using `%s` placeholders
+        - params (Sequence, optional): query parameters
+
+    Returns:
+        - List[dict]: the returned rows, or an empty list if the query returns nothing
+    """
+    return await run_in_threadpool(_fetch, query, params)
+
+
+async def fetch_value(query: str, params: Sequence = None) -> Any:
+    """
+    Run a query and return the first column of its first row, or `None`.
+    """
+    rows = await fetch(query, params)
+    if not rows:
+        return None
+    return next(iter(rows[0].values()))
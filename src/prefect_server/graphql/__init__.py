@@ -1,3 +1,5 @@
+# resolvers call `prefect.api`, which is registered by importing the API
+import prefect_server.api
 import prefect_server.graphql.scalars
 import prefect_server.graphql.extensions
 import prefect_server.graphql.flows
@@ -0,0 +1,166 @@
+"""
+Caches for GraphQL documents, which clients like agents and flow runners send over and
+over again.
+
+- parsed and validated documents are cached by the hash of their query, so each distinct
+    query is only parsed and validated once per process
+- automatic persisted queries (APQ) let clients send the SHA-256 hash of a query in the
+    `persistedQuery` extension instead of the query itself; if the server doesn't know
+    the hash yet, it responds with a `PersistedQueryNotFound` error and the client
+    retries with both the hash and the query
+
+Ariadne doesn't expose a hook for document parsing, so `install_document_cache` wraps
+the parse and validate functions that `ariadne.graphql` calls.
+"""
+import hashlib
+from typing import Any, List, Optional, Tuple
+
+import ariadne.graphql
+from ariadne.asgi import GraphQL
+from graphql import DocumentNode, GraphQLError, GraphQLSchema
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from prefect_server import config
+from prefect_server.utilities.cache import LRUCache
+
+# sha256(query) -> DocumentNode
+document_cache = LRUCache(maxsize=config.caches.graphql_documents)
+# (id(document), rules, options) -> (DocumentNode, validation errors)
+validation_cache = LRUCache(maxsize=config.caches.graphql_documents)
+# sha256(query) -> query
+persisted_query_cache = LRUCache(maxsize=config.caches.persisted_queries)
+
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+
+_parse_query = ariadne.graphql.parse_query
+_validate_query = ariadne.graphql.validate_query
+
+
+def hash_query(query: str) -> str:
+    """
+    Returns the hex SHA-256 hash of a query, as used by automatic persisted queries.
+    """
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+def parse_query(query: str) -> DocumentNode:
+    """
+    Parses a query, returning a cached document if the query was parsed before.
+    Documents are shared, so they must not be mutated.
+    """
+    key = hash_query(query)
+    document = document_cache.get(key)
+    if document is None:
+        document = _parse_query(query)
+        document_cache.set(key, document)
+    return document
+
+
+def validate_query(
+    schema: GraphQLSchema, document: DocumentNode, rules: Any = None, *args, **kwargs
+) -> List[GraphQLError]:
+    """
+    Validates a document against the schema, returning cached errors if the same
+    document was validated before with the same rules and options.
+    """
+    key = (
+        id(document),
+        tuple(rules or ()),
+        tuple(args),
+        tuple(sorted(kwargs.items())),
+    )
+    cached = validation_cache.get(key)
+    # ids can be reused once a document is garbage collected, so the cached document
+    # must be the same object
+    if cached is not None and cached[0] is document:
+        return cached[1]
+    errors = _validate_query(schema, document, rules, *args, **kwargs)
+    validation_cache.set(key, (document, errors))
+    return errors
+
+
+def install_document_cache() -> None:
+    """
+    Makes ariadne use the cached `parse_query` and `validate_query`.
+    """
+    ariadne.graphql.parse_query = parse_query
+    ariadne.graphql.validate_query = validate_query
+
+
+def resolve_persisted_query(data: Any) -> Tuple[Any, Optional[dict]]:
+    """
+    Resolves the query of a request that uses automatic persisted queries.
+
+    Args:
+        - data (Any): the request data
+
+    Returns:
+        - Tuple[Any, Optional[dict]]: the request data, with its query filled in if it
+            was persisted, and an error response if the request can't be executed
+    """
+    if not isinstance(data, dict):
+        return data, None
+    persisted_query = (data.get("extensions") or {}).get("persistedQuery")
+    if not isinstance(persisted_query, dict):
+        return data, None
+
+    query_hash = persisted_query.get("sha256Hash")
+    query = data.get("query")
+
+    # the client sent the query along with its hash: persist it for later requests
+    if query:
+        if query_hash != hash_query(query):
+            return data, _error_response("provided sha does not match query")
+        persisted_query_cache.set(query_hash, query)
+        return data, None
+
+    query = persisted_query_cache.get(query_hash)
+    if query is None:
+        return (
+            data,
+            _error_response(
+                PERSISTED_QUERY_NOT_FOUND, code="PERSISTED_QUERY_NOT_FOUND"
+            ),
+        )
+    return dict(data, query=query), None
+
+
+def _error_response(message: str, code: str = None) -> dict:
+    error = dict(message=message)  # type: dict
+    if code:
+        error["extensions"] = dict(code=code)
+    return dict(errors=[error])
+
+
+class PersistedQueryError(Exception):
+    """
+    Raised while extracting request data when a persisted query can't be resolved.
+    """
+
+    def __init__(self, response: dict):
+        super().__init__(response)
+        self.response = response
+
+
+class CachedGraphQL(GraphQL):
+    """
+    An ariadne ASGI app that supports automatic persisted queries. Unknown hashes are
+    reported with a 200 status, as APQ clients expect.
+
+    Only `extract_data_from_request` and `graphql_http_server` are overridden, since
+    they are the hooks every supported ariadne version routes requests through.
+    """
+
+    async def extract_data_from_request(self, request: Request) -> Any:
+        data = await super().extract_data_from_request(request)
+        data, error_response = resolve_persisted_query(data)
+        if error_response is not None:
+            raise PersistedQueryError(error_response)
+        return data
+
+    async def graphql_http_server(self, request: Request) -> Response:
+        try:
+            return await super().graphql_http_server(request)
+        except PersistedQueryError as exc:
+            return JSONResponse(exc.response, status_code=200)
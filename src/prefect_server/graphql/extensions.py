@@ -1,10 +1,8 @@
-import inspect
 import textwrap
 import traceback
-from typing import Any
+from typing import Any, ContextManager, Dict, Optional
 
 from ariadne.types import Extension
-from graphql import GraphQLResolveInfo
 
 from prefect_server import config
 from prefect_server.utilities import context, logging
@@ -13,8 +11,8 @@ logger = logging.get_logger("GraphQL")
 
 
 def log_error(exc: Exception) -> None:
-    ctx = context.get_context()
-    ctx.pop("auth_token", None)
+    # the context is read-only, so the auth token is left out of a copy
+    ctx = {k: v for k, v in context.get_context().items() if k != "auth_token"}
     if config.env == "local":
         logger.error(
             textwrap.dedent(
@@ -36,19 +34,45 @@ def log_error(exc: Exception) -> None:
         logger.error({"traceback": traceback.format_exc(), "context": ctx})
 
 
+def get_prefect_headers(context_value: Any) -> Dict[str, str]:
+    """
+    Extracts the `x-prefect-*` headers of the request in a GraphQL context value.
+
+    Args:
+        - context_value (Any): the GraphQL context value, which holds the ASGI request
+
+    Returns:
+        - Dict[str, str]: the headers, with lowercase names
+    """
+    request_headers = context_value.get("request", {}).get("headers", [])
+    # construct a dict, since they come in as a list of tuples
+    headers_dict = {}
+    for name, value in request_headers:
+        name = name.decode().lower()
+        if name.startswith("x-prefect"):
+            headers_dict[name] = value.decode()
+    return headers_dict
+
+
 class PrefectHeader(Extension):
-    async def resolve(
-        self, next_, parent: Any, info: GraphQLResolveInfo, *args: Any, **kwargs: Any
-    ) -> Any:
-        request_headers = info.context.get("request", {}).get("headers", {})
-        # construct a dict, since they come in as a list of tuples
-        headers_dict = {}
-        for header in request_headers:
-            if header[0].decode().lower().startswith("x-prefect"):
-                headers_dict.update({header[0].decode().lower(): header[1].decode()})
-        with context.set_context(headers=headers_dict):
-            result = next_(parent, info, *args, **kwargs)
-            if inspect.iscoroutine(result):
-                result = await result
-
-        return result
+    """
+    Adds the request's `x-prefect-*` headers to the context as `headers`.
+
+    The headers are extracted and the context is set once, when the request starts,
+    so resolvers don't pay for it on every field. Extensions are instantiated for each
+    request, and all resolvers run within the request's context.
+    """
+
+    def __init__(self) -> None:
+        self._headers_context = None  # type: Optional[ContextManager]
+
+    def request_started(self, context_value: Any) -> None:
+        self._headers_context = context.set_context(
+            headers=get_prefect_headers(context_value)
+        )
+        self._headers_context.__enter__()
+
+    def request_finished(self, context_value: Any, error: Exception = None) -> None:
+        if self._headers_context is not None:
+            self._headers_context.__exit__(None, None, None)
+            self._headers_context = None
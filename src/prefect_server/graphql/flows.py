@@ -42,7 +42,9 @@ async def resolve_create_flow(obj: Any, info: GraphQLResolveInfo, input: dict) -
                 "name": {"_eq": serialized_flow.get("name")},
             }
         ).first(
-            order_by={"created": EnumValue("desc")}, selection_set={"version_group_id"}
+            order_by={"created": EnumValue("desc")},
+            selection_set={"version_group_id"},
+            consistent=True,
         )
         if flow:
             version_group_id = flow.version_group_id  # type:ignore
@@ -51,7 +53,7 @@ async def resolve_create_flow(obj: Any, info: GraphQLResolveInfo, input: dict) -
     else:
         flow = await models.Flow.where(
             {"version_group_id": {"_eq": version_group_id}}
-        ).first(selection_set={"version_group_id"})
+        ).first(selection_set={"version_group_id"}, consistent=True)
         if flow:
             new_version_group = False
 
@@ -65,18 +67,9 @@ async def resolve_create_flow(obj: Any, info: GraphQLResolveInfo, input: dict) -
 
     # archive all other versions
     if version_group_id:
-        all_other_unarchived_versions = await models.Flow.where(
-            {
-                "version_group_id": {"_eq": version_group_id},
-                "id": {"_neq": flow_id},
-                "archived": {"_eq": False},
-            }
-        ).get(
-            {"id"}
-        )  # type: Any
-
-        for version in all_other_unarchived_versions:
-            await api.flows.archive_flow(version.id)  # type: ignore
+        await api.flows.archive_flows(
+            version_group_id=version_group_id, except_flow_id=flow_id
+        )
 
     return {"id": flow_id}
 
@@ -137,6 +130,28 @@ async def resolve_disable_flow_lazarus_process(
     }
 
 
+@mutation.field("enable_flow_lazy_task_runs")
+async def resolve_enable_flow_lazy_task_runs(
+    obj: Any, info: GraphQLResolveInfo, input: dict
+) -> dict:
+    return {
+        "success": await api.flows.enable_lazy_task_runs_for_flow(
+            flow_id=input["flow_id"]
+        )
+    }
+
+
+@mutation.field("disable_flow_lazy_task_runs")
+async def resolve_disable_flow_lazy_task_runs(
+    obj: Any, info: GraphQLResolveInfo, input: dict
+) -> dict:
+    return {
+        "success": await api.flows.disable_lazy_task_runs_for_flow(
+            flow_id=input["flow_id"]
+        )
+    }
+
+
 @mutation.field("enable_flow_version_lock")
 async def resolve_enable_flow_version_lock(
     obj: Any, info: GraphQLResolveInfo, input: dict
@@ -0,0 +1,2 @@
+# agents call `prefect.api`, which is registered by importing the API
+import prefect_server.api
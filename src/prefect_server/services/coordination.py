@@ -0,0 +1,235 @@
+"""
+Coordination between multiple replicas of the same loop service.
+
+Coordinators hold Postgres session-level advisory locks on a dedicated connection.
+If a replica dies, its connection closes and Postgres releases its locks, so the
+remaining replicas pick up its work on their next refresh.
+"""
+import zlib
+from typing import List
+
+import psycopg2
+
+from prefect_server.database import postgres
+from prefect_server.utilities.asynchronous import run_in_threadpool
+from prefect_server.utilities.logging import get_logger
+
+COORDINATION_MODES = ["none", "leader", "shard"]
+
+
+def stable_hash(value: str) -> int:
+    """
+    A hash that is identical across processes and machines (unlike `hash()`, which
+    is salted per process), mapped into the positive `int4` range so it can be used
+    as an advisory lock key.
+    """
+    return zlib.crc32(str(value).encode()) & 0x7FFFFFFF
+
+
+class Coordinator:
+    """
+    Base coordinator, used when a service runs without any coordination: it is always
+    active and owns every key.
+
+    Args:
+        - name (str): the name of the coordinated service; replicas with the same
+            name coordinate with each other
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.logger = get_logger(f"{name}.{type(self).__name__}")
+
+    @property
+    def is_active(self) -> bool:
+        """
+        Whether this replica should do any work at all
+        """
+        return True
+
+    def owns(self, key: str) -> bool:
+        """
+        Whether this replica is responsible for the work identified by `key`
+        """
+        return True
+
+    async def refresh(self) -> None:
+        """
+        Refresh this replica's view of the cluster. Called before every loop.
+        """
+
+    async def close(self) -> None:
+        """
+        Release anything held by this replica.
+        """
+
+
+class _AdvisoryLockCoordinator(Coordinator):
+    """
+    Base class for coordinators that hold advisory locks on a dedicated connection.
+    Two-key advisory locks are used: the first key is a namespace derived from the
+    service name, the second identifies the lock within that namespace.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name=name)
+        self.namespace = stable_hash(f"{type(self).__name__}:{name}")
+        self._connection = None
+
+    def _query(self, query: str, params: tuple = None) -> List[tuple]:
+        if self._connection is None or self._connection.closed:
+            self._on_connection_lost()
+            self._connection = postgres.connect()
+        try:
+            with self._connection.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+        except psycopg2.OperationalError:
+            # the session is gone, and any locks it held went with it
+            self._connection.close()
+            self._on_connection_lost()
+            raise
+
+    def _on_connection_lost(self) -> None:
+        """
+        Called whenever a new session is opened; any locks from a previous session
+        are no longer held.
+        """
+
+    def _try_lock(self, key: int) -> bool:
+        return self._query(
+            "SELECT pg_try_advisory_lock(%s, %s)", (self.namespace, key)
+        )[0][0]
+
+    def _close(self) -> None:
+        if self._connection is not None and not self._connection.closed:
+            self._connection.close()
+        self._on_connection_lost()
+
+    async def close(self) -> None:
+        await run_in_threadpool(self._close)
+
+
+class LeaderElection(_AdvisoryLockCoordinator):
+    """
+    Exactly one replica (the one holding the leader lock) is active and owns every
+    key; all others stand by and try to take over on every refresh.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name=name)
+        self.is_leader = False
+
+    @property
+    def is_active(self) -> bool:
+        return self.is_leader
+
+    def owns(self, key: str) -> bool:
+        return self.is_leader
+
+    def _on_connection_lost(self) -> None:
+        self.is_leader = False
+
+    def _refresh(self) -> None:
+        if self.is_leader:
+            # confirm the session holding the lock is still alive
+            self._query("SELECT 1")
+        else:
+            self.is_leader = self._try_lock(0)
+            if self.is_leader:
+                self.logger.info(f"This replica is now the {self.name} leader.")
+
+    async def refresh(self) -> None:
+        await run_in_threadpool(self._refresh)
+
+
+class ShardCoordination(_AdvisoryLockCoordinator):
+    """
+    Every live replica claims one of `slots` shard locks. Keys are assigned to
+    replicas by `stable_hash(key) % <number of live replicas>`, so work is spread
+    evenly and is rebalanced as soon as replicas join or leave.
+
+    Args:
+        - name (str): the name of the coordinated service
+        - slots (int): the maximum number of replicas that can participate
+    """
+
+    def __init__(self, name: str, slots: int):
+        super().__init__(name=name)
+        self.slots = slots
+        self.slot = None  # type: int
+        self.members = []  # type: List[int]
+
+    @property
+    def is_active(self) -> bool:
+        return self.slot is not None and self.slot in self.members
+
+    def owns(self, key: str) -> bool:
+        if not self.is_active:
+            return False
+        return stable_hash(key) % len(self.members) == self.members.index(self.slot)
+
+    def _on_connection_lost(self) -> None:
+        self.slot = None
+        self.members = []
+
+    def _refresh(self) -> None:
+        if self.slot is None:
+            for slot in range(self.slots):
+                if self._try_lock(slot):
+                    self.slot = slot
+                    self.logger.info(f"Claimed {self.name} shard slot {slot}.")
+                    break
+            else:
+                self.logger.warning(
+                    f"All {self.slots} {self.name} shard slots are taken; "
+                    "this replica will stand by."
+                )
+
+        # membership is read from the live locks, so slots held by dead sessions
+        # disappear immediately
+        members = self._query(
+            """
+            SELECT objid FROM pg_locks
+            WHERE locktype = 'advisory'
+                AND classid = %s
+                AND objsubid = 2
+                AND granted
+                AND database = (
+                    SELECT oid FROM pg_database WHERE datname = current_database()
+                )
+            """,
+            (self.namespace,),
+        )
+        new_members = sorted(int(m[0]) for m in members)
+        if new_members != self.members:
+            self.logger.info(
+                f"{self.name} shards rebalanced across {len(new_members)} replicas."
+            )
+        self.members = new_members
+
+    async def refresh(self) -> None:
+        await run_in_threadpool(self._refresh)
+
+
+def get_coordinator(name: str, mode: str, slots: int = None) -> Coordinator:
+    """
+    Create a coordinator for the given mode.
+
+    Args:
+        - name (str): the name of the coordinated service
+        - mode (str): one of "none", "leader", or "shard"
+        - slots (int, optional): the maximum number of replicas when sharding
+
+    Returns:
+        - Coordinator
+    """
+    if mode == "none":
+        return Coordinator(name=name)
+    elif mode == "leader":
+        return LeaderElection(name=name)
+    elif mode == "shard":
+        return ShardCoordination(name=name, slots=slots)
+    raise ValueError(
+        f"Invalid coordination mode {mode!r}; expected one of {COORDINATION_MODES}"
+    )
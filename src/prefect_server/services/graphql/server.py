@@ -1,17 +1,19 @@
 import os
+import time
 from pathlib import Path
 
 import uvicorn
 from ariadne import load_schema_from_path, make_executable_schema
-from ariadne.asgi import GraphQL
 from starlette.applications import Starlette
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 import prefect_server
-from prefect_server.graphql import extensions, scalars
+from prefect import api
+from prefect_server.graphql import documents, extensions, scalars
 from prefect_server.utilities.graphql import mutation, query
 from prefect_server.utilities.logging import get_logger
+from prefect_server.utilities.plugins import load_plugins
 
 logger = get_logger("GraphQL Server")
 sdl = load_schema_from_path(Path(__file__).parents[2] / "graphql" / "schema")
@@ -31,24 +33,53 @@ if not path.endswith("/"):
     raise ValueError("GraphQL path must end with '/'")
 
 
+# agents and flow runners send the same few documents over and over again, so parsed
+# documents are cached and clients can send persisted query hashes instead
+documents.install_document_cache()
+
 app = Starlette()
 app.router.redirect_slashes = False
 app.mount(
     path,
-    GraphQL(
+    documents.CachedGraphQL(
         schema,
         debug=prefect_server.config.services.graphql.debug,
         extensions=[extensions.PrefectHeader],
     ),
 )
 
+app.add_event_handler("startup", load_plugins)
+app.add_event_handler("startup", api.metadata.start_invalidation_listener)
+app.add_event_handler("shutdown", api.metadata.stop_invalidation_listener)
+
 app_version = os.environ.get("PREFECT_SERVER_VERSION") or "UNKNOWN"
 
 
+# each worker process reports its own pid and uptime. With `--preload`, this module is
+# imported once by the gunicorn master before it forks, so the start time is set when
+# each worker starts up rather than at import.
+started = time.monotonic()
+
+
+def _set_started() -> None:
+    global started
+    started = time.monotonic()
+
+
+app.add_event_handler("startup", _set_started)
+
+
 @app.route("/health", methods=["GET"])
 def health(request: Request) -> JSONResponse:
     """Health check for cloud monitoring"""
-    return JSONResponse(dict(status="ok", version=app_version))
+    return JSONResponse(
+        dict(
+            status="ok",
+            version=app_version,
+            pid=os.getpid(),
+            uptime_seconds=round(time.monotonic() - started, 3),
+        )
+    )
 
 
 if __name__ == "__main__":
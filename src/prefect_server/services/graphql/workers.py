@@ -0,0 +1,67 @@
+"""
+Support for running the GraphQL server as several pre-forked worker processes under
+gunicorn, which manages the workers: it restarts any worker that dies, restarts all
+workers gracefully on `SIGHUP`, and drains in-flight requests for up to
+`services.graphql.graceful_timeout_seconds` on `SIGTERM`.
+
+The app is preloaded: it is imported and its schema is built once in the gunicorn
+master, and workers start from a fork of it instead of repeating that work. As a
+consequence, `SIGHUP` restarts the workers from the master's copy of the app and does not
+load new application code; restart the master to deploy code changes.
+"""
+import os
+
+from uvicorn.workers import UvicornWorker
+
+from prefect_server import config
+
+
+class GraphQLWorker(UvicornWorker):
+    """
+    A gunicorn worker that serves the GraphQL app with uvicorn. Unlike the default
+    `UvicornWorker`, it uses `uvloop` and `httptools` only if they are installed.
+    """
+
+    CONFIG_KWARGS = {"loop": "auto", "http": "auto"}
+
+
+def get_worker_count(workers: int = None) -> int:
+    """
+    Returns the number of worker processes to run.
+
+    Args:
+        - workers (int, optional): the requested number of workers; defaults to
+            `services.graphql.workers`. If 0, one worker is run per CPU.
+
+    Returns:
+        - int: the number of workers
+    """
+    if workers is None:
+        workers = config.services.graphql.workers
+    if workers < 0:
+        raise ValueError("The number of workers must be greater than or equal to 0.")
+    return workers or os.cpu_count() or 1
+
+
+def get_gunicorn_command(workers: int, host: str = None, port: int = None) -> list:
+    """
+    Returns the command that runs the GraphQL server with `workers` gunicorn workers.
+    """
+    host = host or config.services.graphql.host
+    port = port or config.services.graphql.port
+    return [
+        "gunicorn",
+        "prefect_server.services.graphql.server:app",
+        "--worker-class",
+        "prefect_server.services.graphql.workers.GraphQLWorker",
+        "--workers",
+        str(workers),
+        "--bind",
+        f"{host}:{port}",
+        "--graceful-timeout",
+        str(config.services.graphql.graceful_timeout_seconds),
+        "--keep-alive",
+        str(config.services.graphql.keep_alive_seconds),
+        # import the app and build the schema once, before forking workers
+        "--preload",
+    ]
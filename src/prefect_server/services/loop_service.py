@@ -1,8 +1,56 @@
 import asyncio
+import bisect
 import random
-from typing import Union
+import time
+from typing import Dict, Optional, Sequence, Union
 
 from prefect_server import config, utilities
+from prefect_server.services import coordination as coordination_module
+
+LOOP_MODES = ["fixed_delay", "fixed_rate"]
+
+# per-service statistics, keyed by service name
+SERVICE_STATS = {}  # type: Dict[str, Dict[str, Histogram]]
+
+
+class Histogram:
+    """
+    A minimal cumulative histogram, used to export loop service telemetry.
+
+    Args:
+        - buckets (Sequence[float]): the (sorted) upper bounds of each bucket; an
+            implicit `+Inf` bucket catches everything else
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = None  # type: Optional[float]
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self) -> Optional[float]:
+        if not self.count:
+            return None
+        return self.sum / self.count
+
+    def snapshot(self) -> dict:
+        """
+        Returns the histogram as a dict of cumulative bucket counts, keyed by upper bound
+        """
+        buckets = {}
+        total = 0
+        for bound, count in zip(self.buckets + [float("inf")], self.counts):
+            total += count
+            buckets[bound] = total
+        return dict(buckets=buckets, count=self.count, sum=self.sum, max=self.max)
 
 
 class LoopService:
@@ -11,6 +59,39 @@ class LoopService:
 
     This class makes it straightforward to design and integrate them. Users only need to
     define the `run_once` coroutine to describe the behavior of the service on each loop.
+    If `run_once` returns the number of items it handled, the loop adapts to it:
+
+    - if no items were handled, the loop backs off exponentially, up to
+        `idle_backoff_max_multiplier` times `loop_seconds`. Backoff is disabled unless
+        a service sets `idle_backoff_max_multiplier` above 1, or the default is raised
+        with `services.loop.idle_backoff_max_multiplier`
+    - if at least `batch_limit` items were handled, there is probably more work waiting,
+        so the next pass starts immediately (services can change this check by
+        overriding `has_more_work`)
+
+    In "fixed_delay" mode the service sleeps `loop_seconds` after every pass; in
+    "fixed_rate" mode passes start every `loop_seconds` regardless of how long they
+    take. Passes never overlap: a pass that overruns its interval is followed
+    immediately by the next one. Passes that run longer than `pass_timeout_seconds`
+    are cancelled.
+
+    Multiple replicas of a service can run at once. With "leader" coordination only one
+    replica is active at a time; with "shard" coordination every replica is active and
+    `run_once` should skip any work for which `self.owns(key)` is False. The mode is
+    loaded from `services.coordination.mode` unless provided.
+
+    The duration of each pass and the number of items it handled are recorded in
+    `SERVICE_STATS`, and summarized in an INFO log every `services.loop.stats_log_passes`
+    passes.
+
+    Args:
+        - loop_seconds (Union[float, int], optional): the number of seconds between loops
+        - coordination (str, optional): one of "none", "leader", or "shard"
+        - loop_mode (str, optional): one of "fixed_delay" or "fixed_rate"; defaults to
+            `services.loop.mode`
+        - pass_timeout_seconds (Union[float, int], optional): the maximum duration of a
+            single pass; defaults to `services.loop.pass_timeout_seconds`. 0 disables the
+            timeout.
     """
 
     # if set, and no `loop_seconds` is provided, the service will attempt to load
@@ -18,8 +99,23 @@ class LoopService:
     loop_seconds_config_key = None
     # if no loop_seconds_config_key is provided, this will be the default
     loop_seconds_default = 600
+    # if `run_once` handles at least this many items, the next pass starts immediately
+    batch_limit = None  # type: int
+    # passes that handle no items back off exponentially, up to this multiple of
+    # `loop_seconds`; if None, `services.loop.idle_backoff_max_multiplier` is used
+    idle_backoff_max_multiplier = None  # type: int
 
-    def __init__(self, loop_seconds: Union[float, int] = None):
+    # the default upper bounds of the duration (seconds) and item count histograms
+    duration_buckets = [0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600]
+    items_buckets = [0, 1, 10, 100, 1000, 10000]
+
+    def __init__(
+        self,
+        loop_seconds: Union[float, int] = None,
+        coordination: str = None,
+        loop_mode: str = None,
+        pass_timeout_seconds: Union[float, int] = None,
+    ):
         if loop_seconds is None:
             if self.loop_seconds_config_key:
 
@@ -34,9 +130,39 @@ class LoopService:
         if loop_seconds == 0:
             raise ValueError("`loop_seconds` must be greater than 0.")
 
+        loop_mode = loop_mode or config.services.loop.mode
+        if loop_mode not in LOOP_MODES:
+            raise ValueError(
+                f"Invalid loop mode {loop_mode!r}; expected one of {LOOP_MODES}"
+            )
+        if pass_timeout_seconds is None:
+            pass_timeout_seconds = config.services.loop.pass_timeout_seconds
+
         self.loop_seconds = float(loop_seconds)
+        self.loop_mode = loop_mode
+        self.pass_timeout_seconds = float(pass_timeout_seconds) or None
+        if self.idle_backoff_max_multiplier is None:
+            self.idle_backoff_max_multiplier = (
+                config.services.loop.idle_backoff_max_multiplier
+            )
+        self.idle_backoff_max_multiplier = max(self.idle_backoff_max_multiplier, 1)
         self.name = type(self).__name__
         self.logger = utilities.logging.get_logger(self.name)
+        self.coordinator = coordination_module.get_coordinator(
+            name=self.name,
+            mode=coordination or config.services.coordination.mode,
+            slots=config.services.coordination.shard_slots,
+        )
+        self.stats = SERVICE_STATS.setdefault(
+            self.name,
+            dict(
+                duration_seconds=Histogram(self.duration_buckets),
+                items=Histogram(self.items_buckets),
+            ),
+        )
+        self.stats_log_passes = config.services.loop.stats_log_passes
+        self._idle_passes = 0
+        self._passes = 0
 
     async def run(self) -> None:
         """
@@ -53,21 +179,151 @@ class LoopService:
         )
         await asyncio.sleep(startup_delay)
 
-        while True:
-            try:
-                await self.run_once()
+        try:
+            while True:
+                start = time.monotonic()
+                result = None
+                try:
+                    await self.coordinator.refresh()
+                    if self.coordinator.is_active:
+                        result = await self.run_pass()
+                    else:
+                        self.logger.debug(f"{self.name} is standing by...")
+
+                except asyncio.TimeoutError:
+                    self.logger.error(
+                        f"{self.name} pass timed out after {self.pass_timeout_seconds} seconds."
+                    )
+
+                # if an error is raised, log and continue
+                except Exception as exc:
+                    self.logger.error(f"Unexpected error: {repr(exc)}")
 
-            # if an error is raised, log and continue
-            except Exception as exc:
-                self.logger.error(f"Unexpected error: {repr(exc)}")
+                sleep_seconds = self.get_sleep_seconds(
+                    result=result, elapsed=time.monotonic() - start
+                )
+                self.logger.debug(f"Sleeping for {sleep_seconds} seconds...")
+                await asyncio.sleep(sleep_seconds)
+        finally:
+            await self.coordinator.close()
 
-            self.logger.debug(f"Sleeping for {self.loop_seconds} seconds...")
-            await asyncio.sleep(self.loop_seconds)
+    async def run_pass(self) -> Optional[int]:
+        """
+        Run `run_once`, enforcing the pass timeout and recording its duration and the
+        number of items it handled.
+
+        Returns:
+            - Optional[int]: the result of `run_once`
+        """
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(
+                self.run_once(), timeout=self.pass_timeout_seconds
+            )
+        finally:
+            duration = time.monotonic() - start
+            self.stats["duration_seconds"].observe(duration)
+
+        if isinstance(result, int):
+            self.stats["items"].observe(result)
+        self.logger.debug(
+            f"{self.name} pass finished in {duration:.3f} seconds (result: {result})."
+        )
+
+        self._passes += 1
+        if self.stats_log_passes and self._passes % self.stats_log_passes == 0:
+            self.log_stats()
+        return result
+
+    def log_stats(self) -> None:
+        """
+        Logs a summary of the pass duration and item count histograms at INFO level.
+        """
+        summaries = []
+        for name, histogram in self.stats.items():
+            snapshot = histogram.snapshot()
+            mean = histogram.mean
+            buckets = ", ".join(
+                f"<={bound:g}: {count}" for bound, count in snapshot["buckets"].items()
+            )
+            summaries.append(
+                f"{name}: count={snapshot['count']} "
+                f"mean={mean if mean is None else round(mean, 3)} "
+                f"max={snapshot['max']} [{buckets}]"
+            )
+        self.logger.info(f"{self.name} stats: " + "; ".join(summaries))
+
+    def has_more_work(self, result: Optional[int]) -> bool:
+        """
+        Whether the last pass probably left work behind, in which case the next pass
+        starts immediately. By default, that is the case if `run_once` handled at least
+        `batch_limit` items.
+
+        Args:
+            - result (Optional[int]): the result of the last pass, if known
+
+        Returns:
+            - bool
+        """
+        return (
+            result is not None and bool(self.batch_limit) and result >= self.batch_limit
+        )
+
+    def get_sleep_seconds(self, result: Optional[int], elapsed: float) -> float:
+        """
+        Determine how long to sleep before the next pass.
+
+        Args:
+            - result (Optional[int]): the number of items handled by the last pass,
+                if known
+            - elapsed (float): the duration of the last pass, in seconds
+
+        Returns:
+            - float: the number of seconds to sleep
+        """
+        if self.has_more_work(result):
+            self._idle_passes = 0
+            return 0
+
+        if result == 0:
+            self._idle_passes += 1
+        else:
+            self._idle_passes = 0
+
+        # the first idle pass doesn't back off; each following one doubles the interval
+        multiplier = min(
+            2 ** max(self._idle_passes - 1, 0), self.idle_backoff_max_multiplier
+        )
+        interval = self.loop_seconds * multiplier
+
+        if self.loop_mode == "fixed_rate":
+            if elapsed >= interval:
+                self.logger.warning(
+                    f"{self.name} pass took {elapsed:.1f} seconds, longer than its "
+                    f"{interval} second interval; starting the next pass immediately."
+                )
+                return 0
+            return interval - elapsed
+        return interval
+
+    def owns(self, key: str) -> bool:
+        """
+        Whether this replica is responsible for the work identified by `key` (for
+        example a flow or tenant id). Always True unless the service is coordinated.
+
+        Args:
+            - key (str): the key identifying the work
+
+        Returns:
+            - bool
+        """
+        return self.coordinator.owns(key)
 
-    async def run_once(self) -> None:
+    async def run_once(self) -> Optional[int]:
         """
         Run the service once.
 
-        Users should override this method.
+        Users should override this method. It may return the number of items handled,
+        which is used to adapt the loop interval.
         """
         raise NotImplementedError()
@@ -1,3 +1,6 @@
+# services call `prefect.api`, which is registered by importing the API
+import prefect_server.api
+import prefect_server.services.towel.late_work_killer
 import prefect_server.services.towel.lazarus
 import prefect_server.services.towel.scheduler
 import prefect_server.services.towel.zombie_killer
@@ -1,14 +1,27 @@
 import asyncio
 
+from prefect import api
+from prefect_server.utilities.plugins import load_plugins
+from prefect_server.services.towel.late_work_killer import LateWorkKiller
 from prefect_server.services.towel.lazarus import Lazarus
 from prefect_server.services.towel.scheduler import Scheduler
 from prefect_server.services.towel.zombie_killer import ZombieKiller
 
 
 async def run_towel():
-    await asyncio.gather(
-        Lazarus().run(), Scheduler().run(), ZombieKiller().run(),
-    )
+    load_plugins()
+    # the services read cached flow metadata, so they drop entries invalidated by the
+    # API servers
+    await api.metadata.start_invalidation_listener()
+    try:
+        await asyncio.gather(
+            Lazarus().run(),
+            Scheduler().run(),
+            ZombieKiller().run(),
+            LateWorkKiller().run(),
+        )
+    finally:
+        await api.metadata.stop_invalidation_listener()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+import asyncio
+
+import pendulum
+
+import prefect
+from prefect.engine.state import Failed
+from prefect.utilities.graphql import EnumValue
+from prefect_server import config
+from prefect_server.database import models
+from prefect_server.services.loop_service import LoopService
+
+
+class LateWorkKiller(LoopService):
+    """
+    The LateWorkKiller fails flow runs that have been `Scheduled` for longer than
+    `services.sla.late_work_seconds` without being picked up by an agent, so they stop
+    accumulating in agent queues.
+
+    Late runs are found through a partial index on the start time of `Scheduled` runs
+    and handled in batches of `batch_limit`, each with one state insert and one log
+    insert.
+    """
+
+    loop_seconds_config_key = "services.sla.late_work_loop_seconds"
+    loop_seconds_default = 600
+    batch_limit = 500
+    # late work is only found a day after it was scheduled, so idle passes can back off
+    # without affecting when it is killed in any meaningful way
+    idle_backoff_max_multiplier = 4
+
+    async def run_once(self) -> int:
+        """
+        Returns:
+            - int: the number of flow runs that were marked as failed
+        """
+        late_work_seconds = config.services.sla.late_work_seconds
+        cutoff = pendulum.now("utc").subtract(seconds=late_work_seconds)
+
+        flow_runs = await models.FlowRun.where(
+            {
+                # the flow run is waiting for an agent
+                "state": {"_eq": "Scheduled"},
+                # ... but was supposed to start a long time ago
+                "state_start_time": {"_lte": str(cutoff)},
+            }
+        ).get(
+            selection_set={"id", "tenant_id"},
+            order_by={"state_start_time": EnumValue("asc")},
+            limit=self.batch_limit,
+        )
+
+        # only handle runs for tenants owned by this replica
+        flow_runs = [fr for fr in flow_runs if self.owns(fr.tenant_id)]
+        if not flow_runs:
+            return 0
+
+        message = (
+            "This run was scheduled to start more than "
+            f"{pendulum.duration(seconds=late_work_seconds).in_words()} ago "
+            "but was never picked up by an agent; marking the run as failed."
+        )
+
+        # set all states in a single transaction
+        states = await prefect.api.states.bulk_set_flow_run_states(
+            flow_run_ids=[fr.id for fr in flow_runs], state=Failed(message=message)
+        )
+
+        # log the state change to each flow run
+        await prefect.api.logs.create_logs(
+            [
+                dict(
+                    tenant_id=s.tenant_id,
+                    flow_run_id=s.flow_run_id,
+                    name=f"{self.logger.name}.FlowRun",
+                    message=message,
+                    level="ERROR",
+                )
+                for s in states
+            ]
+        )
+
+        self.logger.info(f"Marked {len(states)} late flow runs as failed.")
+        return len(states)
+
+
+if __name__ == "__main__":
+    asyncio.run(LateWorkKiller().run())
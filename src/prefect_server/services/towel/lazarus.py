@@ -1,9 +1,11 @@
 import asyncio
+from typing import List, Optional
 
 import pendulum
+from box import Box
 
 import prefect
-from prefect.engine.state import Failed, Running, Scheduled, State
+from prefect.engine.state import Failed, Running, Scheduled
 from prefect.utilities.graphql import EnumValue
 from prefect_server import config
 from prefect_server.database import models
@@ -19,126 +21,201 @@ LAZARUS_EXCLUDE = [
 
 
 class Lazarus(LoopService):
+    """
+    The Lazarus process revives flow runs that are submitted or running but have no
+    tasks in a running or scheduled state.
+
+    Runs are handled a page at a time (`services.lazarus.page_size`) with a bounded
+    number of pages per pass (`services.lazarus.max_pages`), so a pass after a large
+    outage has a bounded cost; anything left over is picked up by the next pass,
+    which starts immediately if the pass fetched every page it was allowed to.
+    """
 
     loop_seconds_default = 600
 
-    async def run_once(self) -> int:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.page_size = config.services.lazarus.page_size
+        self.max_pages = config.services.lazarus.max_pages
+        # the number of runs fetched by the last pass, whether or not they were
+        # rescheduled
+        self.fetched_count = 0
+
+    @property
+    def batch_limit(self) -> int:
+        # a pass that fetches this many runs probably left some behind
+        return self.page_size * self.max_pages
+
+    def has_more_work(self, result: Optional[int]) -> bool:
+        # runs that were fetched but not rescheduled (because they were failed or are
+        # owned by another replica) still fill the page
+        return result is not None and self.fetched_count >= self.batch_limit
+
+    async def get_flow_runs_page(
+        self, heartbeat_before: pendulum.DateTime, after: Box = None
+    ) -> List[Box]:
         """
-        The Lazarus process revives any flow runs that are submitted or running but have no tasks in
-        a running or scheduled state. The heartbeat must be stale in order to avoid race conditions
-        with transitioning tasks.
+        Gets a page of flow runs eligible for resurrection, ordered by heartbeat (and id,
+        to break ties), starting after the provided flow run.
+
+        Args:
+            - heartbeat_before (pendulum.DateTime): only runs with heartbeats older than
+                this are eligible
+            - after (Box, optional): the last run of the previous page
 
         Returns:
-            - int: the number of flow runs that were scheduled
+            - List[Box]: the flow runs
         """
-        time = pendulum.now("utc").subtract(minutes=10)
-
-        flow_runs = await models.FlowRun.where(
-            {
-                # get runs that are currently running or submitted
-                "state": {"_in": ["Running", "Submitted"]},
-                # that were last updated some time ago
-                "heartbeat": {"_lte": str(time)},
+        where = {
+            # get runs that are currently running or submitted
+            "state": {"_in": ["Running", "Submitted"]},
+            # that were last updated some time ago
+            "heartbeat": {"_lte": str(heartbeat_before)},
+            "_and": [
                 # but have no task runs in a near-running state
-                "_not": {"task_runs": {"state": {"_in": LAZARUS_EXCLUDE}}},
+                {"_not": {"task_runs": {"state": {"_in": LAZARUS_EXCLUDE}}}},
                 # and whose do not have heartbeats or lazarus enabled
-                "_not": {
-                    "flow": {
-                        "flow_group": {
-                            "_or": [
-                                {
-                                    "settings": {
-                                        "_contains": {"heartbeat_enabled": False}
-                                    }
-                                },
-                                {"settings": {"_contains": {"lazarus_enabled": False}}},
-                            ]
+                {
+                    "_not": {
+                        "flow": {
+                            "flow_group": {
+                                "_or": [
+                                    {
+                                        "settings": {
+                                            "_contains": {"heartbeat_enabled": False}
+                                        }
+                                    },
+                                    {
+                                        "settings": {
+                                            "_contains": {"lazarus_enabled": False}
+                                        }
+                                    },
+                                ]
+                            }
                         }
                     }
                 },
-            }
-        ).get(
-            selection_set={"id", "version", "tenant_id", "times_resurrected"},
-            order_by={"heartbeat": EnumValue("asc")},
-        )
-        self.logger.info(
-            f"Found {len(flow_runs)} flow runs to reschedule with a Lazarus process"
+            ],
+        }
+        if after is not None:
+            # keyset pagination, which is stable even when runs are skipped
+            where["_or"] = [
+                {"heartbeat": {"_gt": after.heartbeat}},
+                {"heartbeat": {"_eq": after.heartbeat}, "id": {"_gt": after.id}},
+            ]
+
+        return await models.FlowRun.where(where).get(
+            selection_set={"id", "tenant_id", "heartbeat", "times_resurrected"},
+            order_by=[{"heartbeat": EnumValue("asc")}, {"id": EnumValue("asc")}],
+            limit=self.page_size,
+            apply_schema=False,
         )
 
-        if not flow_runs:
-            return 0
+    async def run_once(self) -> int:
+        """
+        Revives any flow runs that are submitted or running but have no tasks in
+        a running or scheduled state. The heartbeat must be stale in order to avoid race conditions
+        with transitioning tasks.
 
+        Returns:
+            - int: the number of flow runs that were scheduled
+        """
+        time = pendulum.now("utc").subtract(minutes=10)
         run_count = 0
+        last_flow_run = None
+        self.fetched_count = 0
+
+        for _ in range(self.max_pages):
+            page = await self.get_flow_runs_page(
+                heartbeat_before=time, after=last_flow_run
+            )
+            if not page:
+                break
+            last_flow_run = page[-1]
+            self.fetched_count += len(page)
+
+            # only handle runs for tenants owned by this replica
+            flow_runs = [fr for fr in page if self.owns(fr.tenant_id)]
+            self.logger.info(
+                f"Found {len(flow_runs)} flow runs to reschedule with a Lazarus process"
+            )
+            run_count += await self.resurrect_flow_runs(flow_runs)
+
+            if len(page) < self.page_size:
+                break
 
-        for fr in flow_runs:
-            # check how many times it's been resurrected, otherwise it will repeat ad infinitum
-            if (
-                fr.times_resurrected
-                < config.services.lazarus.resurrection_attempt_limit
-            ):
-                try:
-                    # Set flow run state to scheduled
-                    await prefect.api.states.set_flow_run_state(
-                        flow_run_id=fr.id,
-                        state=Scheduled(message="Rescheduled by a Lazarus process."),
-                    )
-
-                    # increment the times_resurrected value for the flow run
-                    await models.FlowRun.where(id=fr.id).update(
-                        set=dict(times_resurrected=fr.times_resurrected + 1)
-                    )
-                    # log flow run state change
-                    await prefect.api.logs.create_logs(
-                        [
-                            dict(
-                                tenant_id=fr.tenant_id,
-                                flow_run_id=fr.id,
-                                name=f"{self.logger.name}.FlowRun",
-                                message=(
-                                    "Rescheduled by a Lazarus process. "
-                                    f"This is attempt {fr.times_resurrected + 1}."
-                                ),
-                                level="INFO",
-                            )
-                        ]
-                    )
-
-                    run_count += 1
-
-                except ValueError as exc:
-                    # if the error contains "Update failed", it was a version-lock situation
-                    # and we don't need to interrupt execution on its account. If it was
-                    # anything else, raise an error.
-                    if "Update failed" in str(exc):
-                        self.logger.error(exc)
-                    else:
-                        raise
-            else:
-
-                message = (
-                    "A Lazarus process attempted to reschedule this run "
-                    f"{config.services.lazarus.resurrection_attempt_limit} times "
-                    "without success. Marking as failed."
-                )
-                # Set flow run state to failed
-                await prefect.api.states.set_flow_run_state(
-                    flow_run_id=fr.id, state=Failed(message=message),
+        self.logger.info(f"Lazarus process rescheduled {run_count} flow runs.")
+        return run_count
+
+    async def resurrect_flow_runs(self, flow_runs: List[Box]) -> int:
+        """
+        Reschedules the provided flow runs, or fails them if they have already been
+        rescheduled `services.lazarus.resurrection_attempt_limit` times.
+
+        Returns:
+            - int: the number of flow runs that were scheduled
+        """
+        limit = config.services.lazarus.resurrection_attempt_limit
+
+        # check how many times each run has been resurrected, otherwise it will repeat ad infinitum
+        to_reschedule = [fr for fr in flow_runs if fr.times_resurrected < limit]
+        to_fail = [fr for fr in flow_runs if fr.times_resurrected >= limit]
+        logs = []
+
+        if to_reschedule:
+            ids = [fr.id for fr in to_reschedule]
+
+            # increment times_resurrected in the same transaction as the state change
+            increment_times_resurrected = await models.FlowRun.where(
+                {"id": {"_in": ids}}
+            ).update(
+                increment={"times_resurrected": 1},
+                alias="increment_times_resurrected",
+                run_mutation=False,
+            )
+            await prefect.api.states.bulk_set_flow_run_states(
+                flow_run_ids=ids,
+                state=Scheduled(message="Rescheduled by a Lazarus process."),
+                mutations=[increment_times_resurrected],
+            )
+            logs.extend(
+                dict(
+                    tenant_id=fr.tenant_id,
+                    flow_run_id=fr.id,
+                    name=f"{self.logger.name}.FlowRun",
+                    message=(
+                        "Rescheduled by a Lazarus process. "
+                        f"This is attempt {fr.times_resurrected + 1}."
+                    ),
+                    level="INFO",
                 )
-                # log flow run state change
-                await prefect.api.logs.create_logs(
-                    [
-                        dict(
-                            tenant_id=fr.tenant_id,
-                            flow_run_id=fr.id,
-                            name=f"{self.logger.name}.FlowRun",
-                            message=message,
-                            level="ERROR",
-                        )
-                    ]
+                for fr in to_reschedule
+            )
+
+        if to_fail:
+            message = (
+                "A Lazarus process attempted to reschedule this run "
+                f"{limit} times without success. Marking as failed."
+            )
+            await prefect.api.states.bulk_set_flow_run_states(
+                flow_run_ids=[fr.id for fr in to_fail], state=Failed(message=message),
+            )
+            logs.extend(
+                dict(
+                    tenant_id=fr.tenant_id,
+                    flow_run_id=fr.id,
+                    name=f"{self.logger.name}.FlowRun",
+                    message=message,
+                    level="ERROR",
                 )
+                for fr in to_fail
+            )
 
-        self.logger.info(f"Lazarus process rescheduled {run_count} flow runs.")
-        return run_count
+        # log all flow run state changes at once
+        if logs:
+            await prefect.api.logs.create_logs(logs)
+
+        return len(to_reschedule)
 
 
 if __name__ == "__main__":
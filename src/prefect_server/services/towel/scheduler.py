@@ -1,5 +1,7 @@
 import asyncio
 
+import pendulum
+
 from prefect.utilities.graphql import EnumValue
 from prefect import api
 from prefect_server.database import models
@@ -13,6 +15,8 @@ class Scheduler(LoopService):
     Flows that are eligible for scheduling have the following properties:
         - the schedule is active
         - the flow is not archived
+        - the flow is due: its first upcoming scheduled event has passed, or it has
+            never been scheduled
     """
 
     loop_seconds_config_key = "services.scheduler.scheduler_loop_seconds"
@@ -25,39 +29,53 @@ class Scheduler(LoopService):
         """
 
         runs_scheduled = 0
-        iterations = 0
+        now = pendulum.now("utc")
+        last_flow_id = None
 
-        # visit all flows in batches of 500
+        # visit all due flows in batches of 500. Scheduling a flow moves its due time
+        # into the future, so pages are keyed by id rather than offset.
         while True:
-
-            flows = await models.Flow.where(
-                {
-                    # schedule is active
-                    "is_schedule_active": {"_eq": True},
-                    # flow is not archived
-                    "archived": {"_eq": False},
-                }
-            ).get(
-                selection_set={"id",},
-                order_by=[
+            where = {
+                # schedule is active
+                "is_schedule_active": {"_eq": True},
+                # flow is not archived
+                "archived": {"_eq": False},
+                "_and": [
+                    # the flow or its flow group has a schedule
                     {
-                        "flow_runs_aggregate": {
-                            "max": {"scheduled_start_time": EnumValue("asc_nulls_last")}
-                        }
-                    }
+                        "_or": [
+                            {"schedule": {"_is_null": False}},
+                            {"flow_group": {"schedule": {"_is_null": False}}},
+                        ]
+                    },
+                    # the flow's horizon of scheduled runs needs extending
+                    {
+                        "_or": [
+                            {"schedule_next_due_time": {"_is_null": True}},
+                            {"schedule_next_due_time": {"_lte": str(now)}},
+                        ]
+                    },
                 ],
-                limit=500,
-                offset=500 * iterations,
+            }
+            if last_flow_id is not None:
+                where["id"] = {"_gt": last_flow_id}
+
+            flows = await models.Flow.where(where).get(
+                selection_set={"id"}, order_by={"id": EnumValue("asc")}, limit=500,
             )
 
             if not flows:
                 break
 
-            iterations += 1
+            last_flow_id = flows[-1].id
 
-            # concurrently schedule all runs
+            # concurrently schedule all runs for flows owned by this replica
             all_run_ids = await asyncio.gather(
-                *[api.flows.schedule_flow_runs(flow.id) for flow in flows]
+                *[
+                    api.flows.schedule_flow_runs(flow.id)
+                    for flow in flows
+                    if self.owns(flow.id)
+                ]
             )
             runs_scheduled += sum(len(ids) for ids in all_run_ids)
 
@@ -54,6 +54,9 @@ class ZombieKiller(LoopService):
             if not flow_runs:
                 break
 
+            # only handle runs for tenants owned by this replica
+            flow_runs = [fr for fr in flow_runs if self.owns(fr.tenant_id)]
+
             self.logger.info(f"Zombie killer found {len(flow_runs)} flow runs.")
 
             # Set flow run states to failed
@@ -150,6 +153,9 @@ class ZombieKiller(LoopService):
             if not task_runs:
                 break
 
+            # only handle runs for tenants owned by this replica
+            task_runs = [tr for tr in task_runs if self.owns(tr.tenant_id)]
+
             self.logger.info(f"Zombie killer found {len(task_runs)} task runs.")
 
             # Set task run states to failed
@@ -205,9 +211,14 @@ class ZombieKiller(LoopService):
 
         return zombies
 
-    async def run_once(self) -> None:
-        await self.reap_zombie_cancelling_flow_runs()
-        await self.reap_zombie_task_runs()
+    async def run_once(self) -> int:
+        """
+        Returns:
+            - int: the number of zombie flow runs and task runs that were handled
+        """
+        flow_runs = await self.reap_zombie_cancelling_flow_runs()
+        task_runs = await self.reap_zombie_task_runs()
+        return flow_runs + task_runs
 
 
 if __name__ == "__main__":
@@ -7,3 +7,5 @@ import prefect_server.utilities.logging
 import prefect_server.utilities.names
 import prefect_server.utilities.tests
 import prefect_server.utilities.asynchronous
+import prefect_server.utilities.cache
+import prefect_server.utilities.plugins
@@ -0,0 +1,115 @@
+"""
+Small in-process caches for values that are expensive to look up and rarely (or never)
+change, like the ids of task runs.
+
+Caches are per-process; anything that can change must be explicitly invalidated and
+should tolerate other replicas holding stale values.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    A bounded mapping that evicts the least recently used key once it holds more than
+    `maxsize` keys. Hits and misses are counted to monitor the hit rate.
+
+    Args:
+        - maxsize (int): the maximum number of keys to hold. If 0, nothing is cached.
+        - ttl (float, optional): if provided, keys expire this many seconds after
+            they are set, which bounds how long a missed invalidation can leave a stale
+            value in the cache
+    """
+
+    def __init__(self, maxsize: int, ttl: float = None):
+        if maxsize < 0:
+            raise ValueError("`maxsize` must be greater than or equal to 0.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("`ttl` must be greater than 0.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # key -> (value, expiration time or None)
+        self._data = OrderedDict()  # type: OrderedDict
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        item = self._data.get(key)
+        return item is not None and not self._is_expired(item)
+
+    def __repr__(self) -> str:
+        return (
+            f"<LRUCache: {len(self)}/{self.maxsize} keys, hit rate {self.hit_rate:.1%}>"
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        if not total:
+            return 0.0
+        return self.hits / total
+
+    @staticmethod
+    def _is_expired(item: Tuple[Any, Optional[float]]) -> bool:
+        return item[1] is not None and item[1] <= time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get the value for `key`, marking it as recently used.
+        """
+        item = self._data.get(key)
+        if item is not None and self._is_expired(item):
+            del self._data[key]
+            item = None
+        if item is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._data.move_to_end(key)
+        return item[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Set the value for `key`, evicting the least recently used key if necessary.
+        """
+        if not self.maxsize:
+            return
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove `key` from the cache, returning its value.
+        """
+        item = self._data.pop(key, None)
+        if item is None or self._is_expired(item):
+            return default
+        return item[0]
+
+    def pop_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Remove every key for which `predicate(key, value)` is True.
+
+        Returns:
+            - int: the number of removed keys
+        """
+        keys = [k for k, (v, _) in self._data.items() if predicate(k, v)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """
+        Remove all keys and reset the hit and miss counts.
+        """
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
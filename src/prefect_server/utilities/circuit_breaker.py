@@ -0,0 +1,112 @@
+"""
+A circuit breaker for calls to a dependency that can become unavailable, like Hasura
+during a Postgres failover.
+
+While the dependency is healthy the circuit is closed and every call is allowed. After
+`failure_threshold` consecutive failures it opens, and calls are rejected without
+being attempted. Once `open_seconds` have passed it becomes half-open and lets a single
+trial call through: if the trial succeeds the circuit closes, otherwise it opens again
+for twice as long, up to `max_open_seconds`.
+"""
+import random
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Tracks the health of a dependency. Callers should check `allow_request()` before each
+    call and report its outcome with `record_success()` or `record_failure()`.
+
+    Args:
+        - failure_threshold (int): the number of consecutive failures that opens the
+            circuit
+        - open_seconds (float): how long the circuit stays open the first time it opens
+        - max_open_seconds (float): the maximum time the circuit stays open
+    """
+
+    def __init__(
+        self, failure_threshold: int, open_seconds: float, max_open_seconds: float
+    ):
+        if failure_threshold < 1:
+            raise ValueError("`failure_threshold` must be greater than 0.")
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.reset()
+
+    def __repr__(self) -> str:
+        return f"<CircuitBreaker: {self.state}>"
+
+    @property
+    def state(self) -> str:
+        """
+        The state of the circuit. An open circuit is reported as half-open once its
+        trial call is due.
+        """
+        if self._state == OPEN and time.monotonic() >= self._retry_time:
+            return HALF_OPEN
+        return self._state
+
+    def reset(self) -> None:
+        """
+        Close the circuit and forget any failures.
+        """
+        self._state = CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._retry_time = 0.0
+        self._trial_in_progress = False
+
+    def allow_request(self) -> bool:
+        """
+        Whether a call should be attempted. Once the circuit is half-open, only the first
+        caller is allowed through until the trial call's outcome is recorded.
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._trial_in_progress:
+            self._state = HALF_OPEN
+            self._trial_in_progress = True
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        """
+        The number of seconds until the next trial call is due, or 0 if calls are
+        allowed
+        """
+        if self._state == CLOSED:
+            return 0.0
+        return max(self._retry_time - time.monotonic(), 0.0)
+
+    def release(self) -> None:
+        """
+        Report that an allowed call was abandoned without an outcome, so that another
+        trial call can be made.
+        """
+        self._trial_in_progress = False
+
+    def record_success(self) -> None:
+        self.reset()
+
+    def record_failure(self) -> None:
+        # calls that were in flight when the circuit opened don't open it again
+        if self._state == OPEN:
+            return
+        self._failures += 1
+        self._trial_in_progress = False
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        open_seconds = min(self.open_seconds * 2 ** self._trips, self.max_open_seconds)
+        # jitter the trial time so that replicas don't all probe the dependency at once
+        open_seconds *= random.uniform(0.75, 1.0)
+        self._state = OPEN
+        self._trips += 1
+        self._retry_time = time.monotonic() + open_seconds
@@ -2,34 +2,38 @@
 The Prefect Server context is a Python 3.7 `ContextVar`, meaning it will not leak across threads
 or asynchronous frames.
 
-The context is a dictionary of arbitrary keys and values. At any time, the current context
-can be retrieved by calling `get_context()`.
+The context is an immutable mapping of arbitrary keys and values. At any time, the current
+context can be retrieved by calling `get_context()`, which returns a read-only view.
 
 Values can be set in the context for a specific block of code by using the `set_context()`
-context manager.
+context manager. Each call layers the new values over the current context without copying
+it.
 """
 
 import contextvars
+from collections import ChainMap
 from contextlib import contextmanager
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Mapping
 
 # create a ContextVar to hold the context. This must be a globally-scoped variable.
 _context = contextvars.ContextVar("prefect-server-context", default=None)
 
+# layers are never mutated once they are set, so the empty context can be shared
+_empty_context = ChainMap()  # type: ChainMap
 
-def get_context() -> Dict[str, Any]:
+
+def get_context() -> Mapping[str, Any]:
     """
     Retrieve the current Server Context.
 
     Returns:
-        - Dict[str, Any]: the current context
+        - Mapping[str, Any]: a read-only view of the current context
     """
     ctx = _context.get()  # type: ignore
-    if ctx is not None:
-        assert isinstance(ctx, dict)
-        return ctx.copy()
-    else:
-        return {}
+    if ctx is None:
+        ctx = _empty_context
+    return MappingProxyType(ctx)
 
 
 @contextmanager
@@ -59,12 +63,12 @@ def set_context(**kwargs: Any):
 
     """
 
-    # retrieve the current context dictionary
-    ctx = get_context()
-    # update it with new values
-    ctx.update(**kwargs)
+    # layer the new values over the current context
+    ctx = _context.get()  # type: ignore
+    if ctx is None:
+        ctx = _empty_context
     # set the global context
-    token = _context.set(ctx)
+    token = _context.set(ctx.new_child(kwargs))
 
     try:
         yield
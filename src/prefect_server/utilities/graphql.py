@@ -27,6 +27,7 @@ class GraphQLClient:
         headers: dict = None,
         raise_on_error: bool = True,
         as_box=True,
+        url: str = None,
     ) -> dict:
         """
         Args:
@@ -38,6 +39,7 @@ class GraphQLClient:
                 result contains an `errors` field.
             - as_box (bool): if True, a `box.Box` object is returned, which behaves like a dict
                 but allows "dot" access in addition to key access.
+            - url (str): the URL to send the query to; defaults to the client's URL
 
         Returns:
             - dict: a dictionary of GraphQL info. If `as_box` is True, it will be a Box (dict subclass)
@@ -55,11 +57,15 @@ class GraphQLClient:
 
         # timeout of 30 seconds
         response = await httpx_client.post(
-            self.url,
+            url or self.url,
             json=dict(query=query, variables=variables or {}),
             headers=headers or self.headers,
             timeout=30,
         )
+        # server errors, like a 502 from a proxy in front of the server, don't have a
+        # GraphQL body to report
+        if response.status_code in range(500, 600):
+            response.raise_for_status()
         try:
             result = response.json()
         except json.decoder.JSONDecodeError as exc:
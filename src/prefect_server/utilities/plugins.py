@@ -0,0 +1,36 @@
+"""
+Plugin modules listed in `plugins.modules` are imported when a service starts, after
+all of Prefect Server, so that anything they register takes precedence.
+"""
+import ast
+import importlib
+from types import ModuleType
+from typing import List, Sequence, Union
+
+from prefect_server import config
+from prefect_server.utilities.logging import get_logger
+
+logger = get_logger("plugins")
+
+
+def load_plugins(modules: Union[str, Sequence[str]] = None) -> List[ModuleType]:
+    """
+    Imports plugin modules.
+
+    Args:
+        - modules (Union[str, Sequence[str]], optional): the modules to import, or a
+            string representation of a list of modules; defaults to `plugins.modules`
+
+    Returns:
+        - List[ModuleType]: the imported modules
+    """
+    if modules is None:
+        modules = config.plugins.modules
+    if isinstance(modules, str):
+        modules = ast.literal_eval(modules)
+
+    loaded = []
+    for module in modules:
+        loaded.append(importlib.import_module(module))
+        logger.debug(f"Loaded plugin {module!r}")
+    return loaded
@@ -1,13 +1,17 @@
 import copy
+import dataclasses
 import hashlib
 import json
 import subprocess
 import time
 from contextlib import contextmanager
-from typing import Any, Callable, Iterator, List, Union
+from typing import Any, Callable, Dict, Iterator, List, Union
+
+import graphql
 
 import prefect_server
 from prefect.configuration import Config
+from prefect.utilities.graphql import parse_graphql
 
 
 def yaml_sorter(data: dict) -> Union[dict, List]:
@@ -126,3 +130,155 @@ def evaluate_delete_event_payload(table_name, row_id, post_mock):
     assert post_mock.call_args[1].get("headers") == {
         "X-PREFECT-EVENT": "prefect_server-0.0.1"
     }
+
+
+@dataclasses.dataclass
+class RecordedQuery:
+    """
+    A GraphQL request made with `HasuraClient.execute`.
+
+    Attributes:
+        - query (str): the query
+        - operation (str): "query", "mutation", or "subscription"
+        - fields (List[str]): the names of the query's root fields, ignoring aliases
+        - duration (float): how long the request took, in seconds
+    """
+
+    query: str
+    operation: str
+    fields: List[str]
+    duration: float
+
+    @property
+    def shape(self) -> str:
+        """
+        A short description of the query, like "mutation insert_flow_run_state"
+        """
+        return f"{self.operation} {', '.join(self.fields)}"
+
+
+class QueryRecorder:
+    """
+    Records every request made with `HasuraClient.execute` (by any client instance)
+    while it is active, to keep track of the number of Hasura round trips made by an
+    API function. Queries sent directly to Postgres with `postgres.fetch` (or
+    `postgres.fetch_value`) are recorded separately, as `sql_queries`.
+
+    Example:
+        ```python
+        recorder = QueryRecorder()
+        with recorder:
+            await api.states.set_flow_run_state(flow_run_id, state=Running())
+        print(recorder.count, recorder.sql_count, recorder.shapes)
+        ```
+    """
+
+    def __init__(self) -> None:
+        self.queries = []  # type: List[RecordedQuery]
+        self.sql_queries = []  # type: List[RecordedQuery]
+        self._original_execute = None  # type: Callable
+        self._original_fetch = None  # type: Callable
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def sql_count(self) -> int:
+        return len(self.sql_queries)
+
+    @property
+    def shapes(self) -> List[str]:
+        return [q.shape for q in self.queries]
+
+    @property
+    def sql_shapes(self) -> List[str]:
+        return [q.shape for q in self.sql_queries]
+
+    @property
+    def duration(self) -> float:
+        return sum(q.duration for q in self.queries + self.sql_queries)
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Returns the number of recorded Hasura and Postgres queries of each shape
+        """
+        summary = {}  # type: Dict[str, int]
+        for shape in self.shapes + self.sql_shapes:
+            summary[shape] = summary.get(shape, 0) + 1
+        return summary
+
+    def clear(self) -> None:
+        self.queries.clear()
+        self.sql_queries.clear()
+
+    def __enter__(self) -> "QueryRecorder":
+        from prefect_server.database import postgres
+        from prefect_server.database.hasura import HasuraClient
+
+        if self._original_execute is not None:
+            raise RuntimeError("The recorder is already active.")
+
+        original_execute = HasuraClient.execute
+        original_fetch = postgres.fetch
+        recorder = self
+
+        async def execute(client, query, *args, **kwargs):  # type: ignore
+            if not isinstance(query, str):
+                query = parse_graphql(query)
+            start = time.monotonic()
+            try:
+                return await original_execute(client, query, *args, **kwargs)
+            finally:
+                recorder._record(query, duration=time.monotonic() - start)
+
+        # `postgres.fetch_value` calls `fetch` through the module, so this records it too
+        async def fetch(query, *args, **kwargs):  # type: ignore
+            start = time.monotonic()
+            try:
+                return await original_fetch(query, *args, **kwargs)
+            finally:
+                recorder._record_sql(query, duration=time.monotonic() - start)
+
+        self._original_execute = original_execute
+        self._original_fetch = original_fetch
+        HasuraClient.execute = execute  # type: ignore
+        postgres.fetch = fetch  # type: ignore
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        from prefect_server.database import postgres
+        from prefect_server.database.hasura import HasuraClient
+
+        HasuraClient.execute = self._original_execute  # type: ignore
+        postgres.fetch = self._original_fetch  # type: ignore
+        self._original_execute = None
+        self._original_fetch = None
+
+    def _record_sql(self, query: str, duration: float) -> None:
+        # SQL queries are described by their first line, like "sql SELECT
+        # utility.create_task_runs(%s)"
+        lines = [line.strip() for line in query.strip().splitlines()]
+        self.sql_queries.append(
+            RecordedQuery(
+                query=query, operation="sql", fields=lines[:1], duration=duration
+            )
+        )
+
+    def _record(self, query: str, duration: float) -> None:
+        try:
+            document = graphql.parse(query)
+        except graphql.GraphQLError:
+            operation, fields = "unknown", []  # type: Any
+        else:
+            definition = document.definitions[0]
+            operation = definition.operation.value
+            fields = [
+                selection.name.value
+                for selection in definition.selection_set.selections
+            ]
+        self.queries.append(
+            RecordedQuery(
+                query=query, operation=operation, fields=fields, duration=duration
+            )
+        )
@@ -1,4 +1,5 @@
 import asyncio
+import json
 import uuid
 from unittest.mock import MagicMock
 
@@ -498,7 +499,7 @@ class TestCallHooks:
         call_args = cloud_hook_mock.call_args
 
         assert call_args[0][0] == "http://0.0.0.0:8100/hook"
-        event = call_args[1]["json"]["event"]
+        event = json.loads(call_args[1]["data"])["event"]
         assert event["type"] == "FlowRunStateChange"
         assert dt < pendulum.parse(event["timestamp"]) < pendulum.now()
         assert event["flow_run"]["id"] == flow_run_id
@@ -506,6 +507,28 @@ class TestCallHooks:
 
         assert event["id"] == call_args[1]["headers"]["X-PREFECT-EVENT-ID"]
 
+    async def test_call_hooks_shares_payload_across_webhooks(
+        self, tenant_id, flow_run_id, cloud_hook_mock
+    ):
+        for i in range(3):
+            await api.cloud_hooks.create_cloud_hook(
+                tenant_id=tenant_id,
+                type="WEBHOOK",
+                config=dict(url=f"http://0.0.0.0:8100/hook-{i}"),
+            )
+
+        await api.states.set_flow_run_state(
+            flow_run_id=flow_run_id, state=prefect.engine.state.Failed()
+        )
+
+        # sleep to give the async webhook a chance to fire
+        await asyncio.sleep(1)
+        bodies = [call[1]["data"] for call in cloud_hook_mock.call_args_list]
+        assert len(bodies) == 3
+        # the event is serialized once and the same body is sent to every hook
+        assert all(body is bodies[0] for body in bodies)
+        assert json.loads(bodies[0])["event"]["state"]["state"] == "Failed"
+
     async def test_call_hooks_multiple_times(
         self, tenant_id, flow_run_id, cloud_hook_mock
     ):
@@ -530,7 +553,7 @@ class TestCallHooks:
         await asyncio.sleep(1)
         states = set(
             [
-                call[1]["json"]["event"]["state"]["state"]
+                json.loads(call[1]["data"])["event"]["state"]["state"]
                 for call in cloud_hook_mock.call_args_list
             ]
         )
@@ -560,7 +583,7 @@ class TestCallHooks:
         await asyncio.sleep(1)
         states = set(
             [
-                call[1]["json"]["event"]["state"]["state"]
+                json.loads(call[1]["data"])["event"]["state"]["state"]
                 for call in cloud_hook_mock.call_args_list
             ]
         )
@@ -592,9 +615,8 @@ class TestCallHooks:
 
         # sleep to give the async webhook a chance to fire
         await asyncio.sleep(1)
-        assert (
-            cloud_hook_mock.call_args[1]["json"]["event"]["state"]["state"] == "Success"
-        )
+        event = json.loads(cloud_hook_mock.call_args[1]["data"])["event"]
+        assert event["state"]["state"] == "Success"
 
     @pytest.mark.parametrize(
         "state", [prefect.engine.state.Running(), prefect.engine.state.Success()]
@@ -651,6 +673,30 @@ class TestCallHooks:
         assert message.content["event"]["state"]["id"] == flow_run_state.id
         assert message.content["type"] == "CLOUD_HOOK"
 
+    @pytest.mark.parametrize("call_hooks_on_creation", [False, True])
+    async def test_create_flow_run_calls_hooks_only_if_configured(
+        self, tenant_id, flow_id, call_hooks_on_creation
+    ):
+        await api.cloud_hooks.create_cloud_hook(
+            tenant_id=tenant_id, type="PREFECT_MESSAGE", config={}
+        )
+
+        with tests.set_temporary_config(
+            "runs.call_hooks_on_creation", call_hooks_on_creation
+        ):
+            flow_run_id = await api.runs.create_flow_run(flow_id=flow_id)
+        await asyncio.sleep(1)
+
+        messages = await models.Message.where({"tenant_id": {"_eq": tenant_id}}).get(
+            {"content"}
+        )
+        if call_hooks_on_creation:
+            assert len(messages) == 1
+            assert messages[0].content["event"]["state"]["state"] == "Scheduled"
+            assert messages[0].content["event"]["flow_run"]["id"] == flow_run_id
+        else:
+            assert messages == []
+
 
 class TestTestHooks:
     async def test_test_cloud_hook(self, tenant_id, flow_run_id, cloud_hook_mock):
@@ -665,7 +711,7 @@ class TestTestHooks:
         # sleep to give the async webhook a chance to fire
         await asyncio.sleep(1)
         call_args = cloud_hook_mock.call_args
-        event = call_args[1]["json"]["event"]
+        event = json.loads(call_args[1]["data"])["event"]
         assert event["type"] == "FlowRunStateChange"
         assert event["is_test_event"] is True
         assert event["state"]["state"] == "Success"
@@ -694,7 +740,7 @@ class TestTestHooks:
         # sleep to give the async webhook a chance to fire
         await asyncio.sleep(1)
         call_args = cloud_hook_mock.call_args
-        event = call_args[1]["json"]["event"]
+        event = json.loads(call_args[1]["data"])["event"]
         assert event["type"] == "FlowRunStateChange"
         assert event["is_test_event"] is True
         assert event["state"]["state"] == type(state).__name__
@@ -231,6 +231,18 @@ class TestSetFlowGroupSchedule:
                 clocks=[{"type": "CronClock", "cron": "42 0 0 * * *"}],
             )
 
+    async def test_setting_schedule_resets_next_due_time(self, flow_id, flow_group_id):
+        await api.flows.schedule_flow_runs(flow_id)
+        flow = await models.Flow.where(id=flow_id).first({"schedule_next_due_time"})
+        assert flow.schedule_next_due_time is not None
+
+        await api.flow_groups.set_flow_group_schedule(
+            flow_group_id=flow_group_id,
+            clocks=[{"type": "CronClock", "cron": "42 0 0 * * *"}],
+        )
+        flow = await models.Flow.where(id=flow_id).first({"schedule_next_due_time"})
+        assert flow.schedule_next_due_time is None
+
 
 class TestDeleteFlowGroupSchedule:
     async def test_delete_flow_group_schedule(self, flow_id, flow_group_id):
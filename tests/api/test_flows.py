@@ -9,6 +9,7 @@ import prefect
 from prefect.utilities.graphql import EnumValue
 from prefect import api
 from prefect_server.database import models
+from prefect_server.utilities.tests import set_temporary_config
 
 
 @pytest.fixture
@@ -544,6 +545,197 @@ class TestCreateFlowVersions:
                 assert task.tags == []
 
 
+class TestCreateFlowInChunks:
+    @pytest.fixture(autouse=True)
+    def small_chunks(self):
+        # the fixture flow has 6 tasks and 4 edges
+        with set_temporary_config("flows.registration_chunk_size", 4):
+            yield
+
+    async def test_create_flow_in_chunks(self, project_id, flow):
+        flow_id = await api.flows.create_flow(
+            project_id=project_id, serialized_flow=flow.serialize()
+        )
+        result = await models.Flow.where(id=flow_id).first(
+            {
+                "archived": True,
+                "tasks_aggregate": {"aggregate": {"count"}},
+                "edges_aggregate": {"aggregate": {"count"}},
+            },
+            apply_schema=False,
+        )
+        assert result.archived is False
+        assert result.tasks_aggregate.aggregate.count == len(flow.tasks)
+        assert result.edges_aggregate.aggregate.count == len(flow.edges)
+
+    async def test_edges_reference_tasks_of_the_flow(self, project_id, flow):
+        flow_id = await api.flows.create_flow(
+            project_id=project_id, serialized_flow=flow.serialize()
+        )
+        edges = await models.Edge.where({"flow_id": {"_eq": flow_id}}).get(
+            {"upstream_task": {"flow_id"}, "downstream_task": {"flow_id"}},
+            apply_schema=False,
+        )
+        assert len(edges) == len(flow.edges)
+        for edge in edges:
+            assert edge.upstream_task.flow_id == flow_id
+            assert edge.downstream_task.flow_id == flow_id
+
+    async def test_create_flow_in_chunks_sets_mapped_tasks(self, project_id, flow):
+        flow_id = await api.flows.create_flow(
+            project_id=project_id, serialized_flow=flow.serialize()
+        )
+        tasks = await models.Task.where({"flow_id": {"_eq": flow_id}}).get(
+            {"name", "mapped"}
+        )
+        assert {t.name for t in tasks if t.mapped} == {"t3"}
+
+    async def test_failed_chunk_deletes_flow(self, project_id, flow, monkeypatch):
+        async def insert_many(*args, **kwargs):
+            raise ValueError("chunk failed")
+
+        monkeypatch.setattr(models.Edge, "insert_many", insert_many)
+        with pytest.raises(ValueError, match="chunk failed"):
+            await api.flows.create_flow(
+                project_id=project_id, serialized_flow=flow.serialize()
+            )
+        assert await models.Flow.where({"name": {"_eq": flow.name}}).count() == 0
+        assert await models.Task.where({"name": {"_eq": "t1"}}).count() == 0
+
+
+class TestCreateFlowDeduplication:
+    async def test_create_flow_stores_hash(self, project_id, flow):
+        flow_id = await api.flows.create_flow(
+            project_id=project_id, serialized_flow=flow.serialize()
+        )
+        flow_model = await models.Flow.where(id=flow_id).first({"serialized_flow_hash"})
+        assert flow_model.serialized_flow_hash == api.flows._hash_json(flow.serialize())
+
+    def test_hash_ignores_key_order(self):
+        assert api.flows._hash_json(
+            {"a": 1, "b": [1, {"c": 2, "d": 3}]}
+        ) == api.flows._hash_json({"b": [1, {"d": 3, "c": 2}], "a": 1})
+        assert api.flows._hash_json({"a": 1}) != api.flows._hash_json({"a": 2})
+
+    async def test_identical_flows_create_new_versions_by_default(
+        self, project_id, flow
+    ):
+        flow_id_1 = await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=flow.serialize(),
+            version_group_id="dedupe",
+        )
+        flow_id_2 = await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=flow.serialize(),
+            version_group_id="dedupe",
+        )
+        assert flow_id_1 != flow_id_2
+
+    async def test_deduplicate_identical_flow(self, project_id, flow):
+        flow_id = await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=flow.serialize(),
+            version_group_id="dedupe",
+        )
+        n_tasks = await models.Task.where().count()
+
+        assert (
+            await api.flows.create_flow(
+                project_id=project_id,
+                serialized_flow=flow.serialize(),
+                version_group_id="dedupe",
+                deduplicate=True,
+            )
+            == flow_id
+        )
+        assert (
+            await models.Flow.where({"version_group_id": {"_eq": "dedupe"}}).count()
+            == 1
+        )
+        assert await models.Task.where().count() == n_tasks
+
+    async def test_deduplicate_with_config(self, project_id, flow):
+        flow_id = await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=flow.serialize(),
+            version_group_id="dedupe",
+        )
+        with set_temporary_config("flows.deduplicate_registrations", True):
+            assert (
+                await api.flows.create_flow(
+                    project_id=project_id,
+                    serialized_flow=flow.serialize(),
+                    version_group_id="dedupe",
+                )
+                == flow_id
+            )
+
+    async def test_deduplicate_different_flow(self, project_id, flow):
+        flow_id = await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=flow.serialize(),
+            version_group_id="dedupe",
+        )
+        flow.add_task(prefect.Task("another task"))
+        new_flow_id = await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=flow.serialize(),
+            version_group_id="dedupe",
+            deduplicate=True,
+        )
+        assert new_flow_id != flow_id
+
+    async def test_deduplicate_archived_flow(self, project_id, flow):
+        flow_id = await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=flow.serialize(),
+            version_group_id="dedupe",
+        )
+        await api.flows.archive_flow(flow_id)
+        new_flow_id = await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=flow.serialize(),
+            version_group_id="dedupe",
+            deduplicate=True,
+        )
+        assert new_flow_id != flow_id
+
+    async def test_deduplicate_only_latest_version(self, project_id, flow):
+        flow_id = await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=flow.serialize(),
+            version_group_id="dedupe",
+        )
+        await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=prefect.Flow(name="other").serialize(),
+            version_group_id="dedupe",
+        )
+        new_flow_id = await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=flow.serialize(),
+            version_group_id="dedupe",
+            deduplicate=True,
+        )
+        assert new_flow_id != flow_id
+
+    async def test_deduplicate_with_different_description(self, project_id, flow):
+        flow_id = await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=flow.serialize(),
+            version_group_id="dedupe",
+        )
+        new_flow_id = await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=flow.serialize(),
+            version_group_id="dedupe",
+            description="new description",
+            deduplicate=True,
+        )
+        assert new_flow_id != flow_id
+
+
 class TestArchive:
     async def test_archive_flow(self, flow_id):
         flow = await models.Flow.where(id=flow_id).first({"archived"})
@@ -587,6 +779,77 @@ class TestArchive:
             await api.flows.archive_flow(flow_id=None)
 
 
+class TestArchiveFlows:
+    @pytest.fixture
+    async def version_ids(self, project_id, flow_id):
+        flow = await models.Flow.where(id=flow_id).first({"version_group_id"})
+        version_ids = [flow_id]
+        for _ in range(3):
+            version_ids.append(
+                await api.flows.create_flow(
+                    project_id=project_id,
+                    serialized_flow=prefect.Flow(name="test").serialize(),
+                    version_group_id=flow.version_group_id,
+                )
+            )
+        return version_ids
+
+    async def test_archive_flows(self, version_ids):
+        flow = await models.Flow.where(id=version_ids[0]).first({"version_group_id"})
+        archived = await api.flows.archive_flows(
+            version_group_id=flow.version_group_id, except_flow_id=version_ids[-1]
+        )
+        assert set(archived) == set(version_ids[:-1])
+
+        flows = await models.Flow.where({"id": {"_in": version_ids}}).get(
+            {"id", "archived"}
+        )
+        assert {f.id: f.archived for f in flows} == {
+            **{i: True for i in version_ids[:-1]},
+            version_ids[-1]: False,
+        }
+
+    async def test_archive_flows_without_exception(self, version_ids):
+        flow = await models.Flow.where(id=version_ids[0]).first({"version_group_id"})
+        archived = await api.flows.archive_flows(version_group_id=flow.version_group_id)
+        assert set(archived) == set(version_ids)
+
+    async def test_archive_flows_ignores_archived_flows(self, version_ids):
+        flow = await models.Flow.where(id=version_ids[0]).first({"version_group_id"})
+        await api.flows.archive_flow(version_ids[0])
+        archived = await api.flows.archive_flows(version_group_id=flow.version_group_id)
+        assert set(archived) == set(version_ids[1:])
+
+    async def test_archive_flows_deletes_scheduled_runs(self, version_ids):
+        flow = await models.Flow.where(id=version_ids[0]).first({"version_group_id"})
+        scheduled_start_time = pendulum.now("utc").add(days=1)
+        flow_run_ids = {
+            version_id: await api.runs.create_flow_run(
+                flow_id=version_id, scheduled_start_time=scheduled_start_time
+            )
+            for version_id in version_ids
+        }
+        await api.flows.archive_flows(
+            version_group_id=flow.version_group_id, except_flow_id=version_ids[-1]
+        )
+
+        remaining = await models.FlowRun.where(
+            {"id": {"_in": list(flow_run_ids.values())}}
+        ).get({"id"})
+        assert [r.id for r in remaining] == [flow_run_ids[version_ids[-1]]]
+
+    async def test_archive_flows_invalidates_metadata(self, version_ids):
+        flow = await models.Flow.where(id=version_ids[0]).first({"version_group_id"})
+        assert not (await api.metadata.get_flow(version_ids[0])).archived
+
+        await api.flows.archive_flows(version_group_id=flow.version_group_id)
+        assert (await api.metadata.get_flow(version_ids[0])).archived
+
+    async def test_archive_flows_with_none_version_group_id(self):
+        with pytest.raises(ValueError, match="Must provide version group ID."):
+            await api.flows.archive_flows(version_group_id=None)
+
+
 class TestUnarchiveFlow:
     async def test_unarchive_flow(self, flow_id):
         flow = await models.Flow.where(id=flow_id).first({"archived"})
@@ -762,6 +1025,23 @@ class TestUpdateLazarusForFlow:
             await api.flows.enable_lazarus_for_flow(flow_id=None)
 
 
+class TestUpdateLazyTaskRunsForFlow:
+    async def test_enable_lazy_task_runs_for_flow(self, flow_id, flow_group_id):
+        assert await api.flows.enable_lazy_task_runs_for_flow(flow_id=flow_id)
+        flow_group = await models.FlowGroup.where(id=flow_group_id).first({"settings"})
+        assert flow_group.settings["lazy_task_runs_enabled"] is True
+
+    async def test_disable_lazy_task_runs_for_flow(self, flow_id, flow_group_id):
+        await api.flows.enable_lazy_task_runs_for_flow(flow_id=flow_id)
+        assert await api.flows.disable_lazy_task_runs_for_flow(flow_id=flow_id)
+        flow_group = await models.FlowGroup.where(id=flow_group_id).first({"settings"})
+        assert flow_group.settings["lazy_task_runs_enabled"] is False
+
+    async def test_enable_lazy_task_runs_for_flow_with_none_flow_id(self):
+        with pytest.raises(ValueError, match="Invalid flow ID"):
+            await api.flows.enable_lazy_task_runs_for_flow(flow_id=None)
+
+
 class TestUpdateVersionLockingForFlow:
     async def test_disable_version_locking_for_flow(self, flow_id, flow_group_id):
         await models.FlowGroup.where(id=flow_group_id).update(
@@ -1010,6 +1290,24 @@ class TestScheduleRuns:
         assert len(await api.flows.schedule_flow_runs(flow_id)) == 10
         assert await api.flows.schedule_flow_runs(flow_id) == []
 
+    async def test_schedule_runs_sets_next_due_time(self, flow_id):
+        await models.FlowRun.where({"flow_id": {"_eq": flow_id}}).delete()
+        run_ids = await api.flows.schedule_flow_runs(flow_id)
+
+        first_run = await models.FlowRun.where({"id": {"_in": run_ids}}).first(
+            {"scheduled_start_time"},
+            order_by={"scheduled_start_time": EnumValue("asc")},
+        )
+        flow = await models.Flow.where(id=flow_id).first({"schedule_next_due_time"})
+        assert flow.schedule_next_due_time == first_run.scheduled_start_time
+
+    async def test_schedule_runs_uses_schedule_cache(self, flow_id):
+        api.flows.schedule_cache.clear()
+        await api.flows.schedule_flow_runs(flow_id)
+        await api.flows.schedule_flow_runs(flow_id)
+        assert len(api.flows.schedule_cache) == 1
+        assert api.flows.schedule_cache.hits == 1
+
     async def test_schedule_runs_on_create_flow(self, project_id):
         flow = prefect.Flow(
             name="test",
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+
+from prefect import api
+from prefect_server import config
+from prefect_server.database import models, postgres
+from prefect_server.utilities.tests import set_temporary_config
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    api.metadata.task_cache.clear()
+    api.metadata.flow_cache.clear()
+
+
+class TestGetMetadata:
+    async def test_get_task(self, task_id, flow_id, tenant_id):
+        task = await api.metadata.get_task(task_id)
+        assert task.id == task_id
+        assert task.flow_id == flow_id
+        assert task.tenant_id == tenant_id
+
+    async def test_get_task_is_cached(self, task_id):
+        task = await api.metadata.get_task(task_id)
+        assert await api.metadata.get_task(task_id) is task
+        assert api.metadata.task_cache.hits == 1
+        assert api.metadata.task_cache.misses == 1
+
+    async def test_get_missing_task_is_not_cached(self):
+        assert await api.metadata.get_task(str(uuid.uuid4())) is None
+        assert len(api.metadata.task_cache) == 0
+
+    async def test_get_flow(self, flow_id, flow_group_id, tenant_id):
+        flow = await api.metadata.get_flow(flow_id)
+        assert flow.id == flow_id
+        assert flow.tenant_id == tenant_id
+        assert flow.flow_group_id == flow_group_id
+        assert flow.archived is False
+        assert flow.flow_group.default_parameters == {}
+
+    async def test_get_flow_is_cached(self, flow_id):
+        flow = await api.metadata.get_flow(flow_id)
+        assert await api.metadata.get_flow(flow_id) is flow
+
+    async def test_cache_stats(self, flow_id):
+        await api.metadata.get_flow(flow_id)
+        await api.metadata.get_flow(flow_id)
+        stats = api.metadata.get_cache_stats()
+        assert stats["flow"]["size"] == 1
+        assert stats["flow"]["hit_rate"] == 0.5
+        assert stats["task"]["size"] == 0
+
+
+class TestInvalidation:
+    async def test_invalidate_flow_drops_flow_and_tasks(self, flow_id, task_id):
+        await api.metadata.get_flow(flow_id)
+        await api.metadata.get_task(task_id)
+
+        await api.metadata.invalidate(flow_ids=[flow_id])
+        assert flow_id not in api.metadata.flow_cache
+        assert task_id not in api.metadata.task_cache
+
+    async def test_invalidate_flow_group(self, flow_id, flow_group_id):
+        await api.metadata.get_flow(flow_id)
+        await api.metadata.invalidate(flow_group_ids=[flow_group_id])
+        assert flow_id not in api.metadata.flow_cache
+
+    async def test_archive_flow_invalidates(self, flow_id):
+        await api.runs.create_flow_run(flow_id=flow_id)
+        await api.flows.archive_flow(flow_id)
+        with pytest.raises(ValueError, match="archived"):
+            await api.runs.create_flow_run(flow_id=flow_id)
+
+        await api.flows.unarchive_flow(flow_id)
+        assert await api.runs.create_flow_run(flow_id=flow_id)
+
+    async def test_delete_flow_invalidates(self, flow_id, task_id):
+        await api.metadata.get_flow(flow_id)
+        await api.metadata.get_task(task_id)
+        await api.flows.delete_flow(flow_id)
+        assert await api.metadata.get_flow(flow_id) is None
+        assert await api.metadata.get_task(task_id) is None
+
+    async def test_default_parameters_invalidate(self, flow_id, flow_group_id):
+        await api.runs.create_flow_run(flow_id=flow_id, parameters=dict(x=1))
+        await api.flow_groups.set_flow_group_default_parameters(
+            flow_group_id=flow_group_id, parameters=dict(x=2, y=3)
+        )
+        flow_run_id = await api.runs.create_flow_run(flow_id=flow_id)
+        flow_run = await models.FlowRun.where(id=flow_run_id).first({"parameters"})
+        assert flow_run.parameters == dict(x=2, y=3)
+
+    async def test_create_flow_run_does_not_modify_cached_defaults(
+        self, flow_id, flow_group_id
+    ):
+        await api.flow_groups.set_flow_group_default_parameters(
+            flow_group_id=flow_group_id, parameters=dict(x=2)
+        )
+        await api.runs.create_flow_run(flow_id=flow_id, parameters=dict(x=1, y=1))
+        flow = await api.metadata.get_flow(flow_id)
+        assert flow.flow_group.default_parameters == dict(x=2)
+
+    def test_caches_expire(self):
+        assert api.metadata.flow_cache.ttl == config.caches.metadata_ttl_seconds
+        assert api.metadata.task_cache.ttl == config.caches.metadata_ttl_seconds
+
+    async def test_invalidation_channel(self, flow_id):
+        with set_temporary_config("caches.invalidation_channel", "test_invalidation"):
+            await api.metadata.start_invalidation_listener()
+            try:
+                await asyncio.wait_for(api.metadata._listener.connected.wait(), 5)
+                await api.metadata.get_flow(flow_id)
+                assert flow_id in api.metadata.flow_cache
+
+                # simulate an invalidation published by another replica
+                await postgres.fetch(
+                    "SELECT pg_notify(%s, %s)",
+                    (
+                        "test_invalidation",
+                        json.dumps(dict(flow_ids=[flow_id], flow_group_ids=[])),
+                    ),
+                )
+                for _ in range(50):
+                    if flow_id not in api.metadata.flow_cache:
+                        break
+                    await asyncio.sleep(0.1)
+                assert flow_id not in api.metadata.flow_cache
+            finally:
+                await api.metadata.stop_invalidation_listener()
+
+    async def test_invalidation_channel_is_disabled_by_default(self):
+        assert config.caches.invalidation_channel == ""
+        await api.metadata.start_invalidation_listener()
+        assert api.metadata._listener is None
+
+    async def test_invalidation_listener_reconnects(self, monkeypatch, flow_id):
+        connect = postgres.connect
+        attempts = 0
+
+        def flaky_connect():
+            nonlocal attempts
+            attempts += 1
+            if attempts < 3:
+                raise ConnectionError("database unavailable")
+            return connect()
+
+        monkeypatch.setattr("prefect_server.database.postgres.connect", flaky_connect)
+        monkeypatch.setattr(
+            "prefect_server.api.metadata.RECONNECT_BACKOFF_SECONDS", 0.01
+        )
+
+        with set_temporary_config("caches.invalidation_channel", "test_invalidation"):
+            # starting doesn't fail while the database can't be reached
+            await api.metadata.start_invalidation_listener()
+            try:
+                listener = api.metadata._listener
+                await asyncio.wait_for(listener.connected.wait(), 5)
+                assert attempts == 3
+
+                # a lost connection clears the caches and is reestablished
+                await api.metadata.get_flow(flow_id)
+                listener.connection.close()
+                listener._on_notify()
+                assert flow_id not in api.metadata.flow_cache
+                await asyncio.wait_for(listener.connected.wait(), 5)
+                assert attempts == 4
+            finally:
+                await api.metadata.stop_invalidation_listener()
@@ -0,0 +1,120 @@
+"""
+Guards the number of Hasura requests and direct Postgres queries made by hot API
+functions.
+
+Each test records the requests made by a single API call and compares their numbers to
+the baseline in `query_counts.json`. A test fails if a call makes more or fewer requests
+than its baseline, so that the baseline stays exact; if a change is intended, update the
+baseline by running these tests against a live database with `--update-query-counts`.
+Calls without a recorded baseline are skipped: counts must come from a recorded run, never
+from estimates.
+
+Process-local caches are cleared before each call, so the counts don't depend on which
+tests ran before.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from prefect import api
+from prefect.engine.state import Running
+from prefect_server.database import models
+
+BASELINE_PATH = Path(__file__).parent / "query_counts.json"
+
+
+@pytest.fixture(scope="module")
+def baseline(request):
+    baseline = json.loads(BASELINE_PATH.read_text())
+    observed = {}
+    yield observed, baseline
+    if request.config.getoption("--update-query-counts"):
+        BASELINE_PATH.write_text(
+            json.dumps(dict(baseline, **observed), indent=2, sort_keys=True) + "\n"
+        )
+
+
+@pytest.fixture
+def check_query_count(request, baseline, query_recorder):
+    observed, expected = baseline
+
+    def check(key: str) -> None:
+        counts = dict(hasura=query_recorder.count, postgres=query_recorder.sql_count)
+        observed[key] = counts
+        if request.config.getoption("--update-query-counts"):
+            return
+        if key not in expected:
+            pytest.skip(
+                f"No recorded baseline for {key}; record one against a live database "
+                "with --update-query-counts"
+            )
+        assert counts == expected[key], (
+            f"{key} made {counts['hasura']} Hasura requests and {counts['postgres']} "
+            f"Postgres queries; the baseline is {expected[key]}. "
+            f"Requests: {query_recorder.summary()}"
+        )
+
+    return check
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    api.metadata.task_cache.clear()
+    api.metadata.flow_cache.clear()
+    api.runs.task_run_id_cache.clear()
+
+
+async def test_set_flow_run_state(flow_run_id, query_recorder, check_query_count):
+    with query_recorder:
+        await api.states.set_flow_run_state(flow_run_id=flow_run_id, state=Running())
+    check_query_count("states.set_flow_run_state")
+
+
+async def test_set_lazy_flow_run_state(flow_id, query_recorder, check_query_count):
+    await api.flows.enable_lazy_task_runs_for_flow(flow_id=flow_id)
+    flow_run_id = await api.runs.create_flow_run(flow_id=flow_id)
+    with query_recorder:
+        await api.states.set_flow_run_state(flow_run_id=flow_run_id, state=Running())
+    check_query_count("states.set_flow_run_state[lazy]")
+
+
+async def test_set_task_run_state(
+    running_flow_run_id, task_run_id, query_recorder, check_query_count
+):
+    with query_recorder:
+        await api.states.set_task_run_state(task_run_id=task_run_id, state=Running())
+    check_query_count("states.set_task_run_state")
+
+
+async def test_create_flow_run(flow_id, query_recorder, check_query_count):
+    with query_recorder:
+        await api.runs.create_flow_run(flow_id=flow_id, parameters=dict(x=1))
+    check_query_count("runs.create_flow_run")
+
+
+async def test_get_or_create_task_run(
+    flow_run_id, task_id, query_recorder, check_query_count
+):
+    with query_recorder:
+        await api.runs.get_or_create_task_run(
+            flow_run_id=flow_run_id, task_id=task_id, map_index=0
+        )
+    check_query_count("runs.get_or_create_task_run")
+
+
+async def test_schedule_flow_runs(flow_id, query_recorder, check_query_count):
+    await models.FlowRun.where({"flow_id": {"_eq": flow_id}}).delete()
+    with query_recorder:
+        assert len(await api.flows.schedule_flow_runs(flow_id)) == 10
+    check_query_count("flows.schedule_flow_runs")
+
+
+async def test_create_logs(flow_run_id, tenant_id, query_recorder, check_query_count):
+    logs = [
+        dict(tenant_id=tenant_id, flow_run_id=flow_run_id, message=f"log {i}")
+        for i in range(10)
+    ]
+    with query_recorder:
+        await api.logs.create_logs(logs)
+    check_query_count("logs.create_logs")
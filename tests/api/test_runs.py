@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 
 import pendulum
@@ -13,7 +14,7 @@ from prefect.engine.state import (
     Submitted,
     Success,
 )
-from prefect.utilities.graphql import EnumValue
+from prefect.utilities.graphql import EnumValue, with_args
 from prefect import api
 from prefect_server import config
 from prefect_server.database import models
@@ -32,6 +33,26 @@ class TestCreateRun:
         flow_run_id = await api.runs.create_flow_run(flow_id=simple_flow_id)
         assert await models.FlowRun.exists(flow_run_id)
 
+    async def test_create_flow_run_inserts_pending_and_scheduled_states(
+        self, simple_flow_id
+    ):
+        flow_run_id = await api.runs.create_flow_run(flow_id=simple_flow_id)
+        flow_run = await models.FlowRun.where(id=flow_run_id).first(
+            {
+                "state": True,
+                "version": True,
+                "states": {"state", "version", "timestamp"},
+            }
+        )
+        assert flow_run.state == "Scheduled"
+        assert flow_run.version == 1
+        states = sorted(flow_run.states, key=lambda s: s.version)
+        assert [(s.state, s.version) for s in states] == [
+            ("Pending", 0),
+            ("Scheduled", 1),
+        ]
+        assert states[0].timestamp < states[1].timestamp
+
     async def test_create_flow_run_with_version_group_id(self, project_id):
         flow_ids = []
         for _ in range(15):
@@ -279,6 +300,97 @@ class TestCreateRun:
         assert fr.context["b"] == 2
 
 
+class TestLazyTaskRuns:
+    async def test_lazy_flow_group_doesnt_create_task_runs(
+        self, flow_id, flow_group_id
+    ):
+        await api.flows.enable_lazy_task_runs_for_flow(flow_id=flow_id)
+        flow_run_id = await api.runs.create_flow_run(flow_id=flow_id)
+        assert (
+            await models.TaskRun.where({"flow_run_id": {"_eq": flow_run_id}}).count()
+            == 0
+        )
+
+    async def test_lazy_tenant_doesnt_create_task_runs(self, flow_id, tenant_id):
+        await api.tenants.update_settings(
+            tenant_id=tenant_id, settings=dict(lazy_task_runs_enabled=True)
+        )
+        flow_run_id = await api.runs.create_flow_run(flow_id=flow_id)
+        assert (
+            await models.TaskRun.where({"flow_run_id": {"_eq": flow_run_id}}).count()
+            == 0
+        )
+
+    async def test_flow_group_setting_overrides_tenant(self, flow_id, tenant_id):
+        await api.tenants.update_settings(
+            tenant_id=tenant_id, settings=dict(lazy_task_runs_enabled=True)
+        )
+        await api.flows.disable_lazy_task_runs_for_flow(flow_id=flow_id)
+        flow_run_id = await api.runs.create_flow_run(flow_id=flow_id)
+        assert (
+            await models.TaskRun.where({"flow_run_id": {"_eq": flow_run_id}}).count()
+            == await models.Task.where({"flow_id": {"_eq": flow_id}}).count()
+        )
+
+    async def test_create_task_runs(self, flow_id):
+        await api.flows.enable_lazy_task_runs_for_flow(flow_id=flow_id)
+        flow_run_id = await api.runs.create_flow_run(flow_id=flow_id)
+        n_tasks = await models.Task.where({"flow_id": {"_eq": flow_id}}).count()
+
+        assert await api.runs.create_task_runs(flow_run_id=flow_run_id) == n_tasks
+        task_runs = await models.TaskRun.where(
+            {"flow_run_id": {"_eq": flow_run_id}}
+        ).get({"map_index", "state", "tenant_id"})
+        assert len(task_runs) == n_tasks
+        assert all(tr.map_index == -1 for tr in task_runs)
+        assert all(tr.state == "Pending" for tr in task_runs)
+        assert all(tr.tenant_id is not None for tr in task_runs)
+
+    async def test_create_task_runs_is_idempotent(self, flow_run_id):
+        assert await api.runs.create_task_runs(flow_run_id=flow_run_id) == 0
+
+    async def test_create_task_runs_keeps_existing_task_runs(self, flow_id, task_id):
+        await api.flows.enable_lazy_task_runs_for_flow(flow_id=flow_id)
+        flow_run_id = await api.runs.create_flow_run(flow_id=flow_id)
+        task_run_id = await api.runs.get_or_create_task_run(
+            flow_run_id=flow_run_id, task_id=task_id, map_index=None
+        )
+        n_tasks = await models.Task.where({"flow_id": {"_eq": flow_id}}).count()
+
+        assert await api.runs.create_task_runs(flow_run_id=flow_run_id) == n_tasks - 1
+        assert (
+            await models.TaskRunState.where(
+                {"task_run_id": {"_eq": task_run_id}}
+            ).count()
+            == 1
+        )
+
+    async def test_reads_synthesize_placeholder_task_runs(self, flow_id, task_id):
+        await api.flows.enable_lazy_task_runs_for_flow(flow_id=flow_id)
+        flow_run_id = await api.runs.create_flow_run(flow_id=flow_id)
+        task_run_id = await api.runs.get_or_create_task_run(
+            flow_run_id=flow_run_id, task_id=task_id, map_index=None
+        )
+        n_tasks = await models.Task.where({"flow_id": {"_eq": flow_id}}).count()
+
+        result = await prefect.plugins.hasura.client.execute(
+            {
+                "query": {
+                    with_args(
+                        "utility_flow_run_task_runs",
+                        {"args": {"flow_run_id": flow_run_id}},
+                    ): {"id", "task_id", "map_index", "state"}
+                }
+            }
+        )
+        task_runs = result.data.utility_flow_run_task_runs
+        assert len(task_runs) == n_tasks
+        assert all(tr.map_index == -1 for tr in task_runs)
+        assert all(tr.state == "Pending" for tr in task_runs)
+        # only the task run that exists has an id
+        assert [tr.id for tr in task_runs if tr.id] == [task_run_id]
+
+
 class TestCreateIdempotentRun:
     async def test_create_idempotent_flow_run_with_key(self, simple_flow_id):
         flow_run_id_1 = await api.runs.create_flow_run(
@@ -337,6 +449,79 @@ class TestCreateIdempotentRun:
         assert flow_run_id_1 == flow_run_id_2
         assert flow_run_id_1 != flow_run_id_3
 
+    async def test_idempotent_run_is_scheduled(self, simple_flow_id):
+        flow_run_id = await api.runs.create_flow_run(
+            flow_id=simple_flow_id, idempotency_key="abc"
+        )
+        flow_run = await models.FlowRun.where(id=flow_run_id).first(
+            {"state": True, "idempotency_key": True, "states": {"state"}}
+        )
+        assert flow_run.state == "Scheduled"
+        assert flow_run.idempotency_key == "abc"
+        assert {s.state for s in flow_run.states} == {"Pending", "Scheduled"}
+
+    async def test_existing_idempotent_run_state_is_unchanged(self, simple_flow_id):
+        flow_run_id = await api.runs.create_flow_run(
+            flow_id=simple_flow_id, idempotency_key="abc"
+        )
+        await api.states.set_flow_run_state(flow_run_id, Running())
+        await api.runs.create_flow_run(flow_id=simple_flow_id, idempotency_key="abc")
+
+        flow_run = await models.FlowRun.where(id=flow_run_id).first({"state"})
+        assert flow_run.state == "Running"
+
+    async def test_concurrent_idempotent_runs(self, simple_flow_id):
+        flow_run_ids = await asyncio.gather(
+            *[
+                api.runs.create_flow_run(flow_id=simple_flow_id, idempotency_key="abc")
+                for _ in range(10)
+            ]
+        )
+        assert len(set(flow_run_ids)) == 1
+        assert (
+            await models.FlowRun.where({"flow_id": {"_eq": simple_flow_id}}).count()
+            == 1
+        )
+
+    async def test_concurrent_idempotent_runs_have_states(self, simple_flow_id):
+        async def create_and_count_states():
+            flow_run_id = await api.runs.create_flow_run(
+                flow_id=simple_flow_id, idempotency_key="abc"
+            )
+            return await models.FlowRunState.where(
+                {"flow_run_id": {"_eq": flow_run_id}}
+            ).count()
+
+        # the states are inserted in the same transaction as the run, so no caller
+        # can see the run without them
+        assert (
+            await asyncio.gather(*[create_and_count_states() for _ in range(10)])
+            == [2] * 10
+        )
+
+    async def test_expired_idempotency_key_creates_new_run(self, simple_flow_id):
+        flow_run_id_1 = await api.runs.create_flow_run(
+            flow_id=simple_flow_id, idempotency_key="abc"
+        )
+        await models.FlowRun.where(id=flow_run_id_1).update(
+            set={"created": pendulum.now("utc").subtract(days=2)}
+        )
+        flow_run_id_2 = await api.runs.create_flow_run(
+            flow_id=simple_flow_id, idempotency_key="abc"
+        )
+        assert flow_run_id_1 != flow_run_id_2
+
+        flow_run_1 = await models.FlowRun.where(id=flow_run_id_1).first(
+            {"idempotency_key"}
+        )
+        assert flow_run_1.idempotency_key is None
+        assert (
+            await api.runs.create_flow_run(
+                flow_id=simple_flow_id, idempotency_key="abc"
+            )
+            == flow_run_id_2
+        )
+
 
 class TestGetTaskRunInfo:
     async def test_task_run(self, flow_run_id, task_id):
@@ -510,6 +695,76 @@ class TestGetTaskRunInfo:
 
         assert new_task_run_state_count == task_run_state_count
 
+    async def test_concurrent_calls_insert_one_state(self, flow_run_id, task_id):
+        api.runs.task_run_id_cache.clear()
+        tr_ids = await asyncio.gather(
+            *[
+                api.runs.get_or_create_task_run(
+                    flow_run_id=flow_run_id, task_id=task_id, map_index=1
+                )
+                for _ in range(5)
+            ]
+        )
+        assert len(set(tr_ids)) == 1
+        assert await models.TaskRunState.where(task_run_id=tr_ids[0]).count() == 1
+
+    async def test_task_run_doesnt_update_existing_task_run(
+        self, flow_run_id, task_id, task_run_id
+    ):
+        api.runs.task_run_id_cache.clear()
+        task_run = await models.TaskRun.where(id=task_run_id).first({"updated"})
+
+        await api.runs.get_or_create_task_run(
+            flow_run_id=flow_run_id, task_id=task_id, map_index=None
+        )
+
+        assert (
+            await models.TaskRun.where(id=task_run_id).first({"updated"})
+        ).updated == task_run.updated
+
+
+class TestGetTaskRunIdCache:
+    async def test_repeated_calls_are_cached(self, flow_run_id, task_id):
+        api.runs.task_run_id_cache.clear()
+        tr_id = await api.runs.get_or_create_task_run(
+            flow_run_id=flow_run_id, task_id=task_id, map_index=None
+        )
+        assert api.runs.task_run_id_cache.misses == 1
+
+        for _ in range(3):
+            assert tr_id == await api.runs.get_or_create_task_run(
+                flow_run_id=flow_run_id, task_id=task_id, map_index=None
+            )
+        assert api.runs.task_run_id_cache.hits == 3
+
+    async def test_cache_is_keyed_by_map_index(self, flow_run_id, task_id):
+        tr_id_1 = await api.runs.get_or_create_task_run(
+            flow_run_id=flow_run_id, task_id=task_id, map_index=1
+        )
+        tr_id_2 = await api.runs.get_or_create_task_run(
+            flow_run_id=flow_run_id, task_id=task_id, map_index=2
+        )
+        assert tr_id_1 != tr_id_2
+        assert api.runs.task_run_id_cache.get((flow_run_id, task_id, 1)) == tr_id_1
+        assert api.runs.task_run_id_cache.get((flow_run_id, task_id, 2)) == tr_id_2
+
+    async def test_failed_calls_are_not_cached(self, task_id):
+        flow_run_id = str(uuid.uuid4())
+        with pytest.raises(ValueError, match="Invalid ID"):
+            await api.runs.get_or_create_task_run(
+                flow_run_id=flow_run_id, task_id=task_id, map_index=None
+            )
+        assert (flow_run_id, task_id, -1) not in api.runs.task_run_id_cache
+
+    async def test_deleting_flow_run_invalidates_cache(self, flow_run_id, task_id):
+        await api.runs.get_or_create_task_run(
+            flow_run_id=flow_run_id, task_id=task_id, map_index=None
+        )
+        assert (flow_run_id, task_id, -1) in api.runs.task_run_id_cache
+
+        await api.runs.delete_flow_run(flow_run_id=flow_run_id)
+        assert (flow_run_id, task_id, -1) not in api.runs.task_run_id_cache
+
 
 class TestGetOrCreateMappedChildren:
     async def test_get_or_create_mapped_children_creates_children(
@@ -648,6 +903,58 @@ class TestGetOrCreateMappedChildren:
         ).get()
         assert len(child_states) == 1
 
+    async def test_get_or_create_mapped_children_creates_pending_states(
+        self, flow_id, flow_run_id
+    ):
+        task = await models.Task.where({"flow_id": {"_eq": flow_id}}).first({"id"})
+        mapped_children = await api.runs.get_or_create_mapped_task_run_children(
+            flow_run_id=flow_run_id, task_id=task.id, max_map_index=2
+        )
+        task_runs = await models.TaskRun.where({"id": {"_in": mapped_children}}).get(
+            {"state", "state_message", "serialized_state", "tenant_id", "cache_key"}
+        )
+        assert len(task_runs) == 3
+        for task_run in task_runs:
+            assert task_run.state == "Pending"
+            assert task_run.state_message == "Task run created"
+            assert task_run.serialized_state["type"] == "Pending"
+            assert task_run.tenant_id is not None
+
+    async def test_get_or_create_mapped_children_is_idempotent(
+        self, flow_id, flow_run_id
+    ):
+        task = await models.Task.where({"flow_id": {"_eq": flow_id}}).first({"id"})
+        first = await api.runs.get_or_create_mapped_task_run_children(
+            flow_run_id=flow_run_id, task_id=task.id, max_map_index=4
+        )
+        second = await api.runs.get_or_create_mapped_task_run_children(
+            flow_run_id=flow_run_id, task_id=task.id, max_map_index=4
+        )
+        assert first == second
+        assert (
+            await models.TaskRunState.where({"task_run_id": {"_in": first}}).count()
+            == 5
+        )
+
+    async def test_get_or_create_mapped_children_extends_existing_children(
+        self, flow_id, flow_run_id
+    ):
+        task = await models.Task.where({"flow_id": {"_eq": flow_id}}).first({"id"})
+        first = await api.runs.get_or_create_mapped_task_run_children(
+            flow_run_id=flow_run_id, task_id=task.id, max_map_index=2
+        )
+        second = await api.runs.get_or_create_mapped_task_run_children(
+            flow_run_id=flow_run_id, task_id=task.id, max_map_index=5
+        )
+        assert len(second) == 6
+        assert second[:3] == first
+
+    async def test_get_or_create_mapped_children_with_missing_task(self, flow_run_id):
+        mapped_children = await api.runs.get_or_create_mapped_task_run_children(
+            flow_run_id=flow_run_id, task_id=str(uuid.uuid4()), max_map_index=2
+        )
+        assert mapped_children == []
+
 
 class TestUpdateFlowRunHeartbeat:
     async def test_update_heartbeat(self, flow_run_id):
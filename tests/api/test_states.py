@@ -2,6 +2,7 @@ import uuid
 
 import pendulum
 import pytest
+from asynctest import CoroutineMock
 from box import Box
 
 from prefect.engine.result import SafeResult
@@ -225,6 +226,31 @@ class TestFlowRunStates:
         assert query.state == "Running"
         assert query.serialized_state["type"] == "Running"
 
+    async def test_running_state_creates_lazy_task_runs(self, flow_id):
+        await api.flows.enable_lazy_task_runs_for_flow(flow_id=flow_id)
+        flow_run_id = await api.runs.create_flow_run(flow_id=flow_id)
+
+        await api.states.set_flow_run_state(flow_run_id=flow_run_id, state=Submitted())
+        assert (
+            await models.TaskRun.where({"flow_run_id": {"_eq": flow_run_id}}).count()
+            == 0
+        )
+
+        await api.states.set_flow_run_state(flow_run_id=flow_run_id, state=Running())
+        assert (
+            await models.TaskRun.where({"flow_run_id": {"_eq": flow_run_id}}).count()
+            == await models.Task.where({"flow_id": {"_eq": flow_id}}).count()
+        )
+
+    async def test_running_state_only_creates_task_runs_when_lazy(
+        self, flow_run_id, monkeypatch
+    ):
+        create_task_runs = CoroutineMock()
+        monkeypatch.setattr(api.runs, "create_task_runs", create_task_runs)
+
+        await api.states.set_flow_run_state(flow_run_id=flow_run_id, state=Running())
+        assert not create_task_runs.called
+
     @pytest.mark.parametrize("state", [Running(), Success()])
     async def test_set_flow_run_state_fails_with_wrong_flow_run_id(self, state):
         with pytest.raises(ValueError, match="State update failed"):
@@ -302,6 +328,55 @@ class TestFlowRunStates:
         assert all(new_states[id] == "Success" for id in rest)
 
 
+class TestBulkSetFlowRunStates:
+    async def test_bulk_set_flow_run_states(self, flow_id, flow_run_id):
+        flow_run_id_2 = await api.runs.create_flow_run(flow_id=flow_id)
+
+        result = await api.states.bulk_set_flow_run_states(
+            flow_run_ids=[flow_run_id, flow_run_id_2], state=Failed("late")
+        )
+
+        assert {s.flow_run_id for s in result} == {flow_run_id, flow_run_id_2}
+        for id in [flow_run_id, flow_run_id_2]:
+            flow_run = await models.FlowRun.where(id=id).first(
+                {"version", "state", "serialized_state"}
+            )
+            assert flow_run.version == 2
+            assert flow_run.state == "Failed"
+            assert flow_run.serialized_state["message"] == "late"
+
+    async def test_bulk_set_flow_run_states_ignores_missing_ids(self, flow_run_id):
+        result = await api.states.bulk_set_flow_run_states(
+            flow_run_ids=[flow_run_id, str(uuid.uuid4())], state=Failed()
+        )
+        assert [s.flow_run_id for s in result] == [flow_run_id]
+
+    async def test_bulk_set_flow_run_states_with_no_ids(self):
+        assert await api.states.bulk_set_flow_run_states([], state=Failed()) == []
+
+    @pytest.mark.parametrize("state", [Running(), Cancelled()])
+    async def test_bulk_set_flow_run_states_rejects_states_with_side_effects(
+        self, flow_run_id, state
+    ):
+        with pytest.raises(ValueError, match="must be set with"):
+            await api.states.bulk_set_flow_run_states([flow_run_id], state=state)
+
+    async def test_bulk_set_flow_run_states_runs_mutations_in_transaction(
+        self, flow_run_id
+    ):
+        update = await models.FlowRun.where(id=flow_run_id).update(
+            set={"times_resurrected": 5}, run_mutation=False
+        )
+        await api.states.bulk_set_flow_run_states(
+            [flow_run_id], state=Scheduled(), mutations=[update]
+        )
+        flow_run = await models.FlowRun.where(id=flow_run_id).first(
+            {"state", "times_resurrected"}
+        )
+        assert flow_run.state == "Scheduled"
+        assert flow_run.times_resurrected == 5
+
+
 class TestTaskRunVersionLocking:
     @pytest.fixture(autouse=True)
     async def enable_flow_run_locking(self, flow_group_id):
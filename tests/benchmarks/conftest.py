@@ -0,0 +1,63 @@
+import os
+import statistics
+import time
+
+import pytest
+
+
+def pytest_collection_modifyitems(items):
+    """
+    Modify items below `tests/benchmarks` to have the benchmark flag
+    """
+    benchmarks_directory = os.path.dirname(__file__)
+    for item in items:
+        if benchmarks_directory in str(item.fspath):
+            item.add_marker(pytest.mark.benchmark)
+
+
+class BenchmarkResult:
+    def __init__(self, name: str, timings: list, n: int = 1):
+        self.name = name
+        self.timings = timings
+        self.n = n
+
+    @property
+    def best(self) -> float:
+        return min(self.timings)
+
+    @property
+    def mean(self) -> float:
+        return statistics.mean(self.timings)
+
+    @property
+    def per_second(self) -> float:
+        return self.n / self.best
+
+    def __repr__(self) -> str:
+        return (
+            f"<Benchmark {self.name}: best={self.best * 1000:.3f}ms "
+            f"mean={self.mean * 1000:.3f}ms ({self.per_second:.1f}/s)>"
+        )
+
+
+@pytest.fixture
+def benchmark():
+    """
+    Times a callable (or coroutine function) over several rounds and prints the
+    result. `n` is the number of items processed per round, used to report
+    throughput.
+    """
+
+    async def benchmark(fn, *args, name: str = None, rounds: int = 5, n: int = 1):
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = fn(*args)
+            if hasattr(result, "__await__"):
+                await result
+            timings.append(time.perf_counter() - start)
+        result = BenchmarkResult(name=name or fn.__name__, timings=timings, n=n)
+        print(result)
+        return result
+
+    return benchmark
@@ -0,0 +1,55 @@
+import json
+import uuid
+
+import pendulum
+import pytest
+
+import prefect
+from prefect_server.api.cloud_hooks import EventPayloads
+from prefect_server.database import models
+from prefect_server.utilities import events
+
+N_HOOKS = 20
+
+
+@pytest.fixture(params=[1_000, 100_000])
+def large_event(request):
+    state = prefect.engine.state.Success(
+        message="done", result={"rows": ["x" * 100] * request.param}
+    )
+    return events.FlowRunStateChange(
+        flow_run=models.FlowRun(id=str(uuid.uuid4()), name="big-run"),
+        state=models.FlowRunState(
+            state="Success",
+            version=3,
+            timestamp=pendulum.now("UTC"),
+            serialized_state=state.serialize(),
+        ),
+        flow=models.Flow(id=str(uuid.uuid4()), name="big-flow"),
+        tenant=models.Tenant(id=str(uuid.uuid4()), slug="tenant"),
+    )
+
+
+async def test_serialize_per_hook(benchmark, large_event):
+    def serialize_per_hook():
+        for _ in range(N_HOOKS):
+            dict(event=json.loads(large_event.json()))
+
+    await benchmark(serialize_per_hook, n=N_HOOKS)
+
+
+async def test_serialize_once_per_event(benchmark, large_event):
+    def serialize_once():
+        payloads = EventPayloads(large_event)
+        for _ in range(N_HOOKS):
+            payloads.webhook_body
+            payloads.slack_message
+            payloads.twilio_body
+            payloads.pagerduty_payload
+
+    await benchmark(serialize_once, n=N_HOOKS)
+
+
+async def test_cached_body_matches_event(large_event):
+    body = json.loads(EventPayloads(large_event).webhook_body)
+    assert body == dict(event=json.loads(large_event.json()))
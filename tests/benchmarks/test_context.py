@@ -0,0 +1,25 @@
+import contextlib
+
+import pytest
+
+from prefect_server.utilities.context import get_context, set_context
+
+
+def get_nested_context(depth: int, n: int):
+    with contextlib.ExitStack() as stack:
+        for i in range(depth):
+            stack.enter_context(set_context(**{f"key-{i}": i}))
+        for _ in range(n):
+            get_context()["key-0"]
+
+
+@pytest.mark.parametrize("depth", [1, 10, 100])
+async def test_get_nested_context(benchmark, depth):
+    n = 10000
+    await benchmark(
+        get_nested_context,
+        depth,
+        n,
+        name=f"get context {n} times at depth {depth}",
+        n=n,
+    )
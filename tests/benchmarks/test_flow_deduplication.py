@@ -0,0 +1,47 @@
+import pytest
+
+import prefect
+from prefect import api
+from prefect_server.database import models
+
+N_REGISTRATIONS = 20
+
+
+@pytest.fixture
+def wide_flow():
+    flow = prefect.Flow(name="wide")
+    upstream = prefect.Task("root")
+    for i in range(200):
+        flow.add_edge(upstream, prefect.Task(f"task-{i}"))
+    return flow
+
+
+@pytest.mark.parametrize("deduplicate", [False, True])
+async def test_reregister_identical_flow(benchmark, project_id, wide_flow, deduplicate):
+    serialized_flow = wide_flow.serialize()
+    counts_before = {
+        model.__name__: await model.where().count()
+        for model in [models.Flow, models.Task, models.Edge]
+    }
+
+    async def register():
+        await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=serialized_flow,
+            version_group_id="deduplication-benchmark",
+            set_schedule_active=False,
+            deduplicate=deduplicate,
+        )
+
+    await benchmark(
+        register,
+        name=f"register an identical flow (deduplicate={deduplicate})",
+        rounds=N_REGISTRATIONS,
+    )
+
+    for model in [models.Flow, models.Task, models.Edge]:
+        growth = await model.where().count() - counts_before[model.__name__]
+        print(
+            f"{model.__name__} rows after {N_REGISTRATIONS} registrations "
+            f"(deduplicate={deduplicate}): +{growth}"
+        )
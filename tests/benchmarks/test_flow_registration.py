@@ -0,0 +1,61 @@
+import pytest
+
+import prefect
+from prefect import api
+from prefect_server.database import models
+from prefect_server.graphql.flows import resolve_create_flow
+
+
+@pytest.mark.parametrize("n_versions", [10, 100, 500])
+async def test_register_flow_version(benchmark, project_id, n_versions):
+    serialized_flow = prefect.Flow(name="versioned").serialize()
+    version_group_id = "benchmark-version-group"
+
+    # create the unarchived versions directly, as if archival had never run. Versions
+    # are created one at a time, since concurrent creation races on the flow group and
+    # on the next version number.
+    for _ in range(n_versions):
+        await api.flows.create_flow(
+            project_id=project_id,
+            serialized_flow=serialized_flow,
+            version_group_id=version_group_id,
+        )
+
+    await benchmark(
+        resolve_create_flow,
+        None,
+        None,
+        dict(
+            serialized_flow=serialized_flow,
+            project_id=project_id,
+            version_group_id=version_group_id,
+        ),
+        name=f"register a new version over {n_versions} unarchived versions",
+        rounds=1,
+    )
+    assert (
+        await models.Flow.where(
+            {"version_group_id": {"_eq": version_group_id}, "archived": {"_eq": False}}
+        ).count()
+        == 1
+    )
+
+
+@pytest.mark.parametrize("n_tasks", [1000, 10000, 50000])
+async def test_register_large_flow(benchmark, project_id, n_tasks):
+    # a chain of reduce tasks over mapped tasks, so half of the edges are mapped
+    flow = prefect.Flow(name="large")
+    tasks = [prefect.Task(str(i)) for i in range(n_tasks)]
+    for i, (upstream, downstream) in enumerate(zip(tasks, tasks[1:])):
+        flow.add_edge(upstream, downstream, key="x", mapped=bool(i % 2))
+    serialized_flow = flow.serialize()
+
+    await benchmark(
+        api.flows.create_flow,
+        serialized_flow,
+        project_id,
+        name=f"register a flow with {n_tasks} tasks",
+        rounds=1,
+        n=n_tasks,
+    )
+    assert await models.Task.where({"flow_id": {"_is_null": False}}).count() == n_tasks
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+from prefect import api
+
+
+async def create_flow_runs(flow_id: str, n: int, idempotent: bool):
+    await asyncio.gather(
+        *[
+            api.runs.create_flow_run(
+                flow_id=flow_id, idempotency_key=str(i) if idempotent else None
+            )
+            for i in range(n)
+        ]
+    )
+
+
+@pytest.mark.parametrize("idempotent", [False, True])
+async def test_create_flow_runs(benchmark, simple_flow_id, idempotent):
+    n = 100
+    await benchmark(
+        create_flow_runs,
+        simple_flow_id,
+        n,
+        idempotent,
+        name=f"create {n} flow runs (idempotent={idempotent})",
+        n=n,
+    )
@@ -0,0 +1,73 @@
+import pytest
+
+import prefect
+from prefect.utilities.graphql import with_args
+from prefect_server.database import models
+from prefect_server.utilities.tests import set_temporary_config
+
+
+def wide_flow(width: int = 1000) -> prefect.Flow:
+    """
+    A root task fanning out to `width` tasks that all feed one terminal task
+    """
+    flow = prefect.Flow("wide")
+    root, terminal = prefect.Task("root", slug="root"), prefect.Task("end", slug="end")
+    for i in range(width):
+        task = prefect.Task(str(i), slug=str(i))
+        flow.add_edge(root, task)
+        flow.add_edge(task, terminal)
+    return flow
+
+
+def deep_flow(depth: int = 200) -> prefect.Flow:
+    """
+    A chain of `depth` tasks, with a shortcut edge every 5 tasks so that most pairs
+    of tasks are connected by several paths of different lengths
+    """
+    flow = prefect.Flow("deep")
+    tasks = [prefect.Task(str(i), slug=str(i)) for i in range(depth)]
+    flow.chain(*tasks)
+    for i in range(0, depth - 5, 5):
+        flow.add_edge(tasks[i], tasks[i + 5])
+    return flow
+
+
+async def traverse(direction: str, task_id: str):
+    return await prefect.plugins.hasura.client.execute(
+        {
+            "query": {
+                with_args(
+                    f"utility_{direction}_tasks",
+                    {"args": {"start_task_ids": "{" + task_id + "}"}},
+                ): {"task_id": True, "depth": True}
+            }
+        }
+    )
+
+
+@pytest.mark.parametrize("closure", [False, True])
+@pytest.mark.parametrize(
+    "make_flow, first_slug, last_slug",
+    [(wide_flow, "root", "end"), (deep_flow, "0", "199")],
+)
+async def test_traversal(
+    benchmark, project_id, make_flow, first_slug, last_slug, closure
+):
+    flow = make_flow()
+    with set_temporary_config("flows.precompute_task_closure", closure):
+        flow_id = await prefect.api.flows.create_flow(
+            project_id=project_id, serialized_flow=flow.serialize()
+        )
+
+    # traverse the whole flow: downstream from its first task, upstream from its last
+    for direction, slug in [("downstream", first_slug), ("upstream", last_slug)]:
+        start_task = await models.Task.where(
+            {"flow_id": {"_eq": flow_id}, "slug": {"_eq": slug}}
+        ).first({"id"})
+        await benchmark(
+            traverse,
+            direction,
+            start_task.id,
+            name=f"{direction} traversal of {flow.name} flow (closure={closure})",
+            rounds=10,
+        )
@@ -0,0 +1,39 @@
+import pytest
+
+from prefect_server.graphql import documents
+from prefect_server.services.graphql.server import schema
+
+QUERY = """
+mutation($input: set_task_run_states_input!) {
+    set_task_run_states(input: $input) {
+        states {
+            id
+            status
+            message
+        }
+    }
+}
+"""
+
+
+def parse_and_validate(parse, validate, n: int):
+    for _ in range(n):
+        document = parse(QUERY)
+        assert not validate(schema, document)
+
+
+@pytest.mark.parametrize("cached", [False, True])
+async def test_parse_and_validate(benchmark, cached):
+    n = 1000
+    if cached:
+        parse, validate = documents.parse_query, documents.validate_query
+    else:
+        parse, validate = documents._parse_query, documents._validate_query
+    await benchmark(
+        parse_and_validate,
+        parse,
+        validate,
+        n,
+        name=f"parse and validate a document {n} times (cached={cached})",
+        n=n,
+    )
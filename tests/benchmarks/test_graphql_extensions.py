@@ -0,0 +1,58 @@
+import httpx
+import pytest
+from ariadne import QueryType, make_executable_schema
+from ariadne.asgi import GraphQL
+
+from prefect_server.graphql import extensions
+
+SDL = """
+type Query {
+    items(n: Int!): [Item]
+}
+
+type Item {
+    a: String
+    b: String
+    c: String
+    d: String
+}
+"""
+
+
+def make_client(extensions_list: list) -> httpx.AsyncClient:
+    query = QueryType()
+
+    @query.field("items")
+    def resolve_items(parent, info, n):
+        return [dict(a="a", b="b", c="c", d="d") for _ in range(n)]
+
+    app = GraphQL(make_executable_schema(SDL, query), extensions=extensions_list)
+    return httpx.AsyncClient(app=app, base_url="https://prefect.io")
+
+
+async def post(client: httpx.AsyncClient, n: int):
+    response = await client.post(
+        "/",
+        json=dict(
+            query="query($n: Int!) { items(n: $n) { a b c d } }", variables={"n": n}
+        ),
+        headers={"X-Prefect-Benchmark": "1"},
+    )
+    assert len(response.json()["data"]["items"]) == n
+
+
+@pytest.mark.parametrize("n", [100, 1000, 10000])
+@pytest.mark.parametrize("with_extension", [False, True])
+async def test_wide_response(benchmark, n, with_extension):
+    """
+    Compares resolving a wide response with and without the `PrefectHeader`
+    extension; the difference is the extension's overhead.
+    """
+    client = make_client([extensions.PrefectHeader] if with_extension else [])
+    await benchmark(
+        post,
+        client,
+        n,
+        name=f"resolve {n * 5} fields (PrefectHeader={with_extension})",
+        n=n * 5,
+    )
@@ -0,0 +1,70 @@
+import asyncio
+import socket
+import subprocess
+import time
+
+import httpx
+import pytest
+
+from prefect_server.services.graphql import workers
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_for_workers(url: str, n_workers: int, timeout: float = 60):
+    pids = set()
+    start = time.monotonic()
+    async with httpx.AsyncClient() as client:
+        while len(pids) < n_workers:
+            if time.monotonic() - start > timeout:
+                raise TimeoutError(f"Only {len(pids)} of {n_workers} workers started.")
+            try:
+                pids.add((await client.get(f"{url}/health")).json()["pid"])
+            except httpx.HTTPError:
+                await asyncio.sleep(0.5)
+
+
+async def send_requests(url: str, n: int, concurrency: int):
+    async with httpx.AsyncClient(
+        pool_limits=httpx.PoolLimits(hard_limit=concurrency)
+    ) as client:
+
+        async def send():
+            response = await client.post(
+                f"{url}/graphql/", json=dict(query="query { hello }")
+            )
+            assert response.status_code == 200
+
+        await asyncio.gather(*[send() for _ in range(n)])
+
+
+@pytest.mark.parametrize("n_workers", [1, 2, 4])
+async def test_graphql_worker_scaling(benchmark, n_workers):
+    """
+    Requests per second should scale close to linearly with the number of workers, up
+    to the number of CPUs.
+    """
+    port = get_free_port()
+    url = f"http://127.0.0.1:{port}"
+    proc = subprocess.Popen(
+        workers.get_gunicorn_command(workers=n_workers, host="127.0.0.1", port=port)
+    )
+    try:
+        await wait_for_workers(url, n_workers)
+        n = 2000
+        await benchmark(
+            send_requests,
+            url,
+            n,
+            64,
+            name=f"{n} requests to {n_workers} workers",
+            rounds=3,
+            n=n,
+        )
+    finally:
+        proc.terminate()
+        proc.wait()
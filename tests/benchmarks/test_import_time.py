@@ -0,0 +1,53 @@
+import re
+import subprocess
+import sys
+
+import pytest
+
+
+def import_time(module: str) -> float:
+    """
+    Returns the cumulative import time of `module` in a fresh interpreter, in seconds,
+    as reported by `python -X importtime`
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stderr=subprocess.PIPE,
+        check=True,
+    ).stderr.decode()
+    # lines are "import time: <self us> | <cumulative us> | <module>"
+    for line in output.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)", line)
+        if match and match.group(3) == module and not match.group(2):
+            return int(match.group(1)) / 1e6
+    raise ValueError(f"No import time reported for {module}")
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "prefect_server",
+        "prefect_server.cli",
+        "prefect_server.api",
+        "prefect_server.services.graphql.server",
+    ],
+)
+async def test_import_time(benchmark, module):
+    await benchmark(import_time, module, name=f"import {module}", rounds=3)
+
+
+async def test_build_schema(benchmark):
+    from ariadne import make_executable_schema
+
+    from prefect_server.graphql import scalars
+    from prefect_server.services.graphql.server import sdl
+    from prefect_server.utilities.graphql import mutation, query
+
+    await benchmark(
+        make_executable_schema,
+        sdl,
+        query,
+        mutation,
+        *scalars.resolvers,
+        name="build the GraphQL schema",
+    )
@@ -0,0 +1,53 @@
+import asyncio
+
+import pendulum
+import pytest
+
+from prefect import api
+from prefect_server import config
+from prefect_server.database import models
+from prefect_server.services.towel.late_work_killer import LateWorkKiller
+
+N_LATE_RUNS = 1000
+
+
+@pytest.fixture
+async def late_flow_runs(tenant_id, flow_id):
+    await models.FlowRun.where({"id": {"_is_null": False}}).delete()
+    scheduled_start_time = pendulum.now("utc").subtract(
+        seconds=config.services.sla.late_work_seconds + 60
+    )
+    for _ in range(N_LATE_RUNS // 100):
+        await asyncio.gather(
+            *[
+                api.runs.create_flow_run(
+                    flow_id=flow_id, scheduled_start_time=scheduled_start_time
+                )
+                for _ in range(100)
+            ]
+        )
+    yield
+    await models.FlowRun.where({"id": {"_is_null": False}}).delete()
+
+
+async def test_late_work_killer_throughput(benchmark, tenant_id, late_flow_runs):
+    queue_before = await benchmark(
+        api.runs.get_runs_in_queue, tenant_id, name="get_runs_in_queue (before)"
+    )
+
+    killer = LateWorkKiller()
+
+    async def kill_all_late_work():
+        while await killer.run_once():
+            pass
+
+    await benchmark(kill_all_late_work, rounds=1, n=N_LATE_RUNS)
+
+    queue_after = await benchmark(
+        api.runs.get_runs_in_queue, tenant_id, name="get_runs_in_queue (after)"
+    )
+    assert await models.FlowRun.where({"state": {"_eq": "Scheduled"}}).count() == 0
+    print(
+        f"get_runs_in_queue: {queue_before.best * 1000:.1f}ms with {N_LATE_RUNS} late "
+        f"runs, {queue_after.best * 1000:.1f}ms after the LateWorkKiller"
+    )
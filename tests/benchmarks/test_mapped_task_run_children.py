@@ -0,0 +1,47 @@
+import tracemalloc
+
+import pytest
+
+from prefect import api
+from prefect_server.database import models
+
+
+@pytest.mark.parametrize("n_children", [1000, 100000, 1000000])
+async def test_get_or_create_mapped_task_run_children(
+    benchmark, flow_run_id, task_id, n_children
+):
+    tracemalloc.start()
+    try:
+        await benchmark(
+            api.runs.get_or_create_mapped_task_run_children,
+            flow_run_id,
+            task_id,
+            n_children - 1,
+            name=f"create {n_children} mapped children",
+            rounds=1,
+            n=n_children,
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # only the returned ids should be held in memory
+    print(f"peak memory creating {n_children} mapped children: {peak / 2**20:.1f}MB")
+
+    # every further call only retrieves the existing children
+    await benchmark(
+        api.runs.get_or_create_mapped_task_run_children,
+        flow_run_id,
+        task_id,
+        n_children - 1,
+        name=f"retrieve {n_children} mapped children",
+        rounds=1,
+        n=n_children,
+    )
+    assert (
+        await models.TaskRun.where(
+            {"flow_run_id": {"_eq": flow_run_id}, "map_index": {"_gte": 0}}
+        ).count()
+        == n_children
+    )
+
+    await models.FlowRun.where(id=flow_run_id).delete()
@@ -5,9 +5,22 @@ from unittest.mock import MagicMock
 import pytest
 from asynctest import CoroutineMock
 
+# register the API, which tests use through `prefect.api`
+import prefect_server.api
+
+from prefect_server.utilities.tests import QueryRecorder
+
 from .fixtures.database_fixtures import *
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-query-counts",
+        action="store_true",
+        help="Rewrite the query count baseline with the counts observed in this run",
+    )
+
+
 def pytest_collection_modifyitems(session, config, items):
     """
     Modify tests prior to execution
@@ -46,3 +59,15 @@ def cloud_hook_mock(monkeypatch):
         "prefect_server.api.cloud_hooks.cloud_hook_httpx_client.post", post_mock
     )
     return post_mock
+
+
+@pytest.fixture
+def query_recorder():
+    """
+    A `QueryRecorder` for counting the Hasura requests made by an API call:
+
+        with query_recorder:
+            await api.runs.create_flow_run(flow_id=flow_id)
+        assert query_recorder.count == 2
+    """
+    return QueryRecorder()
@@ -0,0 +1,154 @@
+import asyncio
+import uuid
+
+import pytest
+from asynctest import CoroutineMock
+from box import Box
+
+from prefect.utilities.graphql import parse_graphql
+from prefect_server.database import models
+from prefect_server.database.batching import CONNECTION_ERROR, MutationBatcher
+from prefect_server.database.hasura import HasuraClient
+
+
+def random_id() -> str:
+    return str(uuid.uuid4())
+
+
+@pytest.fixture
+def client():
+    """
+    A client whose mutations return the aliases they were executed with
+    """
+
+    async def execute_mutations_in_transaction(mutations):
+        return Box(data={m["alias"]: m["alias"] for m in mutations})
+
+    return Box(
+        execute_mutations_in_transaction=CoroutineMock(
+            side_effect=execute_mutations_in_transaction
+        )
+    )
+
+
+class TestMutationBatcher:
+    async def test_max_size_must_be_positive(self, client):
+        with pytest.raises(ValueError):
+            MutationBatcher(client, window_seconds=0.01, max_size=0)
+
+    async def test_aliases_are_unique(self, client):
+        batcher = MutationBatcher(client, window_seconds=0.01, max_size=10)
+        assert batcher.get_alias("insert") != batcher.get_alias("insert")
+
+    async def test_single_mutation(self, client):
+        batcher = MutationBatcher(client, window_seconds=0.01, max_size=10)
+        assert await batcher.submit(dict(alias="a"), alias="a") == "a"
+        assert client.execute_mutations_in_transaction.call_count == 1
+
+    async def test_concurrent_mutations_share_a_request(self, client):
+        batcher = MutationBatcher(client, window_seconds=0.01, max_size=10)
+        aliases = [f"a{i}" for i in range(5)]
+        results = await asyncio.gather(
+            *[batcher.submit(dict(alias=a), alias=a) for a in aliases]
+        )
+        assert results == aliases
+        assert client.execute_mutations_in_transaction.call_count == 1
+
+    async def test_batches_are_limited_to_max_size(self, client):
+        batcher = MutationBatcher(client, window_seconds=0.01, max_size=2)
+        aliases = [f"a{i}" for i in range(5)]
+        results = await asyncio.gather(
+            *[batcher.submit(dict(alias=a), alias=a) for a in aliases]
+        )
+        assert results == aliases
+        assert client.execute_mutations_in_transaction.call_count == 3
+
+    async def test_failed_batches_are_retried_individually(self, client):
+        async def execute_mutations_in_transaction(mutations):
+            if any(m["alias"] == "bad" for m in mutations):
+                raise ValueError("Uniqueness violation.")
+            return Box(data={m["alias"]: m["alias"] for m in mutations})
+
+        client.execute_mutations_in_transaction.side_effect = (
+            execute_mutations_in_transaction
+        )
+        batcher = MutationBatcher(client, window_seconds=0.01, max_size=10)
+        results = await asyncio.gather(
+            *[batcher.submit(dict(alias=a), alias=a) for a in ["a", "bad", "b"]],
+            return_exceptions=True,
+        )
+        assert results[0] == "a"
+        assert isinstance(results[1], ValueError)
+        assert results[2] == "b"
+        # the batch, then each mutation on its own
+        assert client.execute_mutations_in_transaction.call_count == 4
+
+    async def test_connection_errors_are_not_retried(self, client):
+        client.execute_mutations_in_transaction.side_effect = ValueError(
+            CONNECTION_ERROR
+        )
+        batcher = MutationBatcher(client, window_seconds=0.01, max_size=10)
+        results = await asyncio.gather(
+            *[batcher.submit(dict(alias=a), alias=a) for a in ["a", "b"]],
+            return_exceptions=True,
+        )
+        assert all(str(r) == CONNECTION_ERROR for r in results)
+        assert client.execute_mutations_in_transaction.call_count == 1
+
+
+class TestBatchedHasuraClient:
+    @pytest.fixture
+    def hasura_client(self):
+        return HasuraClient(batch_mutations=True)
+
+    async def test_batching_is_disabled_by_default(self):
+        assert HasuraClient().mutation_batcher is None
+
+    async def test_concurrent_inserts(self, hasura_client):
+        slugs = [random_id() for _ in range(5)]
+        results = await asyncio.gather(
+            *[
+                hasura_client.insert(
+                    "tenant",
+                    objects=[{"name": slug, "slug": slug}],
+                    selection_set={"returning": {"slug"}},
+                )
+                for slug in slugs
+            ]
+        )
+        assert [r.returning[0].slug for r in results] == slugs
+        assert await models.Tenant.where({"slug": {"_in": slugs}}).count() == 5
+
+    async def test_concurrent_updates(self, hasura_client, tenant_id):
+        results = await asyncio.gather(
+            *[
+                hasura_client.update(
+                    "tenant", id=tenant_id, set={"name": f"tenant-{i}"}
+                )
+                for i in range(5)
+            ]
+        )
+        assert [r.affected_rows for r in results] == [1] * 5
+
+    async def test_failures_are_isolated(self, hasura_client):
+        duplicate = random_id()
+        await models.Tenant(name=duplicate, slug=duplicate).insert()
+        slugs = [random_id(), duplicate, random_id()]
+
+        results = await asyncio.gather(
+            *[
+                hasura_client.insert("tenant", objects=[{"name": slug, "slug": slug}])
+                for slug in slugs
+            ],
+            return_exceptions=True,
+        )
+        assert results[0].affected_rows == 1
+        assert "Uniqueness violation" in str(results[1])
+        assert results[2].affected_rows == 1
+        assert await models.Tenant.where({"slug": {"_in": slugs}}).count() == 3
+
+    async def test_run_mutation_false_is_not_batched(self, hasura_client):
+        graphql = await hasura_client.insert(
+            "tenant", objects=[{"name": "x", "slug": "x"}], run_mutation=False
+        )
+        assert "insert: insert_tenant" in parse_graphql(graphql["query"])
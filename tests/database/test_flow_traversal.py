@@ -3,7 +3,8 @@ import pytest
 import prefect
 import prefect_server
 from prefect.utilities.graphql import EnumValue, with_args
-from prefect_server.database import models
+from prefect_server.database import models, postgres
+from prefect_server.utilities.tests import set_temporary_config
 
 
 # FIXME this will be in Prefect Core
@@ -11,8 +12,8 @@ def LiteralSetValue(value: list) -> str:
     return "{" + ", ".join(v for v in value) + "}"
 
 
-@pytest.fixture(autouse=True)
-async def flow_id(project_id):
+@pytest.fixture(autouse=True, params=["recursive", "closure"])
+async def flow_id(project_id, request):
     r"""
     1 -> 2 -> 3 -> 4 -> 5
             \              /
@@ -44,9 +45,13 @@ async def flow_id(project_id):
     f.chain(t9, t5)
     f.add_task(t11)
 
-    return await prefect.api.flows.create_flow(
-        project_id=project_id, serialized_flow=f.serialize()
-    )
+    # every traversal is tested both by walking edges and from the closure table
+    with set_temporary_config(
+        "flows.precompute_task_closure", request.param == "closure"
+    ):
+        return await prefect.api.flows.create_flow(
+            project_id=project_id, serialized_flow=f.serialize()
+        )
 
 
 async def query_downstream(*ids,):
@@ -426,3 +431,61 @@ class TestOrphanedTraversal:
             {"task": {"slug": "t1"}, "depth": 2},
         ]:
             assert item in result.data.utility_upstream_tasks
+
+
+class TestTaskClosure:
+    async def test_closure_is_computed_only_if_configured(self, flow_id, request):
+        n_rows = await postgres.fetch_value(
+            """
+            SELECT count(*) FROM utility.task_closure
+            INNER JOIN task ON task.id = task_closure.ancestor_task_id
+            WHERE task.flow_id = %s
+            """,
+            (flow_id,),
+        )
+        if request.node.callspec.params["flow_id"] == "closure":
+            # one row per task at depth 0, plus every distinct path length
+            assert n_rows > 11
+        else:
+            assert n_rows == 0
+
+    async def test_compute_task_closure_is_idempotent(self, flow_id):
+        await prefect.api.flows.compute_task_closure(flow_id=flow_id)
+        assert await prefect.api.flows.compute_task_closure(flow_id=flow_id) == 0
+
+    async def test_closure_includes_every_path_length(self, flow_id):
+        await prefect.api.flows.compute_task_closure(flow_id=flow_id)
+        t1 = await models.Task.where(
+            {"flow_id": {"_eq": flow_id}, "slug": {"_eq": "t1"}}
+        ).first({"id"})
+        t5 = await models.Task.where(
+            {"flow_id": {"_eq": flow_id}, "slug": {"_eq": "t5"}}
+        ).first({"id"})
+        rows = await postgres.fetch(
+            """
+            SELECT depth FROM utility.task_closure
+            WHERE ancestor_task_id = %s AND descendant_task_id = %s
+            ORDER BY depth
+            """,
+            (t1.id, t5.id),
+        )
+        # t1 -> t2 -> t3 -> t4 -> t5 and t1 -> t2 -> t7 -> t8 -> t9 -> t5
+        assert [r["depth"] for r in rows] == [4, 5]
+
+    async def test_deleting_flow_deletes_closure(self, flow_id):
+        await prefect.api.flows.compute_task_closure(flow_id=flow_id)
+        task_ids = [
+            t.id
+            for t in await models.Task.where({"flow_id": {"_eq": flow_id}}).get({"id"})
+        ]
+        await prefect.api.flows.delete_flow(flow_id=flow_id)
+        assert (
+            await postgres.fetch_value(
+                """
+                SELECT count(*) FROM utility.task_closure
+                WHERE ancestor_task_id = ANY(%s::uuid[])
+                """,
+                (task_ids,),
+            )
+            == 0
+        )
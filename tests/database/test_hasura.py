@@ -1,6 +1,9 @@
+import asyncio
+import time
 from textwrap import dedent
 from unittest.mock import MagicMock
 
+import httpx
 import pendulum
 import pytest
 from asynctest import CoroutineMock
@@ -9,8 +12,9 @@ from graphql.error import GraphQLSyntaxError
 
 import prefect_server
 import prefect
+from prefect_server import config
 from prefect.utilities.graphql import EnumValue, parse_graphql
-from prefect_server.database.hasura import Variable
+from prefect_server.database.hasura import HasuraClient, Variable
 from prefect_server.utilities import exceptions
 from prefect_server.utilities.tests import set_temporary_config
 
@@ -18,6 +22,11 @@ hasura_client = prefect.plugins.hasura.client
 
 
 class TestExecute:
+    @pytest.fixture(autouse=True)
+    def reset_circuit_breaker(self):
+        yield
+        hasura_client.circuit_breaker.reset()
+
     @pytest.fixture(autouse=True)
     async def monkeypatch_post_query_variables(self, monkeypatch):
         """
@@ -149,6 +158,220 @@ class TestExecute:
         # confirm we waited while retrying, leaving a couple of seconds to be conservative
         assert pendulum.now("utc") > start_time.add(seconds=2)
 
+    async def test_connection_errors_open_the_circuit(self, monkeypatch):
+        post = CoroutineMock(
+            return_value=MagicMock(
+                json=MagicMock(
+                    return_value=dict(errors=[dict(message="connection error")])
+                )
+            )
+        )
+        monkeypatch.setattr("prefect_server.utilities.http.httpx_client.post", post)
+        with set_temporary_config("hasura.execute_retry_seconds", 0):
+            for _ in range(config.hasura.circuit_breaker.failure_threshold):
+                with pytest.raises(ValueError, match="Unable to connect to postgres"):
+                    await hasura_client.execute("query { hello }")
+        assert hasura_client.circuit_breaker.state == "open"
+
+        # requests fail fast while the circuit is open
+        post.reset_mock()
+        with pytest.raises(ValueError, match="Unable to connect to postgres"):
+            await hasura_client.execute("query { hello }")
+        post.assert_not_called()
+
+    async def test_retries_wait_for_the_circuit_to_close(self):
+        calls = 0
+
+        async def execute(**kwargs):
+            nonlocal calls
+            calls += 1
+            if calls < 3:
+                raise ValueError("connection error")
+            return "result"
+
+        with set_temporary_config("hasura.circuit_breaker.failure_threshold", 2):
+            with set_temporary_config("hasura.circuit_breaker.open_seconds", 0.1):
+                with set_temporary_config("hasura.retry_backoff_seconds", 0.01):
+                    client = HasuraClient()
+                    client._post = execute
+                    start = time.monotonic()
+                    assert await client.execute("query { hello }") == "result"
+
+        assert calls == 3
+        # the second failure opened the circuit for at least 75ms
+        assert time.monotonic() - start > 0.075
+        assert client.circuit_breaker.state == "closed"
+
+    async def test_transport_errors_are_retried(self):
+        calls = 0
+
+        async def execute(**kwargs):
+            nonlocal calls
+            calls += 1
+            if calls < 3:
+                # Hasura is restarting
+                raise httpx.ConnectError("Connection refused")
+            return "result"
+
+        with set_temporary_config("hasura.retry_backoff_seconds", 0.01):
+            client = HasuraClient()
+            client._post = execute
+            assert await client.execute("query { hello }") == "result"
+        assert calls == 3
+
+    async def test_other_errors_close_the_circuit(self, monkeypatch):
+        post = CoroutineMock(
+            return_value=MagicMock(
+                json=MagicMock(return_value=dict(errors=[dict(message="bad query")]))
+            )
+        )
+        monkeypatch.setattr("prefect_server.utilities.http.httpx_client.post", post)
+        hasura_client.circuit_breaker.record_failure()
+        with pytest.raises(ValueError, match="bad query"):
+            await hasura_client.execute("query { hello }")
+        assert hasura_client.circuit_breaker._failures == 0
+
+    async def test_server_errors_are_failures(self, monkeypatch):
+        post = CoroutineMock(
+            return_value=MagicMock(
+                status_code=502,
+                raise_for_status=MagicMock(side_effect=httpx.HTTPError("Bad Gateway")),
+            )
+        )
+        monkeypatch.setattr("prefect_server.utilities.http.httpx_client.post", post)
+        with pytest.raises(httpx.HTTPError):
+            await hasura_client.execute("query { hello }")
+        assert hasura_client.circuit_breaker._failures == 1
+
+    async def test_unexpected_errors_dont_affect_the_circuit(self):
+        async def execute(**kwargs):
+            raise TypeError("unexpected")
+
+        with set_temporary_config("hasura.circuit_breaker.failure_threshold", 1):
+            client = HasuraClient()
+            client._post = execute
+            for _ in range(3):
+                with pytest.raises(TypeError):
+                    await client.execute("query { hello }")
+        assert client.circuit_breaker._failures == 0
+        assert client.circuit_breaker.state == "closed"
+
+    async def test_concurrent_requests_are_capped(self, monkeypatch):
+        in_progress = max_in_progress = 0
+
+        async def post(*args, **kwargs):
+            nonlocal in_progress, max_in_progress
+            in_progress += 1
+            max_in_progress = max(in_progress, max_in_progress)
+            await asyncio.sleep(0.01)
+            in_progress -= 1
+            return MagicMock(json=MagicMock(return_value=dict(data={})))
+
+        monkeypatch.setattr("prefect_server.utilities.http.httpx_client.post", post)
+        with set_temporary_config("hasura.max_concurrent_requests", 3):
+            client = HasuraClient()
+            await asyncio.gather(
+                *[client.execute("query { hello }") for _ in range(10)]
+            )
+        assert max_in_progress == 3
+
+
+class TestReadURL:
+    PRIMARY = "http://primary/v1alpha1/graphql"
+    REPLICA = "http://replica/v1alpha1/graphql"
+
+    @pytest.fixture
+    def post(self, monkeypatch):
+        """
+        Patches request.post so that it records the URL of each request; requests to
+        the replica fail if `post.replica_down` is True.
+        """
+
+        def side_effect(url, *args, **kwargs):
+            if url == self.REPLICA and post.replica_down:
+                raise OSError("replica is down")
+            return MagicMock(json=MagicMock(return_value=dict(data=dict(url=url))))
+
+        post = CoroutineMock(side_effect=side_effect)
+        post.replica_down = False
+        monkeypatch.setattr("prefect_server.utilities.http.httpx_client.post", post)
+        return post
+
+    @pytest.fixture
+    def client(self):
+        return HasuraClient(url=self.PRIMARY, read_url=self.REPLICA)
+
+    async def test_read_url_defaults_to_config(self):
+        with set_temporary_config("hasura.read_graphql_url", self.REPLICA):
+            assert HasuraClient().read_url == self.REPLICA
+        with set_temporary_config("hasura.read_graphql_url", ""):
+            assert HasuraClient().read_url is None
+
+    async def test_queries_are_consistent_by_default(self, client, post):
+        result = await client.execute("query { hello }")
+        assert result.data.url == self.PRIMARY
+
+    async def test_inconsistent_queries_go_to_read_url(self, client, post):
+        result = await client.execute("query { hello }", consistent=False)
+        assert result.data.url == self.REPLICA
+
+    async def test_inconsistent_queries_go_to_primary_without_read_url(self, post):
+        client = HasuraClient(url=self.PRIMARY, read_url="")
+        result = await client.execute("query { hello }", consistent=False)
+        assert result.data.url == self.PRIMARY
+
+    async def test_mutations_always_go_to_primary(self, client, post):
+        result = await client.execute("mutation { hello }", consistent=False)
+        assert result.data.url == self.PRIMARY
+
+    async def test_reads_after_a_write_go_to_primary(self, client, post):
+        await client.execute("mutation { hello }")
+        result = await client.execute("query { hello }", consistent=False)
+        assert result.data.url == self.PRIMARY
+
+    async def test_reads_go_to_read_url_once_writes_are_old(self, client, post):
+        with set_temporary_config("hasura.read_your_writes_seconds", 0):
+            await client.execute("mutation { hello }")
+            result = await client.execute("query { hello }", consistent=False)
+        assert result.data.url == self.REPLICA
+
+    async def test_writes_in_other_tasks_dont_affect_reads(self, client, post):
+        await asyncio.create_task(client.execute("mutation { hello }"))
+        result = await client.execute("query { hello }", consistent=False)
+        assert result.data.url == self.REPLICA
+
+    async def test_read_url_failures_fall_back_to_primary(self, client, post):
+        post.replica_down = True
+        result = await client.execute("query { hello }", consistent=False)
+        assert result.data.url == self.PRIMARY
+        assert [c[0][0] for c in post.call_args_list] == [self.REPLICA, self.PRIMARY]
+
+    async def test_read_url_is_skipped_after_a_failure(self, client, post):
+        post.replica_down = True
+        await client.execute("query { hello }", consistent=False)
+        post.replica_down = False
+        result = await client.execute("query { hello }", consistent=False)
+        assert result.data.url == self.PRIMARY
+
+    async def test_read_url_is_retried_after_a_delay(self, client, post):
+        post.replica_down = True
+        with set_temporary_config("hasura.read_retry_seconds", 0):
+            await client.execute("query { hello }", consistent=False)
+        post.replica_down = False
+        result = await client.execute("query { hello }", consistent=False)
+        assert result.data.url == self.REPLICA
+
+    async def test_graphql_errors_from_read_url_are_raised(self, client, monkeypatch):
+        post = CoroutineMock(
+            return_value=MagicMock(
+                json=MagicMock(return_value=dict(errors=[dict(message="bad query")]))
+            )
+        )
+        monkeypatch.setattr("prefect_server.utilities.http.httpx_client.post", post)
+        with pytest.raises(ValueError, match="bad query"):
+            await client.execute("query { hello }", consistent=False)
+        assert post.call_count == 1
+
 
 class TestGenerateInsertGraphQL:
     async def test_generate_gql_insert_tenants(self):
@@ -0,0 +1,82 @@
+import pytest
+
+from prefect_server import config
+from prefect_server.graphql import documents
+
+GRAPHQL_URL = config.services.graphql.path
+
+HELLO = "query { hello }"
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    documents.document_cache.clear()
+    documents.validation_cache.clear()
+    documents.persisted_query_cache.clear()
+
+
+def persisted_query(query):
+    return {"persistedQuery": {"version": 1, "sha256Hash": documents.hash_query(query)}}
+
+
+class TestDocumentCache:
+    async def test_parsed_documents_are_cached(self, run_query):
+        await run_query(query=HELLO)
+        document = documents.document_cache.get(documents.hash_query(HELLO))
+        assert document is not None
+
+        result = await run_query(query=HELLO)
+        assert result.data.hello == "👋"
+        assert documents.parse_query(HELLO) is document
+
+    async def test_validation_errors_are_cached(self, run_query):
+        query = "query { not_a_field }"
+        result_1 = await run_query(query=query)
+        result_2 = await run_query(query=query)
+        assert result_1.errors
+        assert result_1.errors == result_2.errors
+        assert documents.validation_cache.hits >= 1
+
+    async def test_syntax_errors_are_not_cached(self, run_query):
+        result = await run_query(query="query {")
+        assert result.errors
+        assert len(documents.document_cache) == 0
+
+
+class TestPersistedQueries:
+    async def test_unknown_hash(self, client):
+        response = await client.post(
+            GRAPHQL_URL, json=dict(extensions=persisted_query(HELLO))
+        )
+        assert response.status_code == 200
+        error = response.json()["errors"][0]
+        assert error["message"] == "PersistedQueryNotFound"
+        assert error["extensions"]["code"] == "PERSISTED_QUERY_NOT_FOUND"
+
+    async def test_register_and_run_persisted_query(self, client):
+        response = await client.post(
+            GRAPHQL_URL, json=dict(query=HELLO, extensions=persisted_query(HELLO))
+        )
+        assert response.json()["data"]["hello"] == "👋"
+
+        response = await client.post(
+            GRAPHQL_URL, json=dict(extensions=persisted_query(HELLO))
+        )
+        assert response.json()["data"]["hello"] == "👋"
+
+    async def test_mismatched_hash(self, client):
+        response = await client.post(
+            GRAPHQL_URL,
+            json=dict(
+                query=HELLO, extensions=persisted_query("query { api { version } }")
+            ),
+        )
+        assert response.json()["errors"][0]["message"] == (
+            "provided sha does not match query"
+        )
+        assert len(documents.persisted_query_cache) == 0
+
+    async def test_requests_without_persisted_queries_are_unchanged(self, client):
+        response = await client.post(GRAPHQL_URL, json=dict(query=HELLO))
+        assert response.json()["data"]["hello"] == "👋"
+        assert len(documents.persisted_query_cache) == 0
@@ -0,0 +1,85 @@
+import json
+
+import httpx
+import pytest
+from ariadne import QueryType, make_executable_schema
+from ariadne.asgi import GraphQL
+
+from prefect_server.graphql import extensions
+from prefect_server.utilities import context
+
+SDL = """
+type Query {
+    headers: String
+    wide: [Item]
+}
+
+type Item {
+    a: String
+    b: String
+}
+"""
+
+
+@pytest.fixture
+def client():
+    query = QueryType()
+
+    @query.field("headers")
+    def resolve_headers(parent, info):
+        return json.dumps(context.get_context().get("headers"))
+
+    @query.field("wide")
+    def resolve_wide(parent, info):
+        return [
+            {"a": context.get_context()["headers"].get("x-prefect-a"), "b": "b"}
+            for _ in range(10)
+        ]
+
+    app = GraphQL(
+        make_executable_schema(SDL, query), extensions=[extensions.PrefectHeader]
+    )
+    return httpx.AsyncClient(app=app, base_url="https://prefect.io")
+
+
+def test_get_prefect_headers():
+    context_value = {
+        "request": {
+            "headers": [
+                (b"x-prefect-a", b"1"),
+                (b"X-Prefect-B", b"2"),
+                (b"authorization", b"3"),
+            ]
+        }
+    }
+    assert extensions.get_prefect_headers(context_value) == {
+        "x-prefect-a": "1",
+        "x-prefect-b": "2",
+    }
+
+
+def test_get_prefect_headers_without_request():
+    assert extensions.get_prefect_headers({}) == {}
+
+
+async def test_prefect_headers_are_in_resolver_context(client):
+    response = await client.post(
+        "/",
+        json=dict(query="{ headers }"),
+        headers={"X-Prefect-A": "1", "Authorization": "2"},
+    )
+    assert json.loads(response.json()["data"]["headers"]) == {"x-prefect-a": "1"}
+
+
+async def test_prefect_headers_are_in_nested_resolver_context(client):
+    response = await client.post(
+        "/", json=dict(query="{ wide { a b } }"), headers={"X-Prefect-A": "1"}
+    )
+    assert response.json()["data"]["wide"] == [{"a": "1", "b": "b"}] * 10
+
+
+async def test_prefect_headers_do_not_leak_between_requests(client):
+    await client.post("/", json=dict(query="{ headers }"), headers={"X-Prefect-A": "1"})
+    response = await client.post("/", json=dict(query="{ headers }"))
+    assert json.loads(response.json()["data"]["headers"]) == {}
+    assert "headers" not in context.get_context()
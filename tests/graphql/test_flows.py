@@ -483,6 +483,40 @@ class TestUpdateFlowLazarus:
         assert "got invalid value None at 'input.flow_id'" in result.errors[0].message
 
 
+class TestUpdateFlowLazyTaskRuns:
+    enable_mutation = """
+        mutation($input: enable_flow_lazy_task_runs_input!) {
+            enable_flow_lazy_task_runs(input: $input) {
+                success
+            }
+        }
+    """
+
+    disable_mutation = """
+        mutation($input: disable_flow_lazy_task_runs_input!) {
+            disable_flow_lazy_task_runs(input: $input) {
+                success
+            }
+        }
+    """
+
+    async def test_enable_flow_lazy_task_runs(self, run_query, flow_id, flow_group_id):
+        result = await run_query(
+            query=self.enable_mutation, variables=dict(input={"flow_id": flow_id}),
+        )
+        assert result.data.enable_flow_lazy_task_runs.success is True
+        flow_group = await models.FlowGroup.where(id=flow_group_id).first({"settings"})
+        assert flow_group.settings["lazy_task_runs_enabled"] is True
+
+    async def test_disable_flow_lazy_task_runs(self, run_query, flow_id, flow_group_id):
+        result = await run_query(
+            query=self.disable_mutation, variables=dict(input={"flow_id": flow_id}),
+        )
+        assert result.data.disable_flow_lazy_task_runs.success is True
+        flow_group = await models.FlowGroup.where(id=flow_group_id).first({"settings"})
+        assert flow_group.settings["lazy_task_runs_enabled"] is False
+
+
 class TestUpdateFlowVersionLocking:
 
     enable_lock_mutation = """
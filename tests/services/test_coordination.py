@@ -0,0 +1,117 @@
+import uuid
+
+import pytest
+
+from prefect_server.services import coordination
+from prefect_server.services.loop_service import LoopService
+
+
+@pytest.fixture
+async def coordinators():
+    coordinators = []
+    yield coordinators
+    for c in coordinators:
+        await c.close()
+
+
+def test_stable_hash_is_deterministic():
+    assert coordination.stable_hash("abc") == coordination.stable_hash("abc")
+    assert coordination.stable_hash("abc") != coordination.stable_hash("abd")
+    assert 0 <= coordination.stable_hash(str(uuid.uuid4())) < 2 ** 31
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError, match="Invalid coordination mode"):
+        coordination.get_coordinator(name="test", mode="all")
+
+
+async def test_no_coordination_owns_everything():
+    coordinator = coordination.get_coordinator(name="test", mode="none")
+    await coordinator.refresh()
+    assert coordinator.is_active
+    assert coordinator.owns(str(uuid.uuid4()))
+
+
+def test_loop_service_uses_no_coordination_by_default():
+    service = LoopService(loop_seconds=1)
+    assert type(service.coordinator) is coordination.Coordinator
+    assert service.owns(str(uuid.uuid4()))
+
+
+class TestLeaderElection:
+    async def test_one_leader(self, coordinators):
+        name = str(uuid.uuid4())
+        for _ in range(3):
+            coordinators.append(coordination.LeaderElection(name=name))
+        for c in coordinators:
+            await c.refresh()
+
+        assert sum(c.is_active for c in coordinators) == 1
+
+    async def test_leader_fails_over(self, coordinators):
+        name = str(uuid.uuid4())
+        leader = coordination.LeaderElection(name=name)
+        follower = coordination.LeaderElection(name=name)
+        coordinators.extend([leader, follower])
+
+        await leader.refresh()
+        await follower.refresh()
+        assert leader.is_active and not follower.is_active
+
+        await leader.close()
+        await follower.refresh()
+        assert follower.is_active
+        assert follower.owns(str(uuid.uuid4()))
+
+    async def test_different_services_have_different_leaders(self, coordinators):
+        a = coordination.LeaderElection(name=str(uuid.uuid4()))
+        b = coordination.LeaderElection(name=str(uuid.uuid4()))
+        coordinators.extend([a, b])
+        await a.refresh()
+        await b.refresh()
+        assert a.is_active and b.is_active
+
+
+class TestShardCoordination:
+    async def refresh(self, coordinators):
+        # refresh twice so every replica sees every other replica's slot
+        for _ in range(2):
+            for c in coordinators:
+                await c.refresh()
+
+    async def test_every_key_has_exactly_one_owner(self, coordinators):
+        name = str(uuid.uuid4())
+        for _ in range(3):
+            coordinators.append(coordination.ShardCoordination(name=name, slots=8))
+        await self.refresh(coordinators)
+
+        assert {c.slot for c in coordinators} == {0, 1, 2}
+        for _ in range(100):
+            key = str(uuid.uuid4())
+            assert sum(c.owns(key) for c in coordinators) == 1
+
+    async def test_rebalance_when_replica_leaves(self, coordinators):
+        name = str(uuid.uuid4())
+        for _ in range(3):
+            coordinators.append(coordination.ShardCoordination(name=name, slots=8))
+        await self.refresh(coordinators)
+
+        await coordinators[1].close()
+        remaining = [coordinators[0], coordinators[2]]
+        await self.refresh(remaining)
+
+        assert not coordinators[1].is_active
+        for c in remaining:
+            assert len(c.members) == 2
+        for _ in range(100):
+            key = str(uuid.uuid4())
+            assert sum(c.owns(key) for c in remaining) == 1
+
+    async def test_replica_stands_by_when_slots_are_full(self, coordinators):
+        name = str(uuid.uuid4())
+        for _ in range(3):
+            coordinators.append(coordination.ShardCoordination(name=name, slots=2))
+        await self.refresh(coordinators)
+
+        assert [c.is_active for c in coordinators] == [True, True, False]
+        assert not coordinators[2].owns(str(uuid.uuid4()))
@@ -0,0 +1,64 @@
+import os
+
+import httpx
+import pytest
+
+from prefect_server.services.graphql import app
+from prefect_server.services.graphql import workers
+from prefect_server.utilities.tests import set_temporary_config
+
+
+class TestWorkerCount:
+    def test_worker_count_defaults_to_config(self):
+        with set_temporary_config("services.graphql.workers", 3):
+            assert workers.get_worker_count() == 3
+
+    def test_explicit_worker_count(self):
+        with set_temporary_config("services.graphql.workers", 3):
+            assert workers.get_worker_count(2) == 2
+
+    def test_zero_workers_is_one_per_cpu(self):
+        assert workers.get_worker_count(0) == (os.cpu_count() or 1)
+
+    def test_negative_worker_count_raises(self):
+        with pytest.raises(ValueError):
+            workers.get_worker_count(-1)
+
+
+def test_gunicorn_command():
+    with set_temporary_config("services.graphql.graceful_timeout_seconds", 12):
+        cmd = workers.get_gunicorn_command(workers=4, host="127.0.0.1", port=1234)
+    assert cmd[:2] == ["gunicorn", "prefect_server.services.graphql.server:app"]
+    assert cmd[cmd.index("--workers") + 1] == "4"
+    assert cmd[cmd.index("--bind") + 1] == "127.0.0.1:1234"
+    assert cmd[cmd.index("--graceful-timeout") + 1] == "12"
+    assert "--preload" in cmd
+    assert (
+        cmd[cmd.index("--worker-class") + 1]
+        == "prefect_server.services.graphql.workers.GraphQLWorker"
+    )
+
+
+def test_worker_uses_uvloop_and_httptools_only_if_available():
+    assert workers.GraphQLWorker.CONFIG_KWARGS == {"loop": "auto", "http": "auto"}
+
+
+async def test_health_reports_worker():
+    client = httpx.AsyncClient(app=app, base_url="https://prefect.io")
+    response = await client.get("/health")
+    health = response.json()
+    assert health["status"] == "ok"
+    assert health["pid"] == os.getpid()
+    assert health["uptime_seconds"] >= 0
+
+
+async def test_uptime_starts_when_worker_starts(monkeypatch):
+    from prefect_server.services.graphql import server
+
+    # with `--preload`, the module is imported long before each worker starts
+    monkeypatch.setattr(server, "started", 0.0)
+    assert server._set_started in app.router.on_startup
+    server._set_started()
+    client = httpx.AsyncClient(app=app, base_url="https://prefect.io")
+    response = await client.get("/health")
+    assert response.json()["uptime_seconds"] < 60
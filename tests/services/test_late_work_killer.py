@@ -0,0 +1,77 @@
+import pendulum
+import pytest
+
+import prefect
+from prefect import api
+from prefect_server import config
+from prefect_server.database import models
+from prefect_server.services.towel.late_work_killer import LateWorkKiller
+from prefect_server.utilities.tests import set_temporary_config
+
+
+@pytest.fixture(autouse=True)
+async def delete_flow_runs():
+    # delete any existing flow runs to ensure a controlled environment
+    await models.FlowRun.where({"id": {"_is_null": False}}).delete()
+
+
+async def create_late_flow_run(flow_id, seconds_late: int) -> str:
+    return await api.runs.create_flow_run(
+        flow_id=flow_id,
+        scheduled_start_time=pendulum.now("utc").subtract(
+            seconds=config.services.sla.late_work_seconds + seconds_late
+        ),
+    )
+
+
+async def test_late_work_killer_fails_late_runs(flow_id):
+    flow_run_id = await create_late_flow_run(flow_id, seconds_late=60)
+
+    assert await LateWorkKiller().run_once() == 1
+
+    flow_run = await models.FlowRun.where(id=flow_run_id).first({"state"})
+    assert flow_run.state == "Failed"
+
+    logs = await models.Log.where({"flow_run_id": {"_eq": flow_run_id}}).get(
+        {"message", "level"}
+    )
+    assert len(logs) == 1
+    assert logs[0].level == "ERROR"
+    assert "never picked up by an agent" in logs[0].message
+
+
+async def test_late_work_killer_ignores_runs_within_threshold(flow_id):
+    flow_run_id = await create_late_flow_run(flow_id, seconds_late=-60)
+
+    assert await LateWorkKiller().run_once() == 0
+
+    flow_run = await models.FlowRun.where(id=flow_run_id).first({"state"})
+    assert flow_run.state == "Scheduled"
+
+
+async def test_late_work_killer_ignores_runs_that_are_not_scheduled(flow_id):
+    flow_run_id = await create_late_flow_run(flow_id, seconds_late=60)
+    await api.states.set_flow_run_state(
+        flow_run_id, state=prefect.engine.state.Submitted()
+    )
+
+    assert await LateWorkKiller().run_once() == 0
+
+
+async def test_late_work_killer_respects_batch_limit(flow_id):
+    for _ in range(3):
+        await create_late_flow_run(flow_id, seconds_late=60)
+
+    killer = LateWorkKiller()
+    killer.batch_limit = 2
+    assert await killer.run_once() == 2
+    assert await killer.run_once() == 1
+    assert await killer.run_once() == 0
+
+
+async def test_late_work_killer_uses_config(flow_id):
+    await create_late_flow_run(flow_id, seconds_late=60)
+
+    with set_temporary_config("services.sla.late_work_seconds", 10 ** 7):
+        assert await LateWorkKiller().run_once() == 0
+    assert await LateWorkKiller().run_once() == 1
@@ -284,3 +284,97 @@ async def test_lazarus_logs_even_if_flow_run_exceeding_times_attempted_limit(
     assert "Marking as failed" in log.message
     assert log.level == "ERROR"
     assert log.name == "prefect-server.Lazarus.FlowRun"
+
+
+@pytest.mark.parametrize(
+    "task_state", [prefect.engine.state.Running(), prefect.engine.state.Scheduled()],
+)
+async def test_lazarus_doesnt_restart_stale_flow_run_with_active_tasks(
+    flow_run_id, task_run_id, task_state
+):
+    await api.states.set_flow_run_state(
+        flow_run_id, state=prefect.engine.state.Running()
+    )
+    await api.states.set_task_run_state(task_run_id, state=task_state)
+
+    # set old heartbeat on the flow run
+    await models.FlowRun.where(id=flow_run_id).update(
+        set={"heartbeat": pendulum.now("utc").subtract(hours=1)}
+    )
+
+    assert await Lazarus().run_once() == 0
+    flow_run = await models.FlowRun.where(id=flow_run_id).first({"state"})
+    assert flow_run.state == "Running"
+
+
+class TestPaging:
+    @pytest.fixture
+    async def stale_flow_run_ids(self, flow_id, flow_run_id):
+        flow_run_ids = [flow_run_id]
+        for _ in range(4):
+            flow_run_ids.append(await api.runs.create_flow_run(flow_id=flow_id))
+
+        for i, id in enumerate(flow_run_ids):
+            await api.states.set_flow_run_state(
+                id, state=prefect.engine.state.Running()
+            )
+            await models.FlowRun.where(id=id).update(
+                set={"heartbeat": pendulum.now("utc").subtract(hours=1, minutes=i)}
+            )
+        return flow_run_ids
+
+    async def test_lazarus_handles_all_pages(self, stale_flow_run_ids):
+        lazarus = Lazarus()
+        lazarus.page_size = 2
+        assert await lazarus.run_once() == 5
+
+        flow_runs = await models.FlowRun.where({"id": {"_in": stale_flow_run_ids}}).get(
+            {"state", "times_resurrected"}
+        )
+        assert all(fr.state == "Scheduled" for fr in flow_runs)
+        assert all(fr.times_resurrected == 1 for fr in flow_runs)
+
+    async def test_lazarus_bounds_pages_per_pass(self, stale_flow_run_ids):
+        lazarus = Lazarus()
+        lazarus.page_size = 2
+        lazarus.max_pages = 2
+        assert await lazarus.run_once() == 4
+        assert await lazarus.run_once() == 1
+        assert await lazarus.run_once() == 0
+
+    async def test_lazarus_starts_immediately_when_pages_are_full(
+        self, stale_flow_run_ids
+    ):
+        lazarus = Lazarus()
+        lazarus.page_size = 2
+        lazarus.max_pages = 2
+        # runs that are failed instead of rescheduled still fill the pages
+        await models.FlowRun.where({"id": {"_in": stale_flow_run_ids}}).update(
+            set={"times_resurrected": config.services.lazarus.resurrection_attempt_limit}
+        )
+        result = await lazarus.run_once()
+        assert result == 0
+        assert lazarus.has_more_work(result)
+        assert lazarus.get_sleep_seconds(result=result, elapsed=0) == 0
+
+    async def test_lazarus_handles_oldest_heartbeats_first(self, stale_flow_run_ids):
+        lazarus = Lazarus()
+        lazarus.page_size = 1
+        lazarus.max_pages = 1
+        assert await lazarus.run_once() == 1
+
+        # the last run has the oldest heartbeat
+        flow_run = await models.FlowRun.where(id=stale_flow_run_ids[-1]).first(
+            {"state"}
+        )
+        assert flow_run.state == "Scheduled"
+
+    async def test_lazarus_writes_one_log_per_run(self, stale_flow_run_ids):
+        assert await Lazarus().run_once() == 5
+        logs = await models.Log.where(
+            {
+                "flow_run_id": {"_in": stale_flow_run_ids},
+                "name": {"_eq": "prefect-server.Lazarus.FlowRun"},
+            }
+        ).get({"flow_run_id"})
+        assert sorted(log.flow_run_id for log in logs) == sorted(stale_flow_run_ids)
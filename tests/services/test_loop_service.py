@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from prefect_server.services.loop_service import Histogram, LoopService
+
+
+class CountingService(LoopService):
+    batch_limit = 100
+
+    def __init__(self, results=None, delay=0, **kwargs):
+        super().__init__(loop_seconds=10, **kwargs)
+        self.results = list(results or [])
+        self.delay = delay
+
+    async def run_once(self):
+        await asyncio.sleep(self.delay)
+        return self.results.pop(0) if self.results else None
+
+
+def test_invalid_loop_mode():
+    with pytest.raises(ValueError, match="Invalid loop mode"):
+        CountingService(loop_mode="whenever")
+
+
+class TestSleepSeconds:
+    def test_fixed_delay(self):
+        service = CountingService(loop_mode="fixed_delay")
+        assert service.get_sleep_seconds(result=5, elapsed=3) == 10
+
+    def test_fixed_rate(self):
+        service = CountingService(loop_mode="fixed_rate")
+        assert service.get_sleep_seconds(result=5, elapsed=3) == 7
+
+    def test_fixed_rate_overrun_starts_immediately(self):
+        service = CountingService(loop_mode="fixed_rate")
+        assert service.get_sleep_seconds(result=5, elapsed=12) == 0
+
+    def test_batch_limit_starts_immediately(self):
+        service = CountingService(loop_mode="fixed_delay")
+        assert service.get_sleep_seconds(result=100, elapsed=3) == 0
+        assert service.get_sleep_seconds(result=99, elapsed=3) == 10
+
+    def test_idle_backoff(self):
+        service = CountingService(loop_mode="fixed_delay")
+        service.idle_backoff_max_multiplier = 4
+        sleeps = [service.get_sleep_seconds(result=0, elapsed=0) for _ in range(5)]
+        assert sleeps == [10, 20, 40, 40, 40]
+
+        # finding work resets the backoff
+        assert service.get_sleep_seconds(result=1, elapsed=0) == 10
+        assert service.get_sleep_seconds(result=0, elapsed=0) == 10
+
+    def test_no_idle_backoff_by_default(self):
+        service = CountingService(loop_mode="fixed_delay")
+        sleeps = [service.get_sleep_seconds(result=0, elapsed=0) for _ in range(3)]
+        assert sleeps == [10, 10, 10]
+
+    def test_services_opt_into_idle_backoff(self):
+        class BackoffService(CountingService):
+            idle_backoff_max_multiplier = 2
+
+        service = BackoffService(loop_mode="fixed_delay")
+        sleeps = [service.get_sleep_seconds(result=0, elapsed=0) for _ in range(3)]
+        assert sleeps == [10, 20, 20]
+
+    def test_unknown_result_does_not_back_off(self):
+        service = CountingService(loop_mode="fixed_delay")
+        assert service.get_sleep_seconds(result=None, elapsed=0) == 10
+        assert service.get_sleep_seconds(result=None, elapsed=0) == 10
+
+
+class TestRunPass:
+    async def test_run_pass_records_stats(self):
+        service = CountingService(results=[3])
+        service.stats["items"] = Histogram(service.items_buckets)
+        service.stats["duration_seconds"] = Histogram(service.duration_buckets)
+
+        assert await service.run_pass() == 3
+        assert service.stats["items"].count == 1
+        assert service.stats["items"].sum == 3
+        assert service.stats["duration_seconds"].count == 1
+
+    async def test_run_pass_logs_stats(self, monkeypatch):
+        service = CountingService(results=[1, 2, 3])
+        service.stats_log_passes = 2
+        log_stats = []
+        monkeypatch.setattr(service, "log_stats", lambda: log_stats.append(True))
+
+        for _ in range(3):
+            await service.run_pass()
+        assert len(log_stats) == 1
+
+    def test_log_stats(self, monkeypatch):
+        service = CountingService()
+        service.stats["items"] = Histogram([1, 10])
+        service.stats["items"].observe(5)
+        messages = []
+        monkeypatch.setattr(service.logger, "info", messages.append)
+
+        service.log_stats()
+        summary = "items: count=1 mean=5.0 max=5 [<=1: 0, <=10: 1, <=inf: 1]"
+        assert summary in messages[0]
+
+    async def test_run_pass_timeout(self):
+        service = CountingService(results=[3], delay=1, pass_timeout_seconds=0.01)
+        with pytest.raises(asyncio.TimeoutError):
+            await service.run_pass()
+
+
+def test_histogram_snapshot():
+    histogram = Histogram([1, 10])
+    for value in [0.5, 1, 5, 50]:
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {1: 2, 10: 3, float("inf"): 4}
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == 56.5
+    assert snapshot["max"] == 50
+    assert histogram.mean == 56.5 / 4
@@ -1,3 +1,4 @@
+import pendulum
 import pytest
 
 from prefect import api
@@ -8,6 +9,8 @@ from prefect_server.services.towel.scheduler import Scheduler
 @pytest.fixture(autouse=True)
 async def clear_scheduled_runs(flow_id):
     await m.FlowRun.where({"flow_id": {"_eq": flow_id}}).delete()
+    # the runs were deleted behind the scheduler's back, so the flow is due again
+    await m.Flow.where(id=flow_id).update(set={"schedule_next_due_time": None})
 
 
 async def test_scheduler_creates_runs():
@@ -27,3 +30,21 @@ async def test_scheduler_does_not_run_for_archived_flows(flow_id):
 async def test_scheduler_does_not_run_for_flows_with_inactive_schedules(flow_id):
     await api.flows.set_schedule_inactive(flow_id=flow_id)
     assert await Scheduler().run_once() == 0
+
+
+async def test_scheduler_only_visits_due_flows(flow_id):
+    await Scheduler().run_once()
+
+    # a flow that isn't due is left alone
+    not_due = pendulum.now("utc").add(years=1)
+    await m.Flow.where(id=flow_id).update(set={"schedule_next_due_time": not_due})
+    await Scheduler().run_once()
+    flow = await m.Flow.where(id=flow_id).first({"schedule_next_due_time"})
+    assert flow.schedule_next_due_time == not_due
+
+    # a due flow is visited, which moves its due time to its next scheduled event
+    due = pendulum.now("utc").subtract(seconds=1)
+    await m.Flow.where(id=flow_id).update(set={"schedule_next_due_time": due})
+    assert await Scheduler().run_once() == 0
+    flow = await m.Flow.where(id=flow_id).first({"schedule_next_due_time"})
+    assert flow.schedule_next_due_time > due
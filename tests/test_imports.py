@@ -0,0 +1,31 @@
+import subprocess
+import sys
+
+
+def run_python(code: str) -> str:
+    return subprocess.check_output([sys.executable, "-c", code]).decode().strip()
+
+
+def test_subpackages_are_not_imported_eagerly():
+    output = run_python(
+        "import sys, prefect_server; "
+        "print(sorted(m for m in sys.modules if m.startswith('prefect_server.')))"
+    )
+    for subpackage in ["api", "database", "graphql", "services"]:
+        assert f"'prefect_server.{subpackage}'" not in output
+
+
+def test_subpackages_are_imported_on_access():
+    output = run_python(
+        "import sys, prefect_server; "
+        "prefect_server.api; "
+        "print('prefect_server.api' in sys.modules, 'prefect_server.database' in sys.modules)"
+    )
+    assert output == "True True"
+
+
+def test_importing_the_graphql_package_registers_the_api():
+    output = run_python(
+        "import prefect, prefect_server.graphql; print(callable(prefect.api.flows.create_flow))"
+    )
+    assert output == "True"
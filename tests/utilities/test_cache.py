@@ -0,0 +1,94 @@
+import pytest
+
+from prefect_server.utilities.cache import LRUCache
+
+
+def test_get_and_set():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("b", 2) == 2
+    assert "a" in cache
+    assert len(cache) == 1
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # using "a" makes "b" the least recently used key
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_hit_rate():
+    cache = LRUCache(maxsize=2)
+    assert cache.hit_rate == 0
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert cache.hit_rate == 0.75
+
+
+def test_falsey_values_are_hits():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", None)
+    assert cache.get("a", 1) is None
+    assert cache.hits == 1
+
+
+def test_pop_and_pop_where():
+    cache = LRUCache(maxsize=10)
+    for i in range(5):
+        cache.set(("x" if i % 2 else "y", i), i)
+    assert cache.pop(("y", 0)) == 0
+    assert cache.pop(("y", 0)) is None
+    assert cache.pop_where(lambda key, value: key[0] == "x") == 2
+    assert cache.pop_where(lambda key, value: value == 4) == 1
+    assert len(cache) == 1
+
+
+def test_clear():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == cache.misses == 0
+
+
+def test_zero_maxsize_caches_nothing():
+    cache = LRUCache(maxsize=0)
+    cache.set("a", 1)
+    assert "a" not in cache
+
+
+def test_negative_maxsize():
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=-1)
+
+
+def test_ttl(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr("time.monotonic", lambda: now)
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    now = 110.0
+    assert "a" not in cache
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(cache) == 0
+
+
+def test_invalid_ttl():
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=1, ttl=0)
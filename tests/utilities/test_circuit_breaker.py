@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from prefect_server.utilities.circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker(failure_threshold=2, open_seconds=0.1, max_open_seconds=0.3)
+
+
+def test_threshold_must_be_positive():
+    with pytest.raises(ValueError):
+        CircuitBreaker(failure_threshold=0, open_seconds=1, max_open_seconds=1)
+
+
+def test_closed_by_default(breaker):
+    assert breaker.state == "closed"
+    assert breaker.allow_request()
+    assert breaker.retry_after() == 0
+
+
+def test_opens_after_consecutive_failures(breaker):
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+    assert 0 < breaker.retry_after() <= 0.1
+
+
+def test_success_resets_failures(breaker):
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_failures_while_open_dont_extend_it(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    retry_after = breaker.retry_after()
+    breaker.record_failure()
+    assert breaker.retry_after() <= retry_after
+
+
+def test_half_open_allows_a_single_trial(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.1)
+    assert breaker.state == "half_open"
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_successful_trial_closes(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.1)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow_request()
+
+
+def test_failed_trial_reopens_for_longer(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.1)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    # the open time doubles, less up to 25% jitter
+    assert 0.14 < breaker.retry_after() <= 0.2
+
+
+def test_open_time_is_capped(breaker):
+    for _ in range(5):
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker._retry_time = 0
+        assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.retry_after() <= 0.3
+
+
+def test_released_trial_can_be_retried(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.1)
+    assert breaker.allow_request()
+    breaker.release()
+    assert breaker.allow_request()
@@ -1,5 +1,7 @@
 import asyncio
 
+import pytest
+
 import prefect
 from prefect_server.utilities.context import get_context, set_context
 
@@ -19,6 +21,25 @@ def test_set_and_get_context():
     assert "x" not in ctx
 
 
+def test_context_is_read_only():
+    with set_context(x=1):
+        ctx = get_context()
+        with pytest.raises(TypeError):
+            ctx["x"] = 2
+        with pytest.raises(AttributeError):
+            ctx.pop("x")
+        assert get_context()["x"] == 1
+
+
+def test_nested_context_includes_outer_values():
+    with set_context(x=1, y=1):
+        outer = get_context()
+        with set_context(x=2, z=2):
+            assert dict(get_context()) == dict(x=2, y=1, z=2)
+            # setting a nested context doesn't affect views of the outer one
+            assert dict(outer) == dict(x=1, y=1)
+
+
 class TestAsyncLeaks:
 
     """
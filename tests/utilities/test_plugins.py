@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from prefect_server.utilities.plugins import load_plugins
+from prefect_server.utilities.tests import set_temporary_config
+
+
+def test_load_no_plugins_by_default():
+    assert load_plugins() == []
+
+
+def test_load_plugins_from_list():
+    assert load_plugins(["json"]) == [json]
+
+
+def test_load_plugins_from_string():
+    assert load_plugins("['json']") == [json]
+
+
+def test_load_plugins_from_config():
+    with set_temporary_config("plugins.modules", "['json']"):
+        assert load_plugins() == [json]
+
+
+def test_load_missing_plugin_raises():
+    with pytest.raises(ImportError):
+        load_plugins(["not_a_real_module"])
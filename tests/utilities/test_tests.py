@@ -2,7 +2,8 @@ import time
 
 import pytest
 
-from prefect_server.utilities.tests import wait_for
+from prefect_server.database import models, postgres
+from prefect_server.utilities.tests import QueryRecorder, wait_for
 
 
 def test_wait_for():
@@ -29,3 +30,50 @@ def test_wait_for_fail():
         t = time.time()
         wait_for(lambda: False, timeout=1)
         assert time.time() - t > 1
+
+
+class TestQueryRecorder:
+    async def test_records_queries(self, tenant_id):
+        recorder = QueryRecorder()
+        with recorder:
+            await models.Tenant.where(id=tenant_id).first({"id"})
+            await models.Tenant.where(id=tenant_id).update(set={"name": "x"})
+        assert recorder.count == 2
+        assert recorder.shapes == ["query tenant", "mutation update_tenant"]
+        assert all(q.duration > 0 for q in recorder.queries)
+
+    async def test_records_sql_queries_separately(self, tenant_id):
+        recorder = QueryRecorder()
+        with recorder:
+            await postgres.fetch_value("SELECT 1")
+            await models.Tenant.where(id=tenant_id).first({"id"})
+        assert recorder.count == 1
+        assert recorder.sql_count == 1
+        assert recorder.sql_shapes == ["sql SELECT 1"]
+        assert recorder.summary() == {"query tenant": 1, "sql SELECT 1": 1}
+
+    async def test_only_records_while_active(self, tenant_id):
+        recorder = QueryRecorder()
+        with recorder:
+            pass
+        await models.Tenant.where(id=tenant_id).first({"id"})
+        assert recorder.count == 0
+
+    async def test_summary(self, tenant_id):
+        recorder = QueryRecorder()
+        with recorder:
+            await models.Tenant.where(id=tenant_id).first({"id"})
+            await models.Tenant.where(id=tenant_id).first({"id"})
+        assert recorder.summary() == {"query tenant": 2}
+
+    async def test_fixture(self, query_recorder, tenant_id):
+        with query_recorder:
+            await models.Tenant.exists(tenant_id)
+        assert query_recorder.shapes == ["query tenant_by_pk"]
+
+    def test_cant_be_nested(self):
+        recorder = QueryRecorder()
+        with recorder:
+            with pytest.raises(RuntimeError):
+                with recorder:
+                    pass